@@ -4,7 +4,7 @@
 处理玩家相关的请求，协调服务层和视图层。
 """
 import logging
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, Tuple
 from service.playerService import PlayerService
 from core.eventmanager import EventManager
 from model.playerModel import PlayerModel
@@ -20,6 +20,7 @@ class PlayerController:
     - 获取玩家列表
     - 获取掌门详情
     - 更新玩家信息
+    - 时间流逝
     """
     
     def __init__(self, event_manager: EventManager):
@@ -106,6 +107,38 @@ class PlayerController:
                 'data': None
             }
     
+    def pass_time(self, years: int = 1) -> Dict[str, Any]:
+        """
+        时间流逝：加载所有在世玩家，发布 'time_pass' 事件批量推进修炼，并保存结果
+
+        Args:
+            years: 流逝的年数
+
+        Returns:
+            Dict[str, Any]: 响应结果，data 为参与修炼的人数
+        """
+        try:
+            count = self.service.load_cultivation()
+            self.event_manager.publish('time_pass', years=years)
+            if self.service.save_cultivation():
+                return {
+                    'success': True,
+                    'message': f'时间流逝 {years} 年',
+                    'data': count
+                }
+            return {
+                'success': False,
+                'message': '保存修炼状态失败',
+                'data': None
+            }
+        except Exception as e:
+            self.logger.error(f"时间流逝异常: {str(e)}")
+            return {
+                'success': False,
+                'message': f'系统错误: {str(e)}',
+                'data': None
+            }
+
     def get_player_list(self) -> Dict[str, Any]:
         """
         获取玩家列表
@@ -128,6 +161,38 @@ class PlayerController:
                 'data': None
             }
     
+    def get_player_page(self, after: Optional[Tuple[Any, int]] = None, limit: int = 100,
+                        sort_key: str = 'id', descending: bool = False) -> Dict[str, Any]:
+        """
+        分页获取玩家列表
+
+        Args:
+            after: 上一页返回的 next_after 游标，为None时获取第一页
+            limit: 每页人数
+            sort_key: 排序字段（id、name、age、realm_level、current_exp）
+            descending: 是否降序
+
+        Returns:
+            Dict[str, Any]: 响应结果，data 包含 players 列表和 next_after
+        """
+        try:
+            players, next_after = self.service.get_players_page(after, limit, sort_key, descending)
+            return {
+                'success': True,
+                'message': '获取玩家列表成功',
+                'data': {
+                    'players': [p.to_dict() for p in players],
+                    'next_after': next_after
+                }
+            }
+        except Exception as e:
+            self.logger.error(f"获取玩家列表异常: {str(e)}")
+            return {
+                'success': False,
+                'message': f'系统错误: {str(e)}',
+                'data': None
+            }
+
     def get_master_details(self) -> Dict[str, Any]:
         """
         获取掌门详情
@@ -136,7 +201,7 @@ class PlayerController:
             Dict[str, Any]: 响应结果
         """
         try:
-            master_details = self.service.get_master_details()
+            master_details = self.service.get_master()
             return {
                 'success': True,
                 'message': '获取掌门详情成功',
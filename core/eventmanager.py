@@ -6,125 +6,776 @@
 - 支持多线程安全的事件订阅和发布
 - 支持事件监听器的添加和移除
 - 支持事件的异步触发和结果收集
+- 可选以弱引用订阅，监听器（或绑定方法的对象）被回收后自动取消订阅
+- asyncio 发布：协程监听器并发执行，同步监听器在线程池中执行，支持单个监听器超时
+- 并行发布：监听器提交到线程池或进程池，同类事件按发布顺序处理，在途事件过多时阻塞发布方
+- 可选的耗时统计：按事件类型和监听器统计调用次数、出错次数和耗时分位数
+- 点分层级主题和通配符订阅（* 匹配一段，# 匹配任意段），参见 core.topics
+- 批量发布同一类型的多个事件，批量监听器一次接收整批，同一周期内的重复事件可以合并
 """
+import asyncio
+import functools
+import inspect
+import itertools
 import logging
-from threading import Lock
-from typing import Any, Callable, Dict, List, Optional
+import time
+import weakref
+from collections import deque
+from concurrent.futures import Executor, Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from threading import BoundedSemaphore, Lock
+from types import MethodType
+from typing import Any, Callable, Deque, Dict, Hashable, Iterable, List, Optional, Set, Tuple
+
+from core.eventstats import EventStats
+from core.topics import TopicTrie, validate_pattern
 
 logger = logging.getLogger(__name__)
 
+
+def _timed_call(listener: Callable, *args: Any, **kwargs: Any) -> Tuple[Any, float]:
+    """在执行器中调用监听器并返回 (结果, 耗时)，定义在模块级以便进程池 pickle"""
+    start = time.perf_counter()
+    result = listener(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+class _ListenerEntry:
+    """
+    监听器条目
+
+    强引用条目直接保存监听器；弱引用条目保存 weakref，目标被回收后解引用为None。
+    timeout 为异步发布时该监听器的超时秒数，为None时使用事件管理器的默认值。
+    seq 为订阅序号，一个主题匹配多个订阅主题时按订阅顺序调用。
+    batch 为True时监听器以一个参数接收事件关键字参数字典的列表。
+    """
+    __slots__ = ('listener', 'ref', 'timeout', 'seq', 'batch')
+
+    def __init__(self, listener: Optional[Callable], ref: Optional[weakref.ref],
+                 timeout: Optional[float] = None, seq: int = 0, batch: bool = False):
+        self.listener = listener
+        self.ref = ref
+        self.timeout = timeout
+        self.seq = seq
+        self.batch = batch
+
+    def call_args(self, args: tuple, kwargs: dict) -> Tuple[tuple, dict]:
+        """单个事件传给该监听器的参数，批量监听器收到只含一个事件（关键字参数）的列表"""
+        if self.batch:
+            return ([kwargs],), {}
+        return args, kwargs
+
+    def resolve(self) -> Optional[Callable]:
+        """获取监听器，弱引用目标已被回收时返回None"""
+        if self.ref is None:
+            return self.listener
+        return self.ref()
+
+    def matches(self, listener: Callable) -> bool:
+        target = self.resolve()
+        return target is not None and target == listener
+
+
+class DispatchResult:
+    """
+    并行发布的汇总结果
+
+    每个监听器对应 futures 中的一个 Future，顺序与订阅顺序一致。
+    监听器出错时记录日志，其 Future 的结果为None，异常保存在 errors 中。
+
+    Attributes:
+        event_type (str): 事件类型标识符
+        futures (List[Future]): 各监听器结果的 Future
+        errors (List[Tuple[Callable, Exception]]): 出错的监听器及其异常
+    """
+
+    def __init__(self, event_type: str, count: int):
+        self.event_type = event_type
+        self.futures: List[Future] = [Future() for _ in range(count)]
+        self.errors: List[Tuple[Callable, Exception]] = []
+        self._lock = Lock()
+        self._remaining = count
+        self._done: Future = Future()
+        if count == 0:
+            self._done.set_result(None)
+
+    def __len__(self) -> int:
+        return len(self.futures)
+
+    def _set_result(self, index: int, result: Any, listener: Optional[Callable] = None,
+                    error: Optional[Exception] = None) -> None:
+        """记录一个监听器的结果，全部完成时标记整体完成"""
+        with self._lock:
+            if error is not None:
+                self.errors.append((listener, error))
+            self._remaining -= 1
+            finished = self._remaining == 0
+        self.futures[index].set_result(result)
+        if finished:
+            self._done.set_result(None)
+
+    def done(self) -> bool:
+        """是否所有监听器都已执行完成"""
+        return self._done.done()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """
+        等待所有监听器执行完成
+
+        Args:
+            timeout: 最长等待秒数，为None时一直等待
+
+        Returns:
+            bool: 是否在超时前全部完成
+        """
+        try:
+            self._done.result(timeout)
+            return True
+        except FutureTimeoutError:
+            return False
+
+    def result(self, timeout: Optional[float] = None) -> List[Any]:
+        """
+        等待并返回所有监听器的返回值，与 publish 的返回值一致
+
+        Args:
+            timeout: 最长等待秒数，为None时一直等待
+
+        Returns:
+            List[Any]: 所有监听器的返回值列表，出错的监听器为None
+
+        Raises:
+            concurrent.futures.TimeoutError: 超时前未全部完成
+        """
+        self._done.result(timeout)
+        return [future.result() for future in self.futures]
+
+    def add_done_callback(self, callback: Callable[['DispatchResult'], Any]) -> None:
+        """所有监听器执行完成后调用 callback(self)，已完成时立即调用"""
+        self._done.add_done_callback(lambda _: callback(self))
+
+
 class EventManager:
     """
     事件管理器类
-    
+
     负责管理事件的订阅关系和事件的触发分发。
     所有操作都是线程安全的。
-    
+
+    每个订阅主题的监听器保存为不可变元组，订阅和取消订阅时在锁内生成新元组替换（写时复制）。
+    发布的主题第一次出现时通过主题树找出匹配的订阅主题，合并后的监听器元组缓存在路由表中，
+    订阅关系变化时清空路由表；发布时直接读取路由表，不加锁也不复制。
+
     Attributes:
-        _lock (Lock): 线程锁，用于保护事件监听器字典的并发访问
-        _listeners (Dict[str, List[Callable]]): 存储事件类型到监听器列表的映射
+        async_timeout (Optional[float]): 异步发布时监听器的默认超时秒数，为None表示不限时
+        _lock (Lock): 线程锁，串行化对监听器字典的修改
+        _listeners (Dict[str, Tuple[_ListenerEntry, ...]]): 存储订阅主题到监听器元组的映射
+        _routes (Dict[str, Tuple[_ListenerEntry, ...]]): 发布主题到匹配的监听器元组的缓存
     """
-    
-    def __init__(self):
-        """初始化事件管理器"""
+
+    # 路由表缓存的发布主题数上限，超出时整体清空
+    ROUTE_CACHE_SIZE = 4096
+
+    def __init__(self, async_timeout: Optional[float] = None, executor: Optional[Executor] = None,
+                 max_pending: int = 64):
+        """
+        初始化事件管理器
+
+        Args:
+            async_timeout: 异步发布时监听器的默认超时秒数
+            executor: 并行发布使用的线程池或进程池，为None时首次并行发布时创建线程池
+            max_pending: 并行发布时在途事件数上限，达到上限后发布方阻塞等待，为0表示不限制
+        """
+        self.async_timeout = async_timeout
         self._lock = Lock()
-        self._listeners: Dict[str, List[Callable]] = {}
-    
-    def subscribe(self, event_type: str, listener: Callable) -> bool:
+        self._listeners: Dict[str, Tuple[_ListenerEntry, ...]] = {}
+        self._routes: Dict[str, Tuple[_ListenerEntry, ...]] = {}
+        self._trie = TopicTrie()
+        self._sequence = itertools.count()
+        # 有弱引用监听器被回收、等待清理的订阅主题，回收回调只追加，清理在锁内逐个取出
+        self._stale: Deque[str] = deque()
+        self._executor = executor
+        self._owns_executor = False
+        self._dispatch_slots = BoundedSemaphore(max_pending) if max_pending > 0 else None
+        # 每个事件类型最近一次并行发布，下一次发布在其完成后才开始执行
+        self._tails: Dict[str, DispatchResult] = {}
+        # 耗时统计，为None时不统计
+        self._event_stats: Optional[EventStats] = None
+        # 等待 flush_events 发布的事件：事件类型 -> 合并键 -> 关键字参数
+        self._queue_lock = Lock()
+        self._queued: Dict[str, Dict[Hashable, Dict[str, Any]]] = {}
+
+    def subscribe(self, event_type: str, listener: Callable, weak: bool = False,
+                  timeout: Optional[float] = None, batch: bool = False) -> bool:
         """
         订阅指定类型的事件
-        
+
         Args:
-            event_type: 事件类型标识符
+            event_type: 事件类型标识符，可以是点分层级主题，可包含通配符 * 和 #
             listener: 事件监听器函数
-            
+            weak: 是否以弱引用保存监听器，默认强引用。弱引用的监听器（绑定方法为其对象）
+                被回收后自动取消订阅
+            timeout: 异步发布时该监听器的超时秒数，为None时使用 async_timeout
+            batch: 是否为批量监听器。批量监听器以一个参数接收事件关键字参数字典的列表，
+                publish_many 时每个批次只调用一次，其他发布方式收到只含一个事件的列表，
+                且发布时不能带位置参数
+
         Returns:
             bool: 订阅是否成功
-            
+
         Raises:
             TypeError: 当listener不是可调用对象时抛出
+            ValueError: 通配符没有独占一段
         """
         if not callable(listener):
             raise TypeError("监听器必须是可调用对象")
-            
+        validate_pattern(event_type)
+
         with self._lock:
-            if event_type not in self._listeners:
-                self._listeners[event_type] = []
-            if listener not in self._listeners[event_type]:
-                self._listeners[event_type].append(listener)
-                logger.debug(f"成功订阅事件: {event_type}")
-                return True
-            logger.debug(f"监听器已存在，忽略重复订阅: {event_type}")
-            return False
+            entries = self._live_entries(event_type)
+            if any(entry.matches(listener) for entry in entries):
+                logger.debug(f"监听器已存在，忽略重复订阅: {event_type}")
+                return False
+            self._set_entries(event_type, entries + (self._make_entry(event_type, listener, weak, timeout, batch),))
+            logger.debug(f"成功订阅事件: {event_type}")
+            return True
+
+    def _make_entry(self, event_type: str, listener: Callable, weak: bool,
+                    timeout: Optional[float] = None, batch: bool = False) -> _ListenerEntry:
+        """创建监听器条目，弱引用的回收回调只做标记，清理在下次修改或发布时进行"""
+        seq = next(self._sequence)
+        if not weak:
+            return _ListenerEntry(listener, None, timeout, seq, batch)
+        stale = self._stale
+
+        def on_collected(_ref, event_type=event_type):
+            # 可能在任意线程的垃圾回收中调用，不能获取锁，deque 的追加是原子操作
+            stale.append(event_type)
+
+        if isinstance(listener, MethodType):
+            ref = weakref.WeakMethod(listener, on_collected)
+        else:
+            ref = weakref.ref(listener, on_collected)
+        return _ListenerEntry(None, ref, timeout, seq, batch)
+
+    def _set_entries(self, pattern: str, entries: Tuple[_ListenerEntry, ...]) -> None:
+        """在锁内替换订阅主题的监听器元组，同步主题树并清空路由表"""
+        if entries:
+            if pattern not in self._listeners:
+                self._trie.add(pattern)
+            self._listeners[pattern] = entries
+        elif self._listeners.pop(pattern, None) is not None:
+            self._trie.remove(pattern)
+        self._routes = {}
+
+    def _live_entries(self, pattern: str) -> Tuple[_ListenerEntry, ...]:
+        """在锁内获取订阅主题的监听器元组，并清理已被回收的弱引用监听器"""
+        self._drain_stale()
+        return self._listeners.get(pattern, ())
+
+    def _drain_stale(self) -> None:
+        """在锁内取出所有待清理的主题，移除其中已被回收的弱引用监听器"""
+        stale = self._stale
+        patterns: Set[str] = set()
+        while stale:
+            patterns.add(stale.popleft())
+        for pattern in patterns:
+            entries = self._listeners.get(pattern)
+            if entries is not None:
+                self._set_entries(pattern, tuple(entry for entry in entries if entry.resolve() is not None))
+
+    def _purge_stale(self) -> None:
+        """清理所有已被回收的弱引用监听器"""
+        with self._lock:
+            self._drain_stale()
+
+    def _route(self, topic: str) -> Tuple[_ListenerEntry, ...]:
+        """获取与发布主题匹配的所有监听器，按订阅顺序排列"""
+        entries = self._routes.get(topic)
+        if entries is not None:
+            return entries
+        with self._lock:
+            patterns = self._trie.match(topic)
+            if len(patterns) == 1:
+                entries = self._listeners[patterns.pop()]
+            else:
+                entries = tuple(sorted((entry for pattern in patterns for entry in self._listeners[pattern]),
+                                       key=lambda entry: entry.seq))
+            if len(self._routes) >= self.ROUTE_CACHE_SIZE:
+                self._routes = {}
+            self._routes[topic] = entries
+        return entries
 
     def unsubscribe(self, event_type: str, listener: Callable) -> bool:
         """
         取消订阅指定类型的事件
-        
+
         Args:
             event_type: 事件类型标识符
             listener: 要移除的事件监听器函数
-            
+
         Returns:
             bool: 取消订阅是否成功
         """
         with self._lock:
-            if event_type in self._listeners and listener in self._listeners[event_type]:
-                self._listeners[event_type].remove(listener)
-                logger.debug(f"成功取消订阅事件: {event_type}")
-                # 如果该事件类型没有监听器了，清理该事件类型
-                if not self._listeners[event_type]:
-                    del self._listeners[event_type]
-                return True
-            logger.debug(f"未找到要取消的订阅: {event_type}")
-            return False
+            entries = self._live_entries(event_type)
+            remaining = tuple(entry for entry in entries if not entry.matches(listener))
+            if len(remaining) == len(entries):
+                logger.debug(f"未找到要取消的订阅: {event_type}")
+                return False
+            # 如果该事件类型没有监听器了，_set_entries 会清理该事件类型
+            self._set_entries(event_type, remaining)
+            logger.debug(f"成功取消订阅事件: {event_type}")
+            return True
 
-    def publish(self, event_type: str, *args: Any, **kwargs: Any) -> List[Any]:
+    def listener_count(self, event_type: str) -> int:
+        """
+        发布指定主题时会触发的存活监听器数量，包括通配符订阅
+
+        Args:
+            event_type: 事件类型标识符
+
+        Returns:
+            int: 监听器数量
+        """
+        return sum(1 for entry in self._route(event_type) if entry.resolve() is not None)
+
+    def publish(self, event_type: str, /, *args: Any, **kwargs: Any) -> List[Any]:
         """
         发布事件，触发所有相关的监听器
-        
+
         Args:
             event_type: 事件类型标识符
-            *args: 传递给监听器的位置参数
+            *args: 传递给监听器的位置参数，有批量监听器时不能使用
             **kwargs: 传递给监听器的关键字参数
-            
+
         Returns:
-            List[Any]: 所有监听器的返回值列表
-            
+            List[Any]: 所有存活监听器的返回值列表
+
+        Raises:
+            TypeError: 有批量监听器时传入了位置参数
+
         Note:
-            - 监听器的执行在锁外进行，以避免长时间持有锁
+            - 读取的是发布时刻的监听器元组快照，不需要加锁，回调中订阅或取消订阅不影响本次发布
             - 如果监听器执行出错，会记录错误但不影响其他监听器的执行
         """
-        # 在锁保护下复制监听器列表，避免执行回调时持有锁
-        with self._lock:
-            listeners = self._listeners.get(event_type, [])[:]
-        
-        if not listeners:
+        entries = self._routes.get(event_type)
+        if entries is None:
+            entries = self._route(event_type)
+        if not entries:
             logger.debug(f"没有找到事件 {event_type} 的监听器")
             return []
-            
+        if args:
+            self._check_positional(event_type, entries)
+        if self._event_stats is not None:
+            return self._publish_instrumented(self._event_stats, event_type, entries, args, kwargs)
+
+        results = []
+        for entry in entries:
+            listener = entry.listener if entry.ref is None else entry.ref()
+            if listener is None:
+                continue
+            try:
+                result = listener([kwargs]) if entry.batch else listener(*args, **kwargs)
+                results.append(result)
+            except Exception as e:
+                logger.error(f"执行事件监听器时出错: {event_type}, 错误: {str(e)}", exc_info=True)
+                results.append(None)
+
+        if self._stale:
+            self._purge_stale()
+        return results
+
+    def _publish_instrumented(self, event_stats: EventStats, event_type: str,
+                              entries: Tuple[_ListenerEntry, ...], args: tuple, kwargs: dict) -> List[Any]:
+        """开启统计时的 publish，与 publish 行为一致，另外记录每个监听器和整次发布的耗时"""
         results = []
-        for listener in listeners:
+        publish_start = time.perf_counter()
+        for entry in entries:
+            listener = entry.listener if entry.ref is None else entry.ref()
+            if listener is None:
+                continue
+            start = time.perf_counter()
             try:
-                result = listener(*args, **kwargs)
+                result = listener([kwargs]) if entry.batch else listener(*args, **kwargs)
+                event_stats.record_call(event_type, listener, time.perf_counter() - start)
                 results.append(result)
             except Exception as e:
+                event_stats.record_call(event_type, listener, time.perf_counter() - start, error=True)
                 logger.error(f"执行事件监听器时出错: {event_type}, 错误: {str(e)}", exc_info=True)
                 results.append(None)
-                
+        event_stats.record_publish(event_type, time.perf_counter() - publish_start)
+
+        if self._stale:
+            self._purge_stale()
         return results
 
+    @staticmethod
+    def _check_positional(event_type: str, entries: Tuple[_ListenerEntry, ...]) -> None:
+        """批量监听器只接收关键字参数字典，有批量监听器时拒绝位置参数，在调用任何监听器之前检查"""
+        if any(entry.batch for entry in entries):
+            raise TypeError(f"事件 {event_type} 有批量监听器，只能用关键字参数发布")
+
+    def publish_many(self, event_type: str, payloads: Iterable[Dict[str, Any]],
+                     key: Optional[Callable[[Dict[str, Any]], Hashable]] = None) -> int:
+        """
+        批量发布同一类型的多个事件
+
+        只查找一次监听器。批量监听器对整批事件只调用一次，参数为关键字参数字典的列表；
+        普通监听器对每个事件调用一次，参数与 publish(event_type, **payload) 相同。
+        每个监听器依次处理完整批事件后，才轮到下一个监听器。
+
+        Args:
+            event_type: 事件类型标识符
+            payloads: 每个事件的关键字参数字典
+            key: 合并键函数，提供时键相同的事件只发布最后一个，位置为该键第一次出现的位置
+
+        Returns:
+            int: 合并后发布的事件数
+        """
+        if key is None:
+            payloads = list(payloads)
+        else:
+            payloads = list({key(payload): payload for payload in payloads}.values())
+        if not payloads:
+            return 0
+        entries = self._routes.get(event_type)
+        if entries is None:
+            entries = self._route(event_type)
+        if not entries:
+            logger.debug(f"没有找到事件 {event_type} 的监听器")
+            return len(payloads)
+
+        event_stats = self._event_stats
+        publish_start = time.perf_counter()
+        for entry in entries:
+            listener = entry.listener if entry.ref is None else entry.ref()
+            if listener is None:
+                continue
+            if entry.batch:
+                self._call_batched(event_stats, event_type, listener, (payloads,), {})
+            else:
+                for payload in payloads:
+                    self._call_batched(event_stats, event_type, listener, (), payload)
+        if event_stats is not None:
+            event_stats.record_publish(event_type, time.perf_counter() - publish_start)
+
+        if self._stale:
+            self._purge_stale()
+        return len(payloads)
+
+    @staticmethod
+    def _call_batched(event_stats: Optional[EventStats], event_type: str, listener: Callable,
+                      args: tuple, kwargs: dict) -> None:
+        """publish_many 中执行单次监听器调用，出错时记录日志"""
+        start = time.perf_counter() if event_stats is not None else 0.0
+        try:
+            listener(*args, **kwargs)
+        except Exception as e:
+            logger.error(f"执行事件监听器时出错: {event_type}, 错误: {str(e)}", exc_info=True)
+            if event_stats is not None:
+                event_stats.record_call(event_type, listener, time.perf_counter() - start, error=True)
+            return
+        if event_stats is not None:
+            event_stats.record_call(event_type, listener, time.perf_counter() - start)
+
+    def queue_event(self, event_type: str, coalesce_key: Optional[Hashable] = None, /, **kwargs: Any) -> None:
+        """
+        将事件暂存到当前周期，在 flush_events 时与同类型事件一起批量发布
+
+        Args:
+            event_type: 事件类型标识符，只能按位置传入
+            coalesce_key: 合并键，同一周期内同类型且合并键相同的事件只发布最后一个，为None时不合并，
+                只能按位置传入
+            **kwargs: 传递给监听器的关键字参数，可以使用 event_type、coalesce_key 等任意名称
+        """
+        if coalesce_key is None:
+            coalesce_key = object()
+        with self._queue_lock:
+            queued = self._queued.get(event_type)
+            if queued is None:
+                queued = self._queued[event_type] = {}
+            queued[coalesce_key] = kwargs
+
+    def flush_events(self, event_types: Optional[Iterable[str]] = None) -> int:
+        """
+        发布当前周期暂存的事件，每个事件类型调用一次 publish_many，按首次暂存的顺序
+
+        默认发布所有类型的暂存事件，包括其他调用方暂存的；只发布自己暂存的事件时传入 event_types。
+        在监听器中暂存的事件属于下一个周期。
+
+        Args:
+            event_types: 只发布这些类型的暂存事件，为None时发布所有类型
+
+        Returns:
+            int: 发布的事件数
+        """
+        with self._queue_lock:
+            if event_types is None:
+                queued, self._queued = self._queued, {}
+            else:
+                wanted = set(event_types)
+                queued = {event_type: payloads for event_type, payloads in self._queued.items()
+                          if event_type in wanted}
+                for event_type in queued:
+                    del self._queued[event_type]
+        return sum(self.publish_many(event_type, payloads.values()) for event_type, payloads in queued.items())
+
+    def pending_events(self) -> int:
+        """当前周期暂存、尚未发布的事件数"""
+        with self._queue_lock:
+            return sum(len(payloads) for payloads in self._queued.values())
+
+    async def publish_async(self, event_type: str, /, *args: Any, **kwargs: Any) -> List[Any]:
+        """
+        在 asyncio 事件循环中发布事件，所有监听器并发执行
+
+        协程函数监听器直接在事件循环中等待；普通可调用对象放到事件循环的默认线程池中执行，
+        不会阻塞事件循环。每个监听器单独计时，超时或出错的监听器结果为None，不影响其他监听器。
+
+        Args:
+            event_type: 事件类型标识符
+            *args: 传递给监听器的位置参数，有批量监听器时不能使用
+            **kwargs: 传递给监听器的关键字参数
+
+        Returns:
+            List[Any]: 所有存活监听器的返回值列表，顺序与订阅顺序一致
+
+        Raises:
+            TypeError: 有批量监听器时传入了位置参数
+
+        Note:
+            - 同步监听器超时后线程中的调用不会被中止，只是不再等待其结果
+        """
+        entries = self._route(event_type)
+        if not entries:
+            logger.debug(f"没有找到事件 {event_type} 的监听器")
+            return []
+        if args:
+            self._check_positional(event_type, entries)
+
+        loop = asyncio.get_running_loop()
+        publish_start = time.perf_counter()
+        calls = []
+        for entry in entries:
+            listener = entry.listener if entry.ref is None else entry.ref()
+            if listener is None:
+                continue
+            timeout = self.async_timeout if entry.timeout is None else entry.timeout
+            calls.append(self._call_async(loop, event_type, listener, timeout, *entry.call_args(args, kwargs)))
+        results = await asyncio.gather(*calls)
+        event_stats = self._event_stats
+        if event_stats is not None:
+            event_stats.record_publish(event_type, time.perf_counter() - publish_start)
+
+        if self._stale:
+            self._purge_stale()
+        return list(results)
+
+    @staticmethod
+    def _is_async(listener: Callable) -> bool:
+        """监听器是否为协程函数（包括异步的 __call__）"""
+        return (inspect.iscoroutinefunction(listener)
+                or inspect.iscoroutinefunction(getattr(listener, '__call__', None)))
+
+    async def _call_async(self, loop: asyncio.AbstractEventLoop, event_type: str, listener: Callable,
+                          timeout: Optional[float], args: tuple, kwargs: dict) -> Any:
+        """执行单个监听器，超时或出错时记录日志并返回None"""
+        start = time.perf_counter()
+        error = True
+        try:
+            if self._is_async(listener):
+                awaitable = listener(*args, **kwargs)
+            else:
+                awaitable = loop.run_in_executor(None, functools.partial(listener, *args, **kwargs))
+            result = await asyncio.wait_for(awaitable, timeout)
+            error = False
+            return result
+        except asyncio.TimeoutError:
+            logger.error(f"执行事件监听器超时: {event_type}, 超过 {timeout} 秒")
+            return None
+        except Exception as e:
+            logger.error(f"执行事件监听器时出错: {event_type}, 错误: {str(e)}", exc_info=True)
+            return None
+        finally:
+            event_stats = self._event_stats
+            if event_stats is not None:
+                event_stats.record_call(event_type, listener, time.perf_counter() - start, error=error)
+
+    def publish_parallel(self, event_type: str, /, *args: Any, **kwargs: Any) -> DispatchResult:
+        """
+        将事件的监听器提交到执行器并行执行，立即返回汇总结果
+
+        同一事件类型的多次发布按发布顺序处理：上一次发布的所有监听器完成后，
+        本次发布的监听器才开始执行；不同事件类型之间互不等待。
+        在途事件数达到 max_pending 时，本方法阻塞直到有事件处理完成。
+
+        Args:
+            event_type: 事件类型标识符
+            *args: 传递给监听器的位置参数，有批量监听器时不能使用
+            **kwargs: 传递给监听器的关键字参数
+
+        Returns:
+            DispatchResult: 汇总结果，result() 的返回值与 publish 一致
+
+        Raises:
+            TypeError: 有批量监听器时传入了位置参数
+
+        Note:
+            - 使用进程池时监听器和参数必须可以被 pickle
+            - 在监听器中调用本方法可能因在途事件数达到上限而死锁
+        """
+        entries = self._route(event_type)
+        if args:
+            self._check_positional(event_type, entries)
+        calls = []
+        for entry in entries:
+            listener = entry.listener if entry.ref is None else entry.ref()
+            if listener is not None:
+                calls.append((listener, *entry.call_args(args, kwargs)))
+        if self._stale:
+            self._purge_stale()
+        dispatch = DispatchResult(event_type, len(calls))
+        if not calls:
+            logger.debug(f"没有找到事件 {event_type} 的监听器")
+            return dispatch
+
+        executor = self._get_executor()
+        if self._dispatch_slots is not None:
+            self._dispatch_slots.acquire()
+            dispatch.add_done_callback(lambda _: self._dispatch_slots.release())
+        with self._lock:
+            previous = self._tails.get(event_type)
+            self._tails[event_type] = dispatch
+        dispatch.add_done_callback(lambda _: self._release_tail(event_type, dispatch))
+
+        event_stats = self._event_stats
+        if event_stats is not None:
+            publish_start = time.perf_counter()
+            dispatch.add_done_callback(
+                lambda _: event_stats.record_publish(event_type, time.perf_counter() - publish_start))
+        submit = functools.partial(self._submit_dispatch, executor, dispatch, calls, event_stats)
+        if previous is None:
+            submit()
+        else:
+            previous.add_done_callback(lambda _: submit())
+        return dispatch
+
+    def _get_executor(self) -> Executor:
+        """获取并行发布的执行器，未配置时创建线程池"""
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(thread_name_prefix=self.__class__.__name__)
+                self._owns_executor = True
+            return self._executor
+
+    def _release_tail(self, event_type: str, dispatch: DispatchResult) -> None:
+        """发布完成后，若仍是该事件类型的最近一次发布则移除"""
+        with self._lock:
+            if self._tails.get(event_type) is dispatch:
+                del self._tails[event_type]
+
+    def _submit_dispatch(self, executor: Executor, dispatch: DispatchResult,
+                         calls: List[Tuple[Callable, tuple, dict]], event_stats: Optional[EventStats] = None) -> None:
+        """将一次发布的所有 (监听器, 位置参数, 关键字参数) 提交到执行器，开启统计时在执行器中计时"""
+        for index, (listener, args, kwargs) in enumerate(calls):
+            submitted = time.perf_counter()
+            try:
+                if event_stats is None:
+                    future = executor.submit(listener, *args, **kwargs)
+                else:
+                    future = executor.submit(_timed_call, listener, *args, **kwargs)
+            except Exception as e:
+                logger.error(f"提交事件监听器失败: {dispatch.event_type}, 错误: {str(e)}")
+                if event_stats is not None:
+                    event_stats.record_call(dispatch.event_type, listener, 0.0, error=True)
+                dispatch._set_result(index, None, listener, e)
+                continue
+            future.add_done_callback(
+                functools.partial(self._collect, dispatch, index, listener, event_stats, submitted))
+
+    @staticmethod
+    def _collect(dispatch: DispatchResult, index: int, listener: Callable, event_stats: Optional[EventStats],
+                 submitted: float, future: Future) -> None:
+        """收集单个监听器的结果，出错时记录日志，结果记为None"""
+        try:
+            result = future.result()
+        except Exception as e:
+            if event_stats is not None:
+                # 出错时拿不到执行器中的耗时，按提交到完成的时间计
+                event_stats.record_call(dispatch.event_type, listener, time.perf_counter() - submitted, error=True)
+            logger.error(f"执行事件监听器时出错: {dispatch.event_type}, 错误: {str(e)}", exc_info=e)
+            dispatch._set_result(index, None, listener, e)
+            return
+        if event_stats is not None:
+            result, latency = result
+            event_stats.record_call(dispatch.event_type, listener, latency)
+        dispatch._set_result(index, result)
+
+    def enable_stats(self, report_interval: Optional[float] = None, precision: float = 0.05) -> EventStats:
+        """
+        开启耗时统计，已开启时返回现有的统计
+
+        Args:
+            report_interval: 定期将统计写入日志的间隔秒数，为None时不写日志
+            precision: 直方图相邻桶边界的相对差
+
+        Returns:
+            EventStats: 统计收集器
+        """
+        with self._lock:
+            if self._event_stats is None:
+                self._event_stats = EventStats(precision)
+            event_stats = self._event_stats
+        if report_interval:
+            event_stats.start_reporting(report_interval)
+        return event_stats
+
+    def disable_stats(self) -> None:
+        """关闭耗时统计并停止定期写日志，已收集的统计被丢弃"""
+        with self._lock:
+            event_stats, self._event_stats = self._event_stats, None
+        if event_stats is not None:
+            event_stats.stop_reporting()
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        耗时统计快照，未开启统计时为空字典
+
+        Returns:
+            Dict[str, Dict[str, Any]]: 参见 EventStats.snapshot
+        """
+        event_stats = self._event_stats
+        return event_stats.snapshot() if event_stats is not None else {}
+
+    def shutdown(self, wait: bool = True) -> None:
+        """
+        关闭由事件管理器创建的执行器，外部传入的执行器由调用方负责关闭
+
+        Args:
+            wait: 是否等待已提交的监听器执行完成
+        """
+        with self._lock:
+            executor = self._executor if self._owns_executor else None
+            if executor is not None:
+                self._executor = None
+                self._owns_executor = False
+        if executor is not None:
+            executor.shutdown(wait=wait)
+
     def clear(self, event_type: Optional[str] = None) -> None:
         """
         清除指定事件类型或所有事件类型的监听器
-        
+
         Args:
             event_type: 要清除的事件类型，如果为None则清除所有事件
         """
         with self._lock:
             if event_type is None:
                 self._listeners.clear()
+                self._routes = {}
+                self._trie = TopicTrie()
+                self._stale.clear()
                 logger.debug("已清除所有事件监听器")
             elif event_type in self._listeners:
-                del self._listeners[event_type]
+                self._set_entries(event_type, ())
                 logger.debug(f"已清除事件类型 {event_type} 的所有监听器")
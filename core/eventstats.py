@@ -0,0 +1,216 @@
+"""
+事件统计模块
+
+为 EventManager 统计每个事件类型和每个监听器的调用次数、出错次数和耗时分布。
+
+主要功能：
+- 对数分桶的流式直方图，常数内存估算 p50/p95/p99 耗时
+- 按事件类型和监听器汇总的统计快照
+- 后台线程定期将统计写入日志
+"""
+import logging
+import math
+import threading
+from typing import Any, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class LatencyHistogram:
+    """
+    对数分桶的流式耗时直方图
+
+    相邻桶的边界相差 (1 + precision) 倍，分位数估算的相对误差约为 precision / 2，
+    内存占用只与耗时的数量级范围有关，与样本数无关。
+
+    Attributes:
+        count (int): 样本数
+        total (float): 耗时总和（秒）
+        max (float): 最大耗时（秒）
+    """
+    __slots__ = ('count', 'total', 'max', '_buckets', '_scale')
+
+    # 低于该值的耗时计入最小的桶
+    MIN_LATENCY = 1e-7
+
+    def __init__(self, precision: float = 0.05):
+        """
+        初始化直方图
+
+        Args:
+            precision: 相邻桶边界的相对差
+        """
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self._buckets: Dict[int, int] = {}
+        self._scale = 1.0 / math.log1p(precision)
+
+    def record(self, latency: float) -> None:
+        """记录一次耗时（秒）"""
+        self.count += 1
+        self.total += latency
+        if latency > self.max:
+            self.max = latency
+        # 向下取整，桶 index 覆盖 [exp(index / scale), exp((index + 1) / scale))；
+        # int() 向零截断，会把小于1秒的耗时放进上一个桶
+        index = math.floor(math.log(max(latency, self.MIN_LATENCY)) * self._scale)
+        self._buckets[index] = self._buckets.get(index, 0) + 1
+
+    def percentile(self, q: float) -> float:
+        """
+        估算分位数
+
+        Args:
+            q: 分位，取值 0~100
+
+        Returns:
+            float: 耗时估计值（秒），没有样本时为0
+        """
+        if not self.count:
+            return 0.0
+        rank = q / 100 * self.count
+        seen = 0
+        for index in sorted(self._buckets):
+            seen += self._buckets[index]
+            if seen >= rank:
+                # 取桶上下界的几何中点，且不超过实际最大值
+                return min(math.exp((index + 0.5) / self._scale), self.max)
+        return self.max
+
+    def snapshot(self) -> Dict[str, float]:
+        """
+        统计快照
+
+        Returns:
+            Dict[str, float]: 次数、总耗时、平均、p50/p95/p99 及最大耗时（秒）
+        """
+        return {
+            'count': self.count,
+            'total': self.total,
+            'mean': self.total / self.count if self.count else 0.0,
+            'p50': self.percentile(50),
+            'p95': self.percentile(95),
+            'p99': self.percentile(99),
+            'max': self.max,
+        }
+
+
+def listener_name(listener: Callable) -> str:
+    """监听器的统计名称，同一函数的不同绑定对象（如各个玩家的 cultivate）合并统计"""
+    func = getattr(listener, '__func__', listener)
+    qualname = getattr(func, '__qualname__', None) or type(func).__qualname__
+    module = getattr(func, '__module__', None)
+    return f"{module}.{qualname}" if module else qualname
+
+
+class EventStats:
+    """
+    事件统计收集器
+
+    发布耗时按事件类型统计，监听器耗时按 (事件类型, 监听器名称) 统计。
+    """
+
+    def __init__(self, precision: float = 0.05):
+        """
+        初始化事件统计
+
+        Args:
+            precision: 直方图相邻桶边界的相对差
+        """
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self._precision = precision
+        self._lock = threading.Lock()
+        self._events: Dict[str, Dict[str, Any]] = {}
+        self._listeners: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self._report_stop = threading.Event()
+        self._report_thread: Optional[threading.Thread] = None
+
+    def _new_entry(self) -> Dict[str, Any]:
+        return {'errors': 0, 'latency': LatencyHistogram(self._precision)}
+
+    def record_publish(self, event_type: str, latency: float) -> None:
+        """记录一次发布的总耗时"""
+        with self._lock:
+            entry = self._events.get(event_type)
+            if entry is None:
+                entry = self._events[event_type] = self._new_entry()
+            entry['latency'].record(latency)
+
+    def record_call(self, event_type: str, listener: Callable, latency: float, error: bool = False) -> None:
+        """记录一次监听器调用的耗时和是否出错"""
+        key = (event_type, listener_name(listener))
+        with self._lock:
+            entry = self._listeners.get(key)
+            if entry is None:
+                entry = self._listeners[key] = self._new_entry()
+            entry['latency'].record(latency)
+            if error:
+                entry['errors'] += 1
+                event = self._events.get(event_type)
+                if event is None:
+                    event = self._events[event_type] = self._new_entry()
+                event['errors'] += 1
+
+    def reset(self) -> None:
+        """清空所有统计"""
+        with self._lock:
+            self._events.clear()
+            self._listeners.clear()
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """
+        统计快照
+
+        Returns:
+            Dict[str, Dict[str, Any]]: 事件类型到统计的映射。每项包含发布次数、出错次数、
+                发布耗时分布，以及 'listeners' 中各监听器的调用次数、出错次数和耗时分布（秒）
+        """
+        with self._lock:
+            result: Dict[str, Dict[str, Any]] = {}
+            for event_type, entry in self._events.items():
+                result[event_type] = {'errors': entry['errors'], **entry['latency'].snapshot(), 'listeners': {}}
+            for (event_type, name), entry in self._listeners.items():
+                event = result.setdefault(event_type, {'errors': 0, **LatencyHistogram().snapshot(), 'listeners': {}})
+                event['listeners'][name] = {'errors': entry['errors'], **entry['latency'].snapshot()}
+        return result
+
+    def log_report(self, level: int = logging.INFO) -> None:
+        """将统计快照写入日志，按总耗时从高到低排列"""
+        snapshot = self.snapshot()
+        if not snapshot:
+            return
+        for event_type, event in sorted(snapshot.items(), key=lambda item: item[1]['total'], reverse=True):
+            self.logger.log(level, f"事件 {event_type}: 发布 {event['count']} 次，出错 {event['errors']} 次，"
+                                   f"p50 {event['p50'] * 1000:.3f} 毫秒，p95 {event['p95'] * 1000:.3f} 毫秒，"
+                                   f"p99 {event['p99'] * 1000:.3f} 毫秒，最大 {event['max'] * 1000:.3f} 毫秒")
+            listeners = sorted(event['listeners'].items(), key=lambda item: item[1]['total'], reverse=True)
+            for name, stats in listeners:
+                self.logger.log(level, f"  监听器 {name}: 调用 {stats['count']} 次，出错 {stats['errors']} 次，"
+                                       f"总耗时 {stats['total'] * 1000:.1f} 毫秒，p50 {stats['p50'] * 1000:.3f} 毫秒，"
+                                       f"p95 {stats['p95'] * 1000:.3f} 毫秒，p99 {stats['p99'] * 1000:.3f} 毫秒")
+
+    def start_reporting(self, interval: float, level: int = logging.INFO) -> None:
+        """
+        启动后台线程，每隔 interval 秒将统计写入日志
+
+        Args:
+            interval: 间隔秒数
+            level: 日志级别
+        """
+        self.stop_reporting()
+        self._report_stop.clear()
+
+        def run():
+            while not self._report_stop.wait(interval):
+                self.log_report(level)
+
+        self._report_thread = threading.Thread(target=run, name='EventStatsReporter', daemon=True)
+        self._report_thread.start()
+
+    def stop_reporting(self) -> None:
+        """停止定期写日志"""
+        self._report_stop.set()
+        if self._report_thread is not None:
+            self._report_thread.join()
+            self._report_thread = None
@@ -0,0 +1,266 @@
+"""
+游戏时钟与定时事件模块
+
+在 EventManager 之上维护游戏时间（年）和一个按到期时间排序的定时事件堆。
+
+主要功能：
+- 按绝对时间或相对时间登记定时事件，返回可取消的句柄
+- 推进时钟时直接跳到下一个到期事件，中间没有事件的年份一次跳过
+- 推进时以流逝的年数发布 'time_pass' 事件，同一时刻到期的事件批量发布
+"""
+import heapq
+import itertools
+import logging
+from threading import Lock
+from typing import Any, Dict, List, Optional
+
+from core.eventmanager import EventManager
+
+TIME_PASS_EVENT = 'time_pass'
+
+
+class ScheduledEvent:
+    """
+    定时事件句柄
+
+    Attributes:
+        time (int): 到期的游戏时间
+        event_type (str): 到期时发布的事件类型
+        kwargs (Dict[str, Any]): 发布时传给监听器的关键字参数
+        cancelled (bool): 是否已取消
+    """
+    __slots__ = ('time', 'seq', 'event_type', 'kwargs', 'cancelled', '_scheduler')
+
+    def __init__(self, time: int, seq: int, event_type: str, kwargs: Dict[str, Any],
+                 scheduler: Optional['Scheduler']):
+        self.time = time
+        self.seq = seq
+        self.event_type = event_type
+        self.kwargs = kwargs
+        self.cancelled = False
+        self._scheduler = scheduler
+
+    def __lt__(self, other: 'ScheduledEvent') -> bool:
+        # 同一时刻到期的事件按登记顺序发布
+        return (self.time, self.seq) < (other.time, other.seq)
+
+    def __repr__(self) -> str:
+        state = ', cancelled' if self.cancelled else ''
+        return f"ScheduledEvent(time={self.time}, event_type={self.event_type!r}{state})"
+
+    def cancel(self) -> bool:
+        """
+        取消定时事件
+
+        Returns:
+            bool: 取消前是否仍在等待发布
+        """
+        scheduler = self._scheduler
+        return scheduler is not None and scheduler.cancel(self)
+
+
+class Scheduler:
+    """
+    游戏时钟与定时事件调度器
+
+    定时事件保存在以 (到期时间, 登记序号) 为键的最小堆中。取消只做标记，
+    标记的事件在到达堆顶时丢弃；已取消的事件超过堆的一半时整体重建。
+
+    Attributes:
+        event_manager (EventManager): 发布事件使用的事件管理器
+        publish_time_pass (bool): 推进时钟时是否发布 'time_pass' 事件
+    """
+
+    def __init__(self, event_manager: EventManager, start_time: int = 0, publish_time_pass: bool = True):
+        """
+        初始化调度器
+
+        Args:
+            event_manager: 事件管理器实例
+            start_time: 起始游戏时间
+            publish_time_pass: 推进时钟时是否以 years=流逝年数 发布 'time_pass' 事件
+        """
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.event_manager = event_manager
+        self.publish_time_pass = publish_time_pass
+        self._now = start_time
+        self._lock = Lock()
+        self._heap: List[ScheduledEvent] = []
+        self._sequence = itertools.count()
+        self._cancelled = 0
+
+    @property
+    def now(self) -> int:
+        """当前游戏时间"""
+        return self._now
+
+    def __len__(self) -> int:
+        """等待发布的定时事件数"""
+        with self._lock:
+            return len(self._heap) - self._cancelled
+
+    def schedule_at(self, time: int, event_type: str, /, **kwargs: Any) -> ScheduledEvent:
+        """
+        登记在指定游戏时间发布的事件
+
+        Args:
+            time: 到期的游戏时间，等于当前时间时在下一次推进时发布，只能按位置传入
+            event_type: 事件类型标识符，只能按位置传入
+            **kwargs: 发布时传给监听器的关键字参数，可以使用 time、event_type 等任意名称
+
+        Returns:
+            ScheduledEvent: 可取消的句柄
+
+        Raises:
+            ValueError: 到期时间早于当前时间
+        """
+        with self._lock:
+            if time < self._now:
+                raise ValueError(f"到期时间 {time} 早于当前时间 {self._now}")
+            return self._schedule_locked(time, event_type, kwargs)
+
+    def schedule_in(self, delay: int, event_type: str, /, **kwargs: Any) -> ScheduledEvent:
+        """
+        登记在 delay 年后发布的事件，参数同 schedule_at
+
+        Raises:
+            ValueError: delay 为负数
+        """
+        if delay < 0:
+            raise ValueError(f"延迟不能为负数: {delay}")
+        with self._lock:
+            return self._schedule_locked(self._now + delay, event_type, kwargs)
+
+    def _schedule_locked(self, time: int, event_type: str, kwargs: Dict[str, Any]) -> ScheduledEvent:
+        """在锁内将事件压入堆，到期时间由调用方在同一次持锁期间算出"""
+        event = ScheduledEvent(time, next(self._sequence), event_type, kwargs, self)
+        heapq.heappush(self._heap, event)
+        self.logger.debug(f"登记定时事件: {event_type}，到期时间 {time}")
+        return event
+
+    def cancel(self, event: ScheduledEvent) -> bool:
+        """
+        取消定时事件
+
+        Args:
+            event: schedule_at 或 schedule_in 返回的句柄
+
+        Returns:
+            bool: 取消前是否仍在等待发布
+        """
+        with self._lock:
+            if event.cancelled or event._scheduler is not self:
+                return False
+            event.cancelled = True
+            self._cancelled += 1
+            if self._cancelled > len(self._heap) // 2:
+                self._heap = [item for item in self._heap if not item.cancelled]
+                heapq.heapify(self._heap)
+                self._cancelled = 0
+        return True
+
+    def _peek(self) -> Optional[ScheduledEvent]:
+        """在锁内丢弃堆顶已取消的事件，返回最早到期的事件"""
+        heap = self._heap
+        while heap and heap[0].cancelled:
+            heapq.heappop(heap)
+            self._cancelled -= 1
+        return heap[0] if heap else None
+
+    def next_time(self) -> Optional[int]:
+        """下一个定时事件的到期时间，没有定时事件时返回None"""
+        with self._lock:
+            event = self._peek()
+            return None if event is None else event.time
+
+    def _pop_due(self, time: int) -> List[ScheduledEvent]:
+        """在锁内取出所有在 time 到期的事件"""
+        due = []
+        while True:
+            event = self._peek()
+            if event is None or event.time > time:
+                return due
+            heapq.heappop(self._heap)
+            # 已发布的事件不能再取消
+            event._scheduler = None
+            due.append(event)
+
+    def _move_to(self, time: int) -> None:
+        """将时钟移到 time，发布流逝的年数"""
+        years = time - self._now
+        if years <= 0:
+            return
+        self._now = time
+        if self.publish_time_pass:
+            self.event_manager.publish(TIME_PASS_EVENT, years=years)
+
+    def advance_to(self, time: int) -> int:
+        """
+        将时钟推进到指定时间，依次发布沿途到期的定时事件
+
+        时钟在每个有事件到期的时刻停下：先以流逝年数发布一次 'time_pass'，
+        再将该时刻到期的事件按类型批量发布；两个到期时刻之间的年份不逐年推进。
+        监听器中登记的、不晚于 time 的事件在本次推进中发布。
+
+        Args:
+            time: 目标游戏时间
+
+        Returns:
+            int: 发布的定时事件数
+
+        Raises:
+            ValueError: 目标时间早于当前时间
+        """
+        if time < self._now:
+            raise ValueError(f"目标时间 {time} 早于当前时间 {self._now}")
+        fired = 0
+        while True:
+            with self._lock:
+                event = self._peek()
+                if event is None or event.time > time:
+                    break
+                due_time = event.time
+            self._move_to(due_time)
+            with self._lock:
+                due = self._pop_due(due_time)
+            for event in due:
+                self.event_manager.queue_event(event.event_type, **event.kwargs)
+            fired += len(due)
+            self.event_manager.flush_events({event.event_type for event in due})
+        self._move_to(time)
+        return fired
+
+    def advance(self, years: int) -> int:
+        """
+        将时钟推进指定年数
+
+        Returns:
+            int: 发布的定时事件数
+
+        Raises:
+            ValueError: years 为负数
+        """
+        if years < 0:
+            raise ValueError(f"推进年数不能为负数: {years}")
+        return self.advance_to(self._now + years)
+
+    def advance_to_next(self) -> int:
+        """
+        将时钟直接推进到下一个定时事件的到期时间
+
+        Returns:
+            int: 发布的定时事件数，没有定时事件时为0且时钟不动
+        """
+        time = self.next_time()
+        if time is None:
+            return 0
+        return self.advance_to(time)
+
+    def clear(self) -> None:
+        """取消所有定时事件"""
+        with self._lock:
+            for event in self._heap:
+                event.cancelled = True
+                event._scheduler = None
+            self._heap = []
+            self._cancelled = 0
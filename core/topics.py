@@ -0,0 +1,110 @@
+"""
+事件主题模块
+
+事件类型是以点分隔的层级主题，例如 player.cultivate.breakthrough。
+订阅时可以使用通配符：
+- * 匹配恰好一段，例如 player.* 匹配 player.death，不匹配 player.cultivate.breakthrough
+- # 匹配零段或多段，例如 player.# 匹配 player、player.death 和 player.cultivate.breakthrough
+通配符必须独占一段。不含通配符的订阅只匹配完全相同的主题，空段（如 a..b）按普通段处理。
+"""
+from typing import Dict, List, Optional, Set
+
+SEPARATOR = '.'
+SINGLE_WILDCARD = '*'
+MULTI_WILDCARD = '#'
+
+
+def split_topic(topic: str) -> List[str]:
+    """将主题拆分为各段"""
+    return topic.split(SEPARATOR)
+
+
+def validate_pattern(pattern: str) -> None:
+    """
+    检查订阅主题是否合法，不含通配符的主题（包括空字符串和含空段的主题）总是合法
+
+    Raises:
+        ValueError: 通配符没有独占一段
+    """
+    if SINGLE_WILDCARD not in pattern and MULTI_WILDCARD not in pattern:
+        return
+    for segment in split_topic(pattern):
+        if segment not in (SINGLE_WILDCARD, MULTI_WILDCARD) and (
+                SINGLE_WILDCARD in segment or MULTI_WILDCARD in segment):
+            raise ValueError(f"通配符必须独占一段: {pattern!r}")
+
+
+class _TopicNode:
+    """主题树节点，pattern 为在此结束的订阅主题"""
+    __slots__ = ('children', 'pattern')
+
+    def __init__(self):
+        self.children: Dict[str, '_TopicNode'] = {}
+        self.pattern: Optional[str] = None
+
+
+class TopicTrie:
+    """
+    订阅主题的前缀树
+
+    每个订阅主题按段插入树中，匹配一个发布主题时沿树向下，
+    在每一层同时尝试同名段、* 和 # 分支，代价与主题深度相关，与订阅数量无关。
+    """
+
+    def __init__(self):
+        self._root = _TopicNode()
+
+    def add(self, pattern: str) -> None:
+        """插入订阅主题"""
+        node = self._root
+        for segment in split_topic(pattern):
+            node = node.children.setdefault(segment, _TopicNode())
+        node.pattern = pattern
+
+    def remove(self, pattern: str) -> None:
+        """删除订阅主题，并清理不再需要的节点"""
+        path = [self._root]
+        segments = split_topic(pattern)
+        for segment in segments:
+            child = path[-1].children.get(segment)
+            if child is None:
+                return
+            path.append(child)
+        path[-1].pattern = None
+        for depth in range(len(segments), 0, -1):
+            node = path[depth]
+            if node.children or node.pattern is not None:
+                break
+            del path[depth - 1].children[segments[depth - 1]]
+
+    def match(self, topic: str) -> Set[str]:
+        """
+        查找与发布主题匹配的所有订阅主题
+
+        Args:
+            topic: 发布的主题
+
+        Returns:
+            Set[str]: 匹配的订阅主题
+        """
+        matched: Set[str] = set()
+        self._match(self._root, split_topic(topic), 0, matched)
+        return matched
+
+    def _match(self, node: _TopicNode, segments: List[str], index: int, matched: Set[str]) -> None:
+        children = node.children
+        multi = children.get(MULTI_WILDCARD)
+        if multi is not None:
+            # # 可以吞掉剩余的任意段数（包括零段）
+            for next_index in range(index, len(segments) + 1):
+                self._match(multi, segments, next_index, matched)
+        if index == len(segments):
+            if node.pattern is not None:
+                matched.add(node.pattern)
+            return
+        child = children.get(segments[index])
+        if child is not None:
+            self._match(child, segments, index + 1, matched)
+        single = children.get(SINGLE_WILDCARD)
+        if single is not None and single is not child:
+            self._match(single, segments, index + 1, matched)
@@ -29,9 +29,22 @@ class BaseDAO:
     
     @contextmanager
     def get_cursor(self):
-        """获取数据库游标"""
+        """
+        获取数据库游标
+
+        不在事务中时每条语句单独提交；处于 transaction() 中时由事务统一提交，
+        出错时将事务标记为只能回滚。
+        """
         with db_pool.get_connection() as conn:
             cursor = conn.cursor()
+            if db_pool.in_transaction():
+                try:
+                    yield cursor
+                except Exception as e:
+                    db_pool.mark_rollback_only()
+                    self.logger.error(f"数据库操作错误: {str(e)}")
+                    raise
+                return
             try:
                 yield cursor
                 if cursor.rowcount > 0:  # 只有在有实际更改时才提交
@@ -42,7 +55,31 @@ class BaseDAO:
                 conn.rollback()
                 self.logger.error(f"数据库操作错误: {str(e)}")
                 raise
+
+    @contextmanager
+    def transaction(self):
+        """
+        开启工作单元事务，块内的所有DAO调用一次提交
+
+        可以嵌套，内层使用保存点。参见 DatabaseConnectionPool.transaction。
+        """
+        with db_pool.transaction() as conn:
+            yield conn
     
+    @contextmanager
+    def bulk_cursor(self):
+        """
+        获取批量写入用的游标
+
+        在独立的写事务（已处于事务中时为保存点）中执行，块内所有语句一起提交，出错时整体回滚。
+        """
+        try:
+            with db_pool.transaction() as conn:
+                yield conn.cursor()
+        except Exception as e:
+            self.logger.error(f"批量操作错误，已回滚: {str(e)}")
+            raise
+
     def execute_query(self, query: str, params: Optional[Tuple] = None) -> List[Tuple]:
         """
         执行查询操作
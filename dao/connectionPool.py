@@ -2,72 +2,511 @@
 数据库连接池模块
 
 提供全局唯一的数据库连接池，统一管理所有数据库连接。
+
+主要功能：
+- 固定容量的连接池，连接按需创建、用完归还
+- 同一线程嵌套获取连接时复用已借出的连接
+- 启用 WAL 模式及可调的 PRAGMA 参数
+- 借出超时与连接池健康指标统计
+- 跨多次DAO调用的事务（工作单元），嵌套时使用保存点
+- 关闭前执行的回调（如刷新后台写入队列）
+- 内存模式：在内存文件系统中的工作副本上运行，定期用在线备份接口增量写回磁盘
 """
+import os
 import sqlite3
 import logging
-from typing import Optional
+import tempfile
+import threading
+import time
+from queue import Queue, Empty
+from typing import Any, Callable, Dict, List, Optional, Set
 from contextlib import contextmanager
 from threading import Lock
 
+# 默认的 PRAGMA 参数，可在 initialize 时覆盖
+DEFAULT_PRAGMAS: Dict[str, Any] = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'cache_size': -16000,       # 负数表示KB，约16MB
+    'mmap_size': 268435456,     # 256MB
+    'temp_store': 'MEMORY',
+    'busy_timeout': 5000,       # 毫秒
+}
+
+# 内存模式下覆盖的 PRAGMA 参数，工作副本可随时丢弃，提交时不必同步到磁盘
+MEMORY_PRAGMAS: Dict[str, Any] = {
+    'synchronous': 'OFF',
+}
+
+# 内存模式工作副本所在目录，优先使用内存文件系统，没有时退回系统临时目录（在磁盘上）
+MEMORY_DIR = '/dev/shm' if os.path.isdir('/dev/shm') else None
+
+
 class DatabaseConnectionPool:
     """单例模式的数据库连接池"""
     _instance = None
     _lock = Lock()
-    
+
     def __new__(cls):
         with cls._lock:
             if cls._instance is None:
                 cls._instance = super().__new__(cls)
                 cls._instance._initialized = False
             return cls._instance
-    
+
     def __init__(self):
         if not self._initialized:
             self.logger = logging.getLogger(self.__class__.__name__)
-            self._conn: Optional[sqlite3.Connection] = None
             self._lock = Lock()
             self._initialized = True
             self._db_path = None
-    
-    def initialize(self, db_path: str):
+            self._closed = False
+            self._pool_size = 0
+            self._timeout = 0.0
+            self._pragmas: Dict[str, Any] = {}
+            self._idle: Queue = Queue()
+            self._connections: List[sqlite3.Connection] = []
+            # 本次初始化以来借出且尚未归还的连接
+            self._checked_out: Set[sqlite3.Connection] = set()
+            # 有连接归还时通知，内存模式关闭时据此等待借出的连接
+            self._returned = threading.Condition(self._lock)
+            # 已占用容量、正在锁外创建的连接数
+            self._creating = 0
+            self._local = threading.local()
+            self._stats = self._empty_stats()
+            self._close_hooks: List[Callable[[], None]] = []
+            self._init_hooks: List[Callable[[], None]] = []
+            self._mode = 'disk'
+            self._snapshot_path: Optional[str] = None
+            self._snapshot_pages = 0
+            self._snapshot_sleep = 0.0
+            self._snapshot_lock = Lock()
+            self._snapshot_stop = threading.Event()
+            self._snapshot_thread: Optional[threading.Thread] = None
+
+    @staticmethod
+    def _empty_stats() -> Dict[str, float]:
+        return {
+            'created': 0,
+            'checkouts': 0,
+            'timeouts': 0,
+            'errors': 0,
+            'in_use': 0,
+            'max_in_use': 0,
+            'total_wait': 0.0,
+            'max_wait': 0.0,
+            'snapshots': 0,
+            'snapshot_errors': 0,
+            'last_snapshot_time': 0.0,
+        }
+
+    def initialize(self, db_path: str, pool_size: int = 5, timeout: float = 10.0,
+                   pragmas: Optional[Dict[str, Any]] = None, mode: str = 'disk',
+                   snapshot_interval: Optional[float] = 60.0, snapshot_pages: int = 256,
+                   snapshot_sleep: float = 0.005, migrate: bool = True):
         """
         初始化连接池
-        
+
+        内存模式下先将 db_path 复制到内存文件系统中的工作副本，所有连接都使用该副本，
+        每隔 snapshot_interval 秒以及关闭时将其快照写回 db_path。
+        初始化后默认执行尚未执行的数据库迁移，任何入口拿到的连接池都已是最新的表结构，
+        最后执行 add_init_hook 注册的初始化回调。
+
         Args:
             db_path: 数据库文件路径
+            pool_size: 连接池容量
+            timeout: 借出连接的最长等待秒数
+            pragmas: 覆盖默认值的 PRAGMA 参数，值为None表示不设置该项
+            mode: 'disk' 直接使用数据库文件，'memory' 使用内存中的工作副本
+            snapshot_interval: 内存模式下定期快照的间隔秒数，为None时只在关闭时快照
+            snapshot_pages: 快照时每一步复制的页数
+            snapshot_sleep: 快照的某一步遇到数据库忙或被锁定时，重试前等待的秒数
+            migrate: 是否执行数据库迁移
+
+        Raises:
+            ValueError: 不支持的模式
+        """
+        if mode not in ('disk', 'memory'):
+            raise ValueError(f"不支持的数据库模式: {mode}")
+        self.close()
+        pragmas = {**DEFAULT_PRAGMAS, **(MEMORY_PRAGMAS if mode == 'memory' else {}), **(pragmas or {})}
+        working_path = self._load_working_copy(db_path) if mode == 'memory' else db_path
+        with self._lock:
+            self._db_path = working_path
+            self._closed = False
+            self._mode = mode
+            self._snapshot_path = db_path if mode == 'memory' else None
+            self._snapshot_pages = max(int(snapshot_pages), 1)
+            self._snapshot_sleep = snapshot_sleep
+            self._pool_size = max(int(pool_size), 1)
+            self._timeout = timeout
+            self._pragmas = pragmas
+            self._idle = Queue()
+            # 上次初始化时借出的连接归还时直接关闭，不计入新的统计
+            self._checked_out = set()
+            self._stats = self._empty_stats()
+            self.logger.info(f"初始化数据库连接池: {db_path}，容量 {self._pool_size}，模式 {mode}")
+        if migrate:
+            # 迁移模块依赖本模块的 db_pool，在此处导入避免循环导入
+            from dao.migrations import migrate as run_migrations
+            run_migrations()
+        if mode == 'memory' and snapshot_interval:
+            self._start_snapshots(snapshot_interval)
+        with self._lock:
+            hooks = list(self._init_hooks)
+        self._run_hooks(hooks, "初始化")
+
+    def _load_working_copy(self, db_path: str) -> str:
+        """将数据库文件复制为内存文件系统中的工作副本，返回副本路径"""
+        if MEMORY_DIR is None:
+            self.logger.warning("未找到内存文件系统 /dev/shm，内存模式的工作副本将放在磁盘上的临时目录")
+        fd, working_path = tempfile.mkstemp(prefix='zhetian3-', suffix='.db', dir=MEMORY_DIR)
+        os.close(fd)
+        if os.path.exists(db_path):
+            source = sqlite3.connect(db_path)
+            target = sqlite3.connect(working_path)
+            try:
+                source.backup(target)
+            finally:
+                target.close()
+                source.close()
+        self.logger.info(f"数据库已加载到工作副本: {working_path}")
+        return working_path
+
+    def _start_snapshots(self, interval: float) -> None:
+        """启动定期快照线程"""
+        self._snapshot_stop.clear()
+
+        def run():
+            while not self._snapshot_stop.wait(interval):
+                self.snapshot()
+
+        self._snapshot_thread = threading.Thread(target=run, name='DatabaseSnapshot', daemon=True)
+        self._snapshot_thread.start()
+
+    def snapshot(self) -> bool:
         """
+        将内存模式的工作副本快照写回磁盘
+
+        快照连接先开启读事务固定 WAL 中的一致视图，其他连接的写入只追加到 WAL，
+        复制期间可以继续进行；页面按 snapshot_pages 分步复制，写完临时文件后原子替换目标文件。
+
+        Returns:
+            bool: 是否成功，非内存模式时为False
+        """
+        if self._mode != 'memory' or not self._db_path:
+            return False
+        with self._snapshot_lock:
+            start = time.perf_counter()
+            temp_path = f"{self._snapshot_path}.tmp"
+            source = target = None
+            try:
+                source = sqlite3.connect(self._db_path, timeout=self._timeout, check_same_thread=False)
+                source.execute('BEGIN')
+                source.execute('SELECT COUNT(*) FROM sqlite_master').fetchone()
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+                target = sqlite3.connect(temp_path)
+                source.backup(target, pages=self._snapshot_pages, sleep=self._snapshot_sleep)
+                target.close()
+                target = None
+                # 旧的 WAL 文件属于被替换的数据库，留下会损坏新快照
+                for suffix in ('-wal', '-shm'):
+                    if os.path.exists(self._snapshot_path + suffix):
+                        os.remove(self._snapshot_path + suffix)
+                os.replace(temp_path, self._snapshot_path)
+            except (sqlite3.Error, OSError) as e:
+                with self._lock:
+                    self._stats['snapshot_errors'] += 1
+                self.logger.error(f"数据库快照失败: {str(e)}")
+                return False
+            finally:
+                if target is not None:
+                    target.close()
+                if source is not None:
+                    source.close()
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self._stats['snapshots'] += 1
+                self._stats['last_snapshot_time'] = elapsed
+            self.logger.debug(f"数据库快照已写入 {self._snapshot_path}，耗时 {elapsed * 1000:.1f} 毫秒")
+            return True
+
+    def _create_connection(self) -> sqlite3.Connection:
+        """创建新连接并应用 PRAGMA 参数"""
+        try:
+            conn = sqlite3.connect(self._db_path, timeout=self._timeout, check_same_thread=False)
+            for name, value in self._pragmas.items():
+                if value is not None:
+                    conn.execute(f"PRAGMA {name} = {value}")
+        except sqlite3.Error as e:
+            self.logger.error(f"数据库连接错误: {str(e)}")
+            raise
+        self.logger.debug("创建新的数据库连接")
+        return conn
+
+    def _checkout(self) -> sqlite3.Connection:
+        """借出一个连接，池中无空闲连接且已达容量时等待"""
+        start = time.perf_counter()
+        conn = None
+        with self._lock:
+            reserved = self._idle.empty() and len(self._connections) + self._creating < self._pool_size
+            if reserved:
+                self._creating += 1
+        if reserved:
+            # 在锁外打开连接，慢速打开不阻塞其他线程借出和归还
+            try:
+                conn = self._create_connection()
+            finally:
+                with self._lock:
+                    self._creating -= 1
+                    if conn is not None:
+                        self._connections.append(conn)
+                        self._stats['created'] += 1
+        if conn is None:
+            try:
+                conn = self._idle.get(timeout=self._timeout)
+            except Empty:
+                with self._lock:
+                    self._stats['timeouts'] += 1
+                self.logger.error(f"获取数据库连接超时（{self._timeout}秒）")
+                raise TimeoutError("获取数据库连接超时")
+
+        wait = time.perf_counter() - start
+        with self._lock:
+            self._checked_out.add(conn)
+            stats = self._stats
+            stats['checkouts'] += 1
+            stats['in_use'] += 1
+            stats['max_in_use'] = max(stats['max_in_use'], stats['in_use'])
+            stats['total_wait'] += wait
+            stats['max_wait'] = max(stats['max_wait'], wait)
+        return conn
+
+    def _checkin(self, conn: sqlite3.Connection) -> None:
+        """归还连接，未结束的事务会被回滚，已关闭或上次初始化时借出的连接直接关闭"""
+        if conn.in_transaction:
+            conn.rollback()
+            self.logger.debug("归还连接时存在未提交的事务，已回滚")
         with self._lock:
-            self._db_path = db_path
-            self.logger.info(f"初始化数据库连接池: {db_path}")
-    
+            if conn in self._checked_out:
+                self._checked_out.discard(conn)
+                self._stats['in_use'] -= 1
+                self._returned.notify_all()
+            if conn not in self._connections:
+                conn.close()
+                return
+        self._idle.put(conn)
+
     @contextmanager
     def get_connection(self):
-        """获取数据库连接"""
+        """
+        获取数据库连接
+
+        同一线程内嵌套调用时返回同一个连接，最外层退出时归还到池中。
+
+        Raises:
+            RuntimeError: 连接池未初始化或已关闭
+            TimeoutError: 等待空闲连接超时
+        """
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            yield conn
+            return
+
+        if self._closed:
+            raise RuntimeError("数据库连接池已关闭，请重新调用 initialize 方法")
         if not self._db_path:
             raise RuntimeError("数据库连接池未初始化，请先调用 initialize 方法")
-            
-        with self._lock:
-            if self._conn is None:
-                try:
-                    self._conn = sqlite3.connect(self._db_path)
-                    self.logger.debug("创建新的数据库连接")
-                except sqlite3.Error as e:
-                    self.logger.error(f"数据库连接错误: {str(e)}")
-                    raise
-            
+
+        conn = self._checkout()
+        self._local.conn = conn
         try:
-            yield self._conn
+            yield conn
         except Exception as e:
+            with self._lock:
+                self._stats['errors'] += 1
             self.logger.error(f"数据库操作错误: {str(e)}")
             raise
-    
+        finally:
+            self._local.conn = None
+            self._checkin(conn)
+
+    @contextmanager
+    def transaction(self):
+        """
+        开启一个工作单元事务
+
+        块内当前线程的所有数据库操作共用同一个连接，退出时一次提交，抛出异常时整体回滚。
+        嵌套调用时使用保存点，内层回滚不影响外层已执行的操作。
+
+        Yields:
+            sqlite3.Connection: 事务所在的连接
+
+        Raises:
+            RuntimeError: 块内有数据库操作失败（即使调用方已吞掉该错误），事务已回滚
+        """
+        with self.get_connection() as conn:
+            scopes = getattr(self._local, 'tx_scopes', None)
+            if scopes is None:
+                scopes = self._local.tx_scopes = []
+            depth = len(scopes)
+            savepoint = f"sp_{depth}"
+            if depth == 0:
+                conn.execute('BEGIN IMMEDIATE')
+            else:
+                conn.execute(f"SAVEPOINT {savepoint}")
+            scopes.append({'failed': False})
+            try:
+                yield conn
+            except BaseException:
+                scopes.pop()
+                self._rollback_scope(conn, depth, savepoint)
+                raise
+            scope = scopes.pop()
+            if scope['failed']:
+                self._rollback_scope(conn, depth, savepoint)
+                raise RuntimeError("事务中存在失败的数据库操作，已回滚")
+            if depth == 0:
+                conn.commit()
+                self.logger.debug("事务已提交")
+            else:
+                conn.execute(f"RELEASE {savepoint}")
+
+    def _rollback_scope(self, conn: sqlite3.Connection, depth: int, savepoint: str) -> None:
+        """回滚最外层事务或内层保存点"""
+        if depth == 0:
+            conn.rollback()
+            self.logger.warning("事务已回滚")
+        else:
+            conn.execute(f"ROLLBACK TO {savepoint}")
+            conn.execute(f"RELEASE {savepoint}")
+            self.logger.warning(f"已回滚到保存点 {savepoint}")
+
+    def in_transaction(self) -> bool:
+        """当前线程是否处于工作单元事务中"""
+        return bool(getattr(self._local, 'tx_scopes', None))
+
+    def mark_rollback_only(self) -> None:
+        """将当前线程最内层的事务标记为只能回滚"""
+        scopes = getattr(self._local, 'tx_scopes', None)
+        if scopes:
+            scopes[-1]['failed'] = True
+
+    def stats(self) -> Dict[str, float]:
+        """
+        连接池健康指标快照
+
+        Returns:
+            Dict[str, float]: 包含已创建连接数、借出次数、超时次数、错误次数、
+                当前/峰值借出数、平均/最大等待秒数
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats['size'] = len(self._connections)
+            stats['idle'] = self._idle.qsize()
+        stats['avg_wait'] = stats['total_wait'] / stats['checkouts'] if stats['checkouts'] else 0.0
+        return stats
+
+    def add_close_hook(self, hook: Callable[[], None]) -> None:
+        """
+        注册关闭回调，close 时在关闭连接之前按注册的逆序执行一次
+
+        Args:
+            hook: 无参数的回调函数
+        """
+        with self._lock:
+            if hook not in self._close_hooks:
+                self._close_hooks.append(hook)
+
+    def remove_close_hook(self, hook: Callable[[], None]) -> None:
+        """取消注册的关闭回调"""
+        with self._lock:
+            if hook in self._close_hooks:
+                self._close_hooks.remove(hook)
+
+    def add_init_hook(self, hook: Callable[[], None]) -> None:
+        """
+        注册初始化回调，每次 initialize 完成后按注册顺序执行
+
+        与关闭回调不同，初始化回调在执行后仍保留，用于随连接池重新初始化而重启的组件。
+
+        Args:
+            hook: 无参数的回调函数
+        """
+        with self._lock:
+            if hook not in self._init_hooks:
+                self._init_hooks.append(hook)
+
+    def remove_init_hook(self, hook: Callable[[], None]) -> None:
+        """取消注册的初始化回调"""
+        with self._lock:
+            if hook in self._init_hooks:
+                self._init_hooks.remove(hook)
+
+    def _run_hooks(self, hooks: List[Callable[[], None]], kind: str) -> None:
+        """依次执行回调，单个回调失败只记录日志"""
+        for hook in hooks:
+            try:
+                hook()
+            except Exception as e:
+                self.logger.error(f"执行{kind}回调失败: {str(e)}")
+
+    def _wait_for_checkins(self) -> None:
+        """等待其他线程借出的连接归还，超时后记录被放弃的连接数"""
+        own = getattr(self._local, 'conn', None)
+        deadline = time.monotonic() + self._timeout
+        with self._returned:
+            while True:
+                outstanding = len(self._checked_out - {own})
+                if not outstanding:
+                    return
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._returned.wait(remaining)
+        self.logger.warning(f"关闭时有 {outstanding} 个借出的连接在 {self._timeout} 秒内未归还，已放弃，"
+                            f"之后通过这些连接的写入不会进入最后一次快照")
+
     def close(self):
-        """关闭数据库连接"""
+        """
+        执行关闭回调，然后关闭所有空闲连接，借出中的连接在归还时关闭
+
+        关闭后 get_connection 会抛出 RuntimeError，直到再次调用 initialize。
+        内存模式下先等待借出的连接归还（最多 timeout 秒），再写入最后一次快照并删除工作副本。
+        """
+        with self._lock:
+            hooks, self._close_hooks = self._close_hooks, []
+        self._run_hooks(hooks[::-1], "关闭")
+
+        if self._mode == 'memory':
+            with self._lock:
+                self._closed = True
+            self._snapshot_stop.set()
+            if self._snapshot_thread is not None:
+                self._snapshot_thread.join()
+                self._snapshot_thread = None
+            self._wait_for_checkins()
+            self.snapshot()
+
+        closed = 0
         with self._lock:
-            if self._conn:
-                self._conn.close()
-                self._conn = None
-                self.logger.debug("关闭数据库连接")
+            self._closed = True
+            self._connections = []
+            while not self._idle.empty():
+                self._idle.get_nowait().close()
+                closed += 1
+            working_path = self._db_path if self._mode == 'memory' else None
+            if working_path:
+                self._db_path = None
+                self._mode = 'disk'
+        if closed:
+            self.logger.debug(f"关闭数据库连接，共 {closed} 个")
+        if working_path:
+            for suffix in ('', '-wal', '-shm'):
+                if os.path.exists(working_path + suffix):
+                    os.remove(working_path + suffix)
+            self.logger.info(f"已删除工作副本: {working_path}")
 
 # 全局连接池实例
-db_pool = DatabaseConnectionPool() 
\ No newline at end of file
+db_pool = DatabaseConnectionPool()
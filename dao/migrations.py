@@ -0,0 +1,140 @@
+"""
+数据库版本迁移模块
+
+按版本号顺序执行数据库结构迁移，已执行的版本记录在 schema_version 表中，
+每个迁移只会执行一次。连接池 initialize 时会自动调用 migrate()。
+
+新增迁移时在 MIGRATIONS 末尾追加 (版本号, 描述, 迁移函数)，版本号必须递增，
+已发布的迁移不要修改。迁移不要依赖会演进的业务代码（如 SpiritRoot 的灵根目录），
+需要的规则在迁移中固定一份，保证旧迁移在任何时候执行的结果都相同。
+"""
+import logging
+import sqlite3
+from typing import Callable, List, Optional, Tuple
+
+from dao.connectionPool import db_pool
+
+logger = logging.getLogger(__name__)
+
+
+def _create_players(conn: sqlite3.Connection) -> None:
+    """创建玩家表（兼容迁移系统引入前已存在的数据库）"""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS players (
+            id INTEGER PRIMARY KEY,
+            name TEXT NOT NULL,
+            age INTEGER DEFAULT 0,
+            sex INTEGER DEFAULT 0,
+            is_master INTEGER DEFAULT 0,
+            is_dead INTEGER DEFAULT 0,
+            father_id INTEGER DEFAULT -1,
+            mother_id INTEGER DEFAULT -1,
+            teacher_id INTEGER DEFAULT -1,
+            companion_id INTEGER DEFAULT -1,
+            root TEXT,
+            attribute TEXT,
+            base_breakup_probability REAL DEFAULT -1,
+            realm_level INTEGER DEFAULT 1,
+            current_exp REAL DEFAULT 0.0
+        )
+    ''')
+
+
+# 版本2写入 root_code 时使用的编码规则：级别序号 << 8 | 属性位掩码
+V2_ROOT_ATTRIBUTES = '金木水火土风冰空'
+V2_ROOT_LEVELS = ('普通', '变异', '地', '天')
+
+
+def _encode_root_v2(root: Optional[str]) -> Optional[int]:
+    """按版本2的规则编码灵根文本，非法灵根返回None"""
+    if not isinstance(root, str):
+        return None
+    separator = '-' if '-' in root else '_'
+    parts = root.split(separator)
+    if len(parts) != 2:
+        return None
+    attributes, level = parts
+    if (level not in V2_ROOT_LEVELS or not 1 <= len(attributes) <= 5
+            or len(set(attributes)) != len(attributes)
+            or any(attribute not in V2_ROOT_ATTRIBUTES for attribute in attributes)):
+        return None
+    mask = sum(1 << V2_ROOT_ATTRIBUTES.index(attribute) for attribute in attributes)
+    return (V2_ROOT_LEVELS.index(level) << 8) | mask
+
+
+def _add_root_code(conn: sqlite3.Connection) -> None:
+    """添加灵根编码列，并由 root 文本回填"""
+    columns = [row[1] for row in conn.execute('PRAGMA table_info(players)')]
+    if 'root_code' not in columns:
+        conn.execute('ALTER TABLE players ADD COLUMN root_code INTEGER')
+
+    rows = conn.execute('SELECT id, root FROM players WHERE root_code IS NULL').fetchall()
+    params = [(code, player_id) for player_id, root in rows
+              for code in (_encode_root_v2(root),) if code is not None]
+    conn.executemany('UPDATE players SET root_code = ? WHERE id = ?', params)
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_players_root_code ON players (root_code)')
+    logger.info(f"已回填灵根编码，共 {len(params)} 条")
+
+
+def _add_relation_indexes(conn: sqlite3.Connection) -> None:
+    """为在世玩家的亲属、师承关系列添加部分索引"""
+    for column in ('father_id', 'mother_id', 'teacher_id'):
+        conn.execute(f'''
+            CREATE INDEX IF NOT EXISTS idx_players_{column}_alive
+            ON players ({column}) WHERE is_dead = 0
+        ''')
+
+
+def _add_master_index(conn: sqlite3.Connection) -> None:
+    """为在世掌门查询添加部分索引"""
+    conn.execute('''
+        CREATE INDEX IF NOT EXISTS idx_players_master_alive
+        ON players (is_master) WHERE is_dead = 0
+    ''')
+
+
+MIGRATIONS: List[Tuple[int, str, Callable[[sqlite3.Connection], None]]] = [
+    (1, '创建 players 表', _create_players),
+    (2, '添加 root_code 灵根编码列', _add_root_code),
+    (3, '添加在世玩家的关系列部分索引', _add_relation_indexes),
+    (4, '添加在世掌门部分索引', _add_master_index),
+]
+
+
+def current_version() -> int:
+    """
+    获取数据库当前的结构版本
+
+    Returns:
+        int: 已执行的最大迁移版本号，未执行过任何迁移时为0
+    """
+    with db_pool.get_connection() as conn:
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS schema_version (
+                version INTEGER PRIMARY KEY,
+                description TEXT,
+                applied_at TEXT DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        return conn.execute('SELECT COALESCE(MAX(version), 0) FROM schema_version').fetchone()[0]
+
+
+def migrate() -> int:
+    """
+    执行所有尚未执行的迁移，每个迁移在独立事务中完成
+
+    Returns:
+        int: 迁移后的结构版本号
+    """
+    version = current_version()
+    for target, description, apply in MIGRATIONS:
+        if target <= version:
+            continue
+        with db_pool.transaction() as conn:
+            apply(conn)
+            conn.execute('INSERT INTO schema_version (version, description) VALUES (?, ?)',
+                         (target, description))
+        version = target
+        logger.info(f"数据库迁移到版本 {target}: {description}")
+    logger.debug(f"数据库结构版本: {version}")
+    return version
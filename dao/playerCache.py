@@ -0,0 +1,128 @@
+"""
+玩家缓存模块
+
+为 PlayerDAO 提供身份映射和 LRU 读缓存：
+- 身份映射（弱引用）保证同一会话中每个ID只对应一个 PlayerModel 对象
+- 有界 LRU 缓存（强引用）让热点玩家（掌门、伴侣、师父）常驻内存
+"""
+import logging
+import weakref
+from collections import OrderedDict
+from threading import Lock
+from typing import Dict, Optional
+
+from model.playerModel import PlayerModel
+
+
+class PlayerCache:
+    """
+    玩家身份映射与 LRU 缓存
+
+    Attributes:
+        max_size (int): LRU 缓存容量，为0时只保留身份映射
+        hits (int): 命中次数
+        misses (int): 未命中次数
+    """
+
+    def __init__(self, max_size: int = 1024):
+        """
+        初始化玩家缓存
+
+        Args:
+            max_size: LRU 缓存容量
+        """
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._lock = Lock()
+        self._lru: "OrderedDict[int, PlayerModel]" = OrderedDict()
+        self._identity: "weakref.WeakValueDictionary[int, PlayerModel]" = weakref.WeakValueDictionary()
+
+    def __len__(self) -> int:
+        return len(self._lru)
+
+    def get(self, player_id: int) -> Optional[PlayerModel]:
+        """
+        读取缓存中的玩家，并计入命中统计
+
+        Args:
+            player_id: 玩家ID
+
+        Returns:
+            Optional[PlayerModel]: 缓存的玩家对象，未命中时返回None
+        """
+        with self._lock:
+            player = self._lru.get(player_id)
+            if player is None:
+                player = self._identity.get(player_id)
+            if player is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._touch(player_id, player)
+            return player
+
+    def identity(self, player_id: int) -> Optional[PlayerModel]:
+        """只查询身份映射，不计入统计、不调整LRU顺序"""
+        return self._identity.get(player_id)
+
+    def register(self, player: PlayerModel) -> PlayerModel:
+        """
+        将玩家登记到身份映射（不放入LRU）
+
+        Returns:
+            PlayerModel: 身份映射中已有的同ID对象，没有时为传入的对象
+        """
+        with self._lock:
+            existing = self._identity.get(player.id)
+            if existing is not None:
+                return existing
+            self._identity[player.id] = player
+            return player
+
+    def put(self, player: PlayerModel) -> None:
+        """写入玩家对象，放入身份映射和LRU"""
+        with self._lock:
+            self._identity[player.id] = player
+            self._touch(player.id, player)
+
+    def _touch(self, player_id: int, player: PlayerModel) -> None:
+        """将玩家移到LRU最近使用端，超出容量时淘汰最久未用的"""
+        if self.max_size <= 0:
+            return
+        self._lru[player_id] = player
+        self._lru.move_to_end(player_id)
+        while len(self._lru) > self.max_size:
+            self._lru.popitem(last=False)
+
+    def invalidate(self, player_id: int) -> None:
+        """使指定玩家的缓存失效"""
+        with self._lock:
+            self._lru.pop(player_id, None)
+            self._identity.pop(player_id, None)
+
+    def clear(self) -> None:
+        """清空缓存"""
+        with self._lock:
+            self._lru.clear()
+            self._identity.clear()
+        self.logger.debug("玩家缓存已清空")
+
+    def stats(self) -> Dict[str, float]:
+        """
+        缓存统计快照
+
+        Returns:
+            Dict[str, float]: 容量、LRU大小、身份映射大小、命中/未命中次数及命中率
+        """
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'max_size': self.max_size,
+                'size': len(self._lru),
+                'identity_size': len(self._identity),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / total if total else 0.0,
+            }
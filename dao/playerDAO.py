@@ -5,107 +5,357 @@
 使用 SQLite 数据库实现。
 """
 import logging
-from typing import Optional, List
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, Optional, List, Tuple
 from dao.baseDAO import BaseDAO
+from dao.playerCache import PlayerCache
 from model.playerModel import PlayerModel
+from model.playerTable import PlayerTable
 
 class PlayerDAO(BaseDAO):
     """
     玩家数据访问对象
     
     负责处理玩家数据的数据库操作，包括：
-    - 创建玩家数据表
     - 插入新玩家数据
     - 更新玩家数据
     - 查询玩家数据
     - 软删除玩家数据（将is_dead设置为True）
+
+    每个实例是一个会话，带有身份映射和 LRU 读缓存：同一ID只对应一个玩家对象，
+    写操作同步更新缓存，软删除和绕过模型的批量写入会使缓存失效。
     """
     
-    def __init__(self):
-        """初始化玩家DAO"""
+    def __init__(self, cache_size: int = 1024):
+        """
+        初始化玩家DAO，表结构由 dao.migrations 在启动时创建
+
+        Args:
+            cache_size: LRU 缓存容量，为0时只保留身份映射
+        """
         super().__init__()  # 不再传入 db_path
-        self._init_db()
-    
-    def _init_db(self) -> None:
-        """初始化数据库表结构"""
-        self.execute_update('''
-            CREATE TABLE IF NOT EXISTS players (
-                id INTEGER PRIMARY KEY,
-                name TEXT NOT NULL,
-                age INTEGER DEFAULT 0,
-                sex INTEGER DEFAULT 0,
-                is_master INTEGER DEFAULT 0,
-                is_dead INTEGER DEFAULT 0,
-                father_id INTEGER DEFAULT -1,
-                mother_id INTEGER DEFAULT -1,
-                teacher_id INTEGER DEFAULT -1,
-                companion_id INTEGER DEFAULT -1,
-                root TEXT,
-                attribute TEXT,
-                base_breakup_probability REAL DEFAULT -1,
-                realm_level INTEGER DEFAULT 1,
-                current_exp REAL DEFAULT 0.0
-            )
-        ''')
-        self.logger.debug("数据库表初始化完成")
-    
-    def insert(self, player: PlayerModel) -> bool:
-        """插入新玩家数据"""
-        query = '''
-            INSERT INTO players (
-                name, age, sex, is_master, is_dead,
-                father_id, mother_id, teacher_id, companion_id,
-                root, attribute, base_breakup_probability,
-                realm_level, current_exp
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        '''
-        params = (
+        self.cache = PlayerCache(cache_size)
+
+    @contextmanager
+    def transaction(self):
+        """
+        开启工作单元事务，回滚时清空缓存以丢弃未提交的修改
+
+        回滚不会恢复块内已保存对象的修改标记，这些对象与数据库不再一致，应重新查询。
+        """
+        try:
+            with super().transaction() as conn:
+                yield conn
+        except BaseException:
+            self.cache.clear()
+            raise
+
+    def cache_stats(self) -> Dict[str, Any]:
+        """玩家缓存的命中统计"""
+        return self.cache.stats()
+
+    INSERT_QUERY = '''
+        INSERT INTO players (
+            name, age, sex, is_master, is_dead,
+            father_id, mother_id, teacher_id, companion_id,
+            root, attribute, base_breakup_probability,
+            realm_level, current_exp, root_code
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    '''
+
+    UPSERT_QUERY = '''
+        INSERT INTO players (
+            name, age, sex, is_master, is_dead,
+            father_id, mother_id, teacher_id, companion_id,
+            root, attribute, base_breakup_probability,
+            realm_level, current_exp, root_code, id
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(id) DO UPDATE SET
+            name = excluded.name, age = excluded.age, sex = excluded.sex,
+            is_master = excluded.is_master, is_dead = excluded.is_dead,
+            father_id = excluded.father_id, mother_id = excluded.mother_id,
+            teacher_id = excluded.teacher_id, companion_id = excluded.companion_id,
+            root = excluded.root, attribute = excluded.attribute,
+            base_breakup_probability = excluded.base_breakup_probability,
+            realm_level = excluded.realm_level, current_exp = excluded.current_exp,
+            root_code = excluded.root_code
+    '''
+
+    # 批量写入时每次 executemany 的行数
+    BULK_CHUNK_SIZE = 1000
+
+    # 分页查询允许的排序字段
+    PAGE_SORT_KEYS = ('id', 'name', 'age', 'realm_level', 'current_exp')
+
+    # 修炼进度列，顺序与 update_cultivation_many 的行元组一致
+    CULTIVATION_COLUMNS = ('age', 'realm_level', 'current_exp', 'is_dead')
+
+    # 可写列，顺序与 _player_params 一致
+    WRITE_COLUMNS = (
+        'name', 'age', 'sex', 'is_master', 'is_dead',
+        'father_id', 'mother_id', 'teacher_id', 'companion_id',
+        'root', 'attribute', 'base_breakup_probability',
+        'realm_level', 'current_exp', 'root_code'
+    )
+
+    # 按列组合缓存的 UPDATE 语句
+    _update_queries: Dict[Tuple[str, ...], str] = {}
+
+    # IN (...) 查询每块的ID数，低于 SQLite 默认的参数个数上限
+    IN_CHUNK_SIZE = 500
+
+    @staticmethod
+    def _player_params(player: PlayerModel) -> tuple:
+        """玩家对象转换为写入参数（不含ID），顺序与 INSERT_QUERY 一致"""
+        return (
             player.name, player.age, player.sex,
             player.isMaster, player.isDead,
             player.father_id, player.mother_id, player.teacher_id,
             player.companion_id, player.root, player.attribute,
             player.base_breakup_probability,
-            player.realm_level, player.current_exp
+            player.realm_level, player.current_exp, player.root_code
         )
-        
-        success = self.execute_update(query, params)
-        if success:
-            self.logger.debug(f"成功插入玩家数据: {player.name}")
-        return success
+
+    @classmethod
+    def _update_query(cls, columns: Tuple[str, ...]) -> str:
+        """生成只更新指定列的 UPDATE 语句，按列组合缓存"""
+        query = cls._update_queries.get(columns)
+        if query is None:
+            assignments = ', '.join(f'{column} = ?' for column in columns)
+            query = cls._update_queries[columns] = f'UPDATE players SET {assignments} WHERE id = ?'
+        return query
+
+    @classmethod
+    def _dirty_write_columns(cls, player: PlayerModel) -> Tuple[str, ...]:
+        """玩家已修改的可写列，顺序与 WRITE_COLUMNS 一致"""
+        dirty = player.dirty_columns
+        return tuple(column for column in cls.WRITE_COLUMNS if column in dirty)
+
+    def insert(self, player: PlayerModel) -> bool:
+        """插入新玩家数据，并将生成的ID写回 player.id"""
+        try:
+            with self.get_cursor() as cursor:
+                cursor.execute(self.INSERT_QUERY, self._player_params(player))
+                player.id = cursor.lastrowid
+        except Exception as e:
+            self.logger.error(f"插入玩家数据失败: {player.name}, 错误: {str(e)}")
+            return False
+        player.mark_clean()
+        self.cache.put(player)
+        self.logger.debug(f"成功插入玩家数据: {player.name} (ID={player.id})")
+        return True
     
     def update(self, player: PlayerModel) -> bool:
-        """更新玩家数据"""
-        query = '''
-            UPDATE players SET
-                name = ?, age = ?, sex = ?,
-                is_master = ?, is_dead = ?,
-                father_id = ?, mother_id = ?,
-                teacher_id = ?, companion_id = ?,
-                root = ?, attribute = ?,
-                base_breakup_probability = ?,
-                realm_level = ?, current_exp = ?
-            WHERE id = ?
-        '''
-        params = (
-            player.name, player.age, player.sex,
-            player.isMaster, player.isDead,
-            player.father_id, player.mother_id,
-            player.teacher_id, player.companion_id,
-            player.root, player.attribute,
-            player.base_breakup_probability,
-            player.realm_level, player.current_exp,
-            player.id
-        )
+        """更新玩家数据，只写入已修改的列，未修改的玩家直接跳过"""
+        columns = self._dirty_write_columns(player)
+        if not columns:
+            self.logger.debug(f"玩家数据未修改，跳过更新: {player.name} (ID={player.id})")
+            return True
+        params = player.column_values(columns) + (player.id,)
         
-        success = self.execute_update(query, params)
+        success = self.execute_update(self._update_query(columns), params)
         if success:
+            player.mark_clean()
+            self.cache.put(player)
             self.logger.debug(f"成功更新玩家数据: {player.name} (ID={player.id})")
         else:
+            self.cache.invalidate(player.id)
             self.logger.warning(f"更新玩家数据失败: {player.name} (ID={player.id})")
             # 可以在这里添加更多的诊断信息
             self.logger.debug(f"更新参数: {params}")
         return success
+
+    def _log_throughput(self, action: str, count: int, start: float) -> None:
+        """记录批量操作的吞吐量"""
+        elapsed = time.perf_counter() - start
+        rate = count / elapsed if elapsed > 0 else float('inf')
+        self.logger.info(f"{action} {count} 条玩家数据，耗时 {elapsed * 1000:.1f} 毫秒（{rate:.0f} 条/秒）")
+
+    def insert_many(self, players: List[PlayerModel]) -> int:
+        """
+        在单个事务中批量插入玩家数据，并将生成的ID写回各玩家对象
+
+        在写事务内读取当前最大ID，新行的ID即为其后连续递增的值。
+
+        Args:
+            players: 玩家对象列表
+
+        Returns:
+            int: 插入的行数，失败时为0
+        """
+        if not players:
+            return 0
+        start = time.perf_counter()
+        try:
+            with self.bulk_cursor() as cursor:
+                next_id = cursor.execute('SELECT COALESCE(MAX(id), 0) FROM players').fetchone()[0] + 1
+                for offset in range(0, len(players), self.BULK_CHUNK_SIZE):
+                    chunk = players[offset:offset + self.BULK_CHUNK_SIZE]
+                    cursor.executemany(self.INSERT_QUERY, [self._player_params(p) for p in chunk])
+        except Exception as e:
+            self.logger.error(f"批量插入玩家数据失败: {str(e)}")
+            return 0
+        for offset, player in enumerate(players):
+            player.id = next_id + offset
+            player.mark_clean()
+            self.cache.register(player)
+        self._log_throughput("批量插入", len(players), start)
+        return len(players)
+
+    def update_many(self, players: List[PlayerModel]) -> int:
+        """
+        在单个事务中批量更新玩家数据
+
+        按已修改的列组合分组，每组使用只更新这些列的语句，未修改的玩家直接跳过。
+
+        Args:
+            players: 玩家对象列表
+
+        Returns:
+            int: 实际更新的行数，失败时为0
+        """
+        groups: Dict[Tuple[str, ...], List[PlayerModel]] = {}
+        for player in players:
+            columns = self._dirty_write_columns(player)
+            if columns:
+                groups.setdefault(columns, []).append(player)
+        if not groups:
+            return 0
+        start = time.perf_counter()
+        updated = 0
+        try:
+            with self.bulk_cursor() as cursor:
+                for columns, group in groups.items():
+                    query = self._update_query(columns)
+                    for offset in range(0, len(group), self.BULK_CHUNK_SIZE):
+                        chunk = group[offset:offset + self.BULK_CHUNK_SIZE]
+                        cursor.executemany(query, [p.column_values(columns) + (p.id,) for p in chunk])
+                        updated += cursor.rowcount
+        except Exception as e:
+            for player in players:
+                self.cache.invalidate(player.id)
+            self.logger.error(f"批量更新玩家数据失败: {str(e)}")
+            return 0
+        for group in groups.values():
+            for player in group:
+                player.mark_clean()
+                self.cache.register(player)
+        self._log_throughput("批量更新", updated, start)
+        return updated
+
+    def upsert_many(self, players: List[PlayerModel]) -> int:
+        """
+        在单个事务中批量插入或更新玩家数据
+
+        ID大于0的玩家按ID插入或覆盖，其余玩家作为新玩家插入并写回生成的ID。
+
+        Args:
+            players: 玩家对象列表
+
+        Returns:
+            int: 写入的行数，失败时为0
+        """
+        if not players:
+            return 0
+        start = time.perf_counter()
+        existing = [p for p in players if p.id > 0]
+        new = [p for p in players if p.id <= 0]
+        try:
+            with self.bulk_cursor() as cursor:
+                for offset in range(0, len(existing), self.BULK_CHUNK_SIZE):
+                    chunk = existing[offset:offset + self.BULK_CHUNK_SIZE]
+                    cursor.executemany(self.UPSERT_QUERY, [self._player_params(p) + (p.id,) for p in chunk])
+                next_id = cursor.execute('SELECT COALESCE(MAX(id), 0) FROM players').fetchone()[0] + 1
+                for offset in range(0, len(new), self.BULK_CHUNK_SIZE):
+                    chunk = new[offset:offset + self.BULK_CHUNK_SIZE]
+                    cursor.executemany(self.INSERT_QUERY, [self._player_params(p) for p in chunk])
+        except Exception as e:
+            for player in existing:
+                self.cache.invalidate(player.id)
+            self.logger.error(f"批量写入玩家数据失败: {str(e)}")
+            return 0
+        for offset, player in enumerate(new):
+            player.id = next_id + offset
+        for player in players:
+            player.mark_clean()
+            self.cache.register(player)
+        self._log_throughput("批量写入", len(players), start)
+        return len(players)
     
+    def update_columns_many(self, columns: Tuple[str, ...], rows: List[tuple]) -> int:
+        """
+        在单个事务中批量更新指定列
+
+        Args:
+            columns: 要更新的列名，取值见 WRITE_COLUMNS
+            rows: 每行为各列的值加上末尾的玩家ID
+
+        Returns:
+            int: 实际更新的行数
+
+        Raises:
+            ValueError: 不可写的列名
+            sqlite3.Error: 写入失败，事务已回滚
+        """
+        invalid = [column for column in columns if column not in self.WRITE_COLUMNS]
+        if invalid:
+            raise ValueError(f"不可写的列: {', '.join(invalid)}")
+        if not rows:
+            return 0
+        query = self._update_query(tuple(columns))
+        updated = 0
+        with self.bulk_cursor() as cursor:
+            for offset in range(0, len(rows), self.BULK_CHUNK_SIZE):
+                cursor.executemany(query, rows[offset:offset + self.BULK_CHUNK_SIZE])
+                updated += cursor.rowcount
+        return updated
+
+    def update_cultivation_many(self, rows: List[Tuple[int, int, float, int, int]]) -> bool:
+        """
+        批量回写修炼进度（年龄、境界、修为、是否死亡）
+
+        Args:
+            rows: (age, realm_level, current_exp, is_dead, id) 元组列表
+
+        Returns:
+            bool: 操作是否成功
+        """
+        query = '''
+            UPDATE players SET
+                age = ?, realm_level = ?,
+                current_exp = ?, is_dead = ?
+            WHERE id = ?
+        '''
+        success = self.execute_many(query, rows)
+        if success:
+            for row in rows:
+                self._sync_cultivation(row)
+            self.logger.debug(f"成功批量回写修炼进度，共 {len(rows)} 条")
+        return success
+
+    def _sync_cultivation(self, row: Tuple[int, int, float, int, int]) -> None:
+        """
+        让身份映射中的对象与直接写库的修炼进度保持一致
+
+        值相同的对象保持不动；修炼列没有未保存修改的对象就地刷新，同一ID仍只对应这一个对象；
+        修炼列有未保存修改且与写入值不同的对象已与数据库不一致，使其缓存失效。
+        """
+        age, realm_level, current_exp, is_dead, player_id = row
+        player = self.cache.identity(player_id)
+        if player is None:
+            return
+        if player.column_values(self.CULTIVATION_COLUMNS) == (age, realm_level, current_exp, is_dead):
+            return
+        if player.dirty_columns.intersection(self.CULTIVATION_COLUMNS):
+            self.cache.invalidate(player_id)
+            return
+        player.age = age
+        player.realm_level = realm_level
+        player.current_exp = current_exp
+        player.isDead = is_dead
+        player.mark_clean(*self.CULTIVATION_COLUMNS)
+
     def get_by_id(self, player_id: int) -> Optional[PlayerModel]:
         """
         根据ID查询玩家数据（不包括已删除的玩家）
@@ -116,17 +366,122 @@ class PlayerDAO(BaseDAO):
         Returns:
             Optional[PlayerModel]: 玩家对象，如果不存在则返回None
         """
+        cached = self.cache.get(player_id)
+        if cached is not None:
+            return None if cached.isDead else cached
+
         query = 'SELECT * FROM players WHERE id = ? AND is_dead = 0'
         rows = self.execute_query(query, (player_id,))
         
         if rows:
             row = rows[0]
             player = self._row_to_player(row)
+            self.cache.put(player)
             
             self.logger.debug(f"成功查询玩家数据: {player.name}")
             return player
         return None
-    
+
+    def get_by_ids(self, player_ids: Iterable[int]) -> Dict[int, PlayerModel]:
+        """
+        批量查询多个玩家（不包括已删除的玩家）
+
+        缓存命中的直接返回，其余按 IN_CHUNK_SIZE 分块用 IN (...) 查询。
+
+        Args:
+            player_ids: 玩家ID序列，可包含重复或无效ID
+
+        Returns:
+            Dict[int, PlayerModel]: 玩家ID到玩家对象的映射，不存在的ID不出现在结果中
+        """
+        result: Dict[int, PlayerModel] = {}
+        missing: List[int] = []
+        for player_id in dict.fromkeys(player_ids):
+            if player_id is None or player_id <= 0:
+                continue
+            cached = self.cache.get(player_id)
+            if cached is None:
+                missing.append(player_id)
+            elif not cached.isDead:
+                result[player_id] = cached
+
+        for offset in range(0, len(missing), self.IN_CHUNK_SIZE):
+            chunk = missing[offset:offset + self.IN_CHUNK_SIZE]
+            placeholders = ', '.join('?' * len(chunk))
+            query = f'SELECT * FROM players WHERE is_dead = 0 AND id IN ({placeholders})'
+            for row in self.execute_query(query, tuple(chunk)):
+                player = self._row_to_player(row)
+                self.cache.put(player)
+                result[player.id] = player
+
+        self.logger.debug(f"批量查询玩家数据: 请求 {len(missing)} 条未缓存，共返回 {len(result)} 条")
+        return result
+
+    def get_with_companion(self, player_id: int) -> Tuple[Optional[PlayerModel], Optional[PlayerModel]]:
+        """
+        查询玩家及其伴侣，未缓存时用一次自连接查询完成
+
+        Args:
+            player_id: 玩家ID
+
+        Returns:
+            Tuple[Optional[PlayerModel], Optional[PlayerModel]]: (玩家, 伴侣)，不存在的一方为None
+        """
+        player = self.cache.get(player_id)
+        if player is not None:
+            if player.isDead:
+                return None, None
+            if player.companion_id is None or player.companion_id <= 0:
+                return player, None
+            return player, self.get_by_ids((player.companion_id,)).get(player.companion_id)
+
+        query = '''
+            SELECT p.*, c.*
+            FROM players p
+            LEFT JOIN players c ON c.id = p.companion_id AND c.is_dead = 0
+            WHERE p.id = ? AND p.is_dead = 0
+        '''
+        rows = self.execute_query(query, (player_id,))
+        if not rows:
+            return None, None
+        width = len(rows[0]) // 2
+        player = self._row_to_player(rows[0][:width])
+        self.cache.put(player)
+        companion = None
+        if rows[0][width] is not None:
+            companion = self._row_to_player(rows[0][width:])
+            self.cache.put(companion)
+        return player, companion
+
+    def count_disciples_by_teacher(self, teacher_ids: Optional[Iterable[int]] = None) -> Dict[int, int]:
+        """
+        统计每位师父的在世徒弟人数
+
+        Args:
+            teacher_ids: 只统计这些师父，为None时统计所有师父
+
+        Returns:
+            Dict[int, int]: 师父ID到徒弟人数的映射，没有徒弟的师父不出现在结果中
+        """
+        query = '''
+            SELECT teacher_id, COUNT(*) FROM players
+            WHERE is_dead = 0 AND teacher_id > 0
+            {}
+            GROUP BY teacher_id
+        '''
+        if teacher_ids is None:
+            rows = self.execute_query(query.format(''))
+        else:
+            ids = list(dict.fromkeys(teacher_ids))
+            rows = []
+            for offset in range(0, len(ids), self.IN_CHUNK_SIZE):
+                chunk = ids[offset:offset + self.IN_CHUNK_SIZE]
+                condition = f"AND teacher_id IN ({', '.join('?' * len(chunk))})"
+                rows.extend(self.execute_query(query.format(condition), tuple(chunk)))
+        counts = {teacher_id: count for teacher_id, count in rows}
+        self.logger.debug(f"统计徒弟人数，共 {len(counts)} 位师父")
+        return counts
+
     def get_all(self) -> List[PlayerModel]:
         """
         获取所有未删除的玩家数据
@@ -145,6 +500,142 @@ class PlayerDAO(BaseDAO):
         self.logger.debug(f"成功查询所有未删除的玩家数据，共 {len(players)} 条")
         return players
     
+    def iter_all(self, batch_size: int = 500) -> Iterator[PlayerModel]:
+        """
+        按ID顺序流式遍历所有未删除的玩家
+
+        按ID键集分批查询，每批 batch_size 行，内存占用与玩家总数无关。
+        每批查询完即归还连接，生成器暂停期间不占用连接池。
+
+        Args:
+            batch_size: 每批读取的行数
+
+        Yields:
+            PlayerModel: 玩家对象
+        """
+        query = 'SELECT * FROM players WHERE is_dead = 0 AND id > ? ORDER BY id LIMIT ?'
+        last_id = 0
+        while True:
+            with self.get_cursor() as cursor:
+                rows = cursor.execute(query, (last_id, batch_size)).fetchall()
+            if not rows:
+                break
+            last_id = rows[-1][0]
+            for row in rows:
+                yield self._row_to_player(row)
+            if len(rows) < batch_size:
+                break
+
+    @staticmethod
+    def page_cursor(player: PlayerModel, sort_key: str = 'id') -> Tuple[Any, int]:
+        """
+        生成翻页游标：玩家在排序字段上的值和ID
+
+        游标记录的是上一页最后一行当时的值，之后该玩家被修改或删除都不影响翻页。
+
+        Args:
+            player: 上一页的最后一名玩家
+            sort_key: 排序字段，取值见 PAGE_SORT_KEYS
+
+        Returns:
+            Tuple[Any, int]: (排序字段的值, 玩家ID)
+        """
+        return getattr(player, sort_key), player.id
+
+    def get_page(self, after: Optional[Tuple[Any, int]] = None, limit: int = 100,
+                 sort_key: str = 'id', descending: bool = False) -> List[PlayerModel]:
+        """
+        键集分页查询未删除的玩家
+
+        按 (sort_key, id) 排序，返回位于游标之后的最多 limit 人，翻页代价与页码无关。
+
+        Args:
+            after: 上一页的游标 (排序字段的值, 玩家ID)，见 page_cursor，为None时从头开始
+            limit: 每页人数
+            sort_key: 排序字段，取值见 PAGE_SORT_KEYS
+            descending: 是否降序
+
+        Returns:
+            List[PlayerModel]: 本页玩家列表
+
+        Raises:
+            ValueError: 不支持的排序字段，或 limit 小于1
+        """
+        if sort_key not in self.PAGE_SORT_KEYS:
+            raise ValueError(f"不支持的排序字段: {sort_key}")
+        if limit < 1:
+            raise ValueError(f"每页人数必须大于0: {limit}")
+        op, order = ('<', 'DESC') if descending else ('>', 'ASC')
+
+        conditions = ['is_dead = 0']
+        params: list = []
+        if after is not None:
+            after_value, after_id = after
+            if sort_key == 'id':
+                conditions.append(f'id {op} ?')
+                params.append(after_id)
+            else:
+                conditions.append(f'({sort_key}, id) {op} (?, ?)')
+                params.extend((after_value, after_id))
+        order_by = f'id {order}' if sort_key == 'id' else f'{sort_key} {order}, id {order}'
+        query = f'''
+            SELECT * FROM players
+            WHERE {' AND '.join(conditions)}
+            ORDER BY {order_by}
+            LIMIT ?
+        '''
+        params.append(limit)
+
+        rows = self.execute_query(query, tuple(params))
+        players = [self._row_to_player(row) for row in rows]
+        self.logger.debug(f"分页查询玩家数据: after={after}, 排序={sort_key}，共 {len(players)} 条")
+        return players
+
+    def get_all_rows(self) -> List[tuple]:
+        """
+        获取所有未删除玩家的原始行数据，不创建玩家对象
+
+        Returns:
+            List[tuple]: 与 players 表列顺序一致的行元组列表
+        """
+        rows = self.execute_query('SELECT * FROM players WHERE is_dead = 0')
+        self.logger.debug(f"成功查询所有未删除的玩家行数据，共 {len(rows)} 条")
+        return rows
+
+    def load_table(self) -> PlayerTable:
+        """
+        以列式玩家表的形式加载所有未删除的玩家
+
+        Returns:
+            PlayerTable: 玩家表
+        """
+        return PlayerTable.from_rows(self.get_all_rows())
+
+    def save_table(self, table: PlayerTable) -> bool:
+        """
+        将列式玩家表整体写回数据库（按ID覆盖）
+
+        Args:
+            table: 玩家表
+
+        Returns:
+            bool: 操作是否成功
+        """
+        query = '''
+            INSERT OR REPLACE INTO players (
+                id, name, age, sex, is_master, is_dead,
+                father_id, mother_id, teacher_id, companion_id,
+                root, attribute, base_breakup_probability,
+                realm_level, current_exp, root_code
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        '''
+        rows = table.to_rows()
+        success = self.execute_many(query, rows)
+        self.cache.clear()
+        if success:
+            self.logger.debug(f"成功写回玩家表，共 {len(rows)} 条")
+        return success
+
     def fake_delete(self, player_id: int) -> bool:
         """
         软删除玩家数据（将is_dead设置为True）
@@ -153,14 +644,21 @@ class PlayerDAO(BaseDAO):
             player_id: 要删除的玩家ID
             
         Returns:
-            bool: 删除是否成功
+            bool: 删除是否成功，玩家不存在或已删除时为False
         """
         query = '''
             UPDATE players 
             SET is_dead = 1 
             WHERE id = ? AND is_dead = 0
         '''
-        success = self.execute_update(query, (player_id,))
+        try:
+            with self.get_cursor() as cursor:
+                cursor.execute(query, (player_id,))
+                success = cursor.rowcount > 0
+        except Exception as e:
+            self.logger.error(f"软删除玩家数据失败: ID={player_id}, 错误: {str(e)}")
+            success = False
+        self.cache.invalidate(player_id)
         if success:
             self.logger.debug(f"成功软删除玩家数据: ID={player_id}")
         return success
@@ -193,6 +691,28 @@ class PlayerDAO(BaseDAO):
         self.logger.debug(f"成功查询{relation} ID={parent_id} 的所有子女，共 {len(players)} 人")
         return players
 
+    def reassign_teacher(self, old_teacher_id: int, new_teacher_id: int) -> bool:
+        """
+        将某位师父的所有在世徒弟转到新师父门下
+
+        Args:
+            old_teacher_id: 原师父ID
+            new_teacher_id: 新师父ID
+
+        Returns:
+            bool: 操作是否成功
+        """
+        query = '''
+            UPDATE players
+            SET teacher_id = ?
+            WHERE teacher_id = ? AND is_dead = 0 AND id != ?
+        '''
+        success = self.execute_update(query, (new_teacher_id, old_teacher_id, new_teacher_id))
+        self.cache.clear()
+        if success:
+            self.logger.debug(f"成功将师父 ID={old_teacher_id} 的徒弟转给 ID={new_teacher_id}")
+        return success
+
     def get_by_teacher_id(self, teacher_id: int) -> List[PlayerModel]:
         """
         根据师父ID查询玩家数据（徒弟列表）
@@ -219,7 +739,7 @@ class PlayerDAO(BaseDAO):
         self.logger.debug(f"成功查询师父 ID={teacher_id} 的所有徒弟，共 {len(players)} 人")
         return players
 
-    def get_master(self) ->Optional[PlayerModel]:
+    def get_master(self) -> List[PlayerModel]:
         """
         查询所有掌门
         
@@ -242,9 +762,9 @@ class PlayerDAO(BaseDAO):
         self.logger.debug(f"成功查询所有掌门，共 {len(players)} 人")
         return players
 
-    def _row_to_player(self, row: tuple) -> PlayerModel:
-        """将数据库行转换为玩家对象"""
-        player = PlayerModel(None)  # 临时创建，实际使用时需要传入event_manager
+    @staticmethod
+    def _fill_from_row(player: PlayerModel, row: tuple) -> None:
+        """用数据库行覆盖玩家对象的属性，并标记为未修改"""
         player.id = row[0]
         player.name = row[1]
         player.age = row[2]
@@ -255,9 +775,25 @@ class PlayerDAO(BaseDAO):
         player.mother_id = row[7]
         player.teacher_id = row[8]
         player.companion_id = row[9]
-        player.root = row[10]
+        player.set_root(row[10], row[15])
         player.attribute = row[11]
         player.base_breakup_probability = row[12]
         player.realm_level = row[13]
         player.current_exp = row[14]
-        return player 
\ No newline at end of file
+        player.mark_clean()
+
+    def _row_to_player(self, row: tuple) -> PlayerModel:
+        """
+        将数据库行转换为玩家对象
+
+        身份映射中已有该ID时返回已有对象：对象没有未保存的修改时用新读到的行刷新，
+        使其他DAO或直接SQL写入的数据可见；有未保存的修改时保留对象不动。
+        """
+        existing = self.cache.identity(row[0])
+        if existing is not None:
+            if not existing.is_dirty:
+                self._fill_from_row(existing, row)
+            return existing
+        player = PlayerModel(None)  # 临时创建，实际使用时需要传入event_manager
+        self._fill_from_row(player, row)
+        return self.cache.register(player)
@@ -0,0 +1,291 @@
+"""
+二进制存档模块
+
+将整个世界的玩家数据导出为列式二进制文件，加载时通过 mmap 直接映射为数组，
+不需要逐行构造玩家对象。
+
+文件格式（小端）：
+- 文件头：魔数、版本号、列数、行数、保存时间
+- 列目录：每列的名称、类型、数据偏移和字节数
+- 列数据：数值列为定长数组；字符串列为每行一个字节的空值标记，
+  后接以 \\0 分隔的 UTF-8 文本
+每列的数据按8字节对齐，数值列可以零复制地映射为 NumPy 数组。
+
+主要功能：
+- 玩家表与存档文件之间的读写
+- 多个存档槽的管理
+"""
+import logging
+import mmap
+import os
+import struct
+import time
+from typing import Any, Dict, List, NamedTuple, Optional
+
+import numpy as np
+
+from model.playerModel import PlayerModel
+from model.playerTable import COLUMNS, PlayerTable
+
+MAGIC = b'ZT3SAVE\0'
+VERSION = 1
+
+# 魔数、版本号、列数、行数、保存时间
+HEADER = struct.Struct('<8sIIQd')
+# 列名、类型、数据偏移、字节数
+COLUMN_ENTRY = struct.Struct('<24s4s4xQQ')
+
+STRING_DTYPE = b'str'
+STRING_SEPARATOR = '\0'
+ALIGNMENT = 8
+
+logger = logging.getLogger('SaveFile')
+
+
+class SaveInfo(NamedTuple):
+    """存档文件头信息"""
+    path: str
+    version: int
+    rows: int
+    saved_at: float
+    size: int
+
+
+def _align(offset: int) -> int:
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+def _encode_strings(name: str, values: np.ndarray) -> bytes:
+    """字符串列编码为空值标记加分隔文本"""
+    values = values.tolist()
+    nulls = bytes(value is None for value in values)
+    text = STRING_SEPARATOR.join('' if value is None else value for value in values)
+    if values and text.count(STRING_SEPARATOR) != len(values) - 1:
+        raise ValueError(f"列 {name} 的值不能包含 \\0")
+    return nulls + text.encode('utf-8')
+
+
+def _decode_strings(buffer: memoryview, rows: int) -> np.ndarray:
+    """解码字符串列为对象数组"""
+    array = np.empty(rows, dtype=object)
+    if rows == 0:
+        return array
+    array[:] = bytes(buffer[rows:]).decode('utf-8').split(STRING_SEPARATOR)
+    nulls = np.frombuffer(buffer[:rows], dtype=np.uint8).astype(bool)
+    array[nulls] = None
+    return array
+
+
+class SaveFile:
+    """列式二进制存档的读写"""
+
+    @classmethod
+    def save(cls, table: PlayerTable, path: str) -> SaveInfo:
+        """
+        将玩家表写入存档文件，先写临时文件再原子替换
+
+        Args:
+            table: 玩家表
+            path: 存档路径
+
+        Returns:
+            SaveInfo: 写入的存档信息
+
+        Raises:
+            ValueError: 字符串列的值包含 \\0
+        """
+        start = time.perf_counter()
+        rows = len(table)
+        columns = table.columns
+        payloads: List[Any] = []
+        for name, dtype in COLUMNS:
+            if dtype is object:
+                payloads.append((STRING_DTYPE, _encode_strings(name, columns[name])))
+            else:
+                array = np.ascontiguousarray(columns[name], dtype=np.dtype(dtype).newbyteorder('<'))
+                payloads.append((array.dtype.str.encode('ascii'), array))
+
+        offset = _align(HEADER.size + COLUMN_ENTRY.size * len(COLUMNS))
+        entries = []
+        for (name, _), (dtype_code, payload) in zip(COLUMNS, payloads):
+            nbytes = len(payload) if isinstance(payload, bytes) else payload.nbytes
+            entries.append(COLUMN_ENTRY.pack(name.encode('ascii'), dtype_code, offset, nbytes))
+            offset = _align(offset + nbytes)
+
+        saved_at = time.time()
+        temp_path = f"{path}.tmp"
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(temp_path, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, VERSION, len(COLUMNS), rows, saved_at))
+            f.write(b''.join(entries))
+            for _, payload in payloads:
+                f.write(b'\0' * (_align(f.tell()) - f.tell()))
+                f.write(payload if isinstance(payload, bytes) else memoryview(payload).cast('B'))
+            f.flush()
+            os.fsync(f.fileno())
+            size = f.tell()
+        os.replace(temp_path, path)
+
+        elapsed = time.perf_counter() - start
+        logger.info(f"存档已写入 {path}: {rows} 人，{size / 1024:.1f} KB，耗时 {elapsed * 1000:.1f} 毫秒")
+        return SaveInfo(path, VERSION, rows, saved_at, size)
+
+    @classmethod
+    def save_players(cls, players: List[PlayerModel], path: str) -> SaveInfo:
+        """将玩家对象列表写入存档文件"""
+        return cls.save(PlayerTable.from_players(players), path)
+
+    @classmethod
+    def _read_header(cls, buffer, path: str) -> tuple:
+        if len(buffer) < HEADER.size:
+            raise ValueError(f"不是有效的存档文件: {path}")
+        magic, version, column_count, rows, saved_at = HEADER.unpack_from(buffer, 0)
+        if magic != MAGIC:
+            raise ValueError(f"不是有效的存档文件: {path}")
+        if version > VERSION:
+            raise ValueError(f"存档版本 {version} 高于支持的版本 {VERSION}: {path}")
+        return version, column_count, rows, saved_at
+
+    @classmethod
+    def info(cls, path: str) -> SaveInfo:
+        """
+        只读取存档文件头
+
+        Raises:
+            ValueError: 不是有效的存档文件
+        """
+        with open(path, 'rb') as f:
+            version, _, rows, saved_at = cls._read_header(f.read(HEADER.size), path)
+        return SaveInfo(path, version, rows, saved_at, os.path.getsize(path))
+
+    @classmethod
+    def load(cls, path: str) -> PlayerTable:
+        """
+        通过 mmap 加载存档为玩家表
+
+        数值列直接映射为数组（写时复制，修改不会影响文件），字符串列解码为对象数组。
+
+        Args:
+            path: 存档路径
+
+        Returns:
+            PlayerTable: 玩家表
+
+        Raises:
+            ValueError: 不是有效的存档文件或缺少列
+        """
+        start = time.perf_counter()
+        with open(path, 'rb') as f:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+        view = memoryview(buffer)
+        _, column_count, rows, _ = cls._read_header(view, path)
+
+        columns: Dict[str, np.ndarray] = {}
+        for index in range(column_count):
+            raw_name, dtype_code, offset, nbytes = COLUMN_ENTRY.unpack_from(view, HEADER.size + COLUMN_ENTRY.size * index)
+            name = raw_name.rstrip(b'\0').decode('ascii')
+            dtype_code = dtype_code.rstrip(b'\0')
+            if dtype_code == STRING_DTYPE:
+                columns[name] = _decode_strings(view[offset:offset + nbytes], rows)
+            else:
+                array = np.frombuffer(buffer, dtype=np.dtype(dtype_code.decode('ascii')), count=rows, offset=offset)
+                columns[name] = array if array.dtype.isnative else array.astype(array.dtype.newbyteorder('='))
+
+        table = PlayerTable.from_columns(columns)
+        elapsed = time.perf_counter() - start
+        logger.info(f"存档已加载 {path}: {rows} 人，耗时 {elapsed * 1000:.1f} 毫秒")
+        return table
+
+    @classmethod
+    def load_players(cls, path: str, event_manager=None) -> List[PlayerModel]:
+        """
+        加载存档为玩家对象列表
+
+        Args:
+            path: 存档路径
+            event_manager: 事件管理器实例
+
+        Returns:
+            List[PlayerModel]: 玩家对象列表
+        """
+        return [row.to_model(event_manager) for row in cls.load(path)]
+
+
+class SaveSlots:
+    """
+    存档槽管理
+
+    每个存档槽对应目录下的一个存档文件，列出存档时只读取文件头。
+
+    Attributes:
+        directory (str): 存档目录
+    """
+
+    SUFFIX = '.zts'
+
+    def __init__(self, directory: str = 'dataset/saves'):
+        """
+        初始化存档槽管理
+
+        Args:
+            directory: 存档目录
+        """
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.directory = directory
+
+    def path(self, slot: str) -> str:
+        """存档槽对应的文件路径"""
+        if not slot or os.sep in slot or (os.altsep and os.altsep in slot) or slot.startswith('.'):
+            raise ValueError(f"非法的存档槽名称: {slot!r}")
+        return os.path.join(self.directory, slot + self.SUFFIX)
+
+    def save(self, slot: str, table: PlayerTable) -> SaveInfo:
+        """将玩家表保存到存档槽"""
+        return SaveFile.save(table, self.path(slot))
+
+    def load(self, slot: str) -> PlayerTable:
+        """从存档槽加载玩家表"""
+        return SaveFile.load(self.path(slot))
+
+    def exists(self, slot: str) -> bool:
+        return os.path.exists(self.path(slot))
+
+    def delete(self, slot: str) -> bool:
+        """
+        删除存档槽
+
+        Returns:
+            bool: 存档是否存在并已删除
+        """
+        path = self.path(slot)
+        if not os.path.exists(path):
+            return False
+        os.remove(path)
+        self.logger.info(f"已删除存档: {path}")
+        return True
+
+    def list(self) -> Dict[str, SaveInfo]:
+        """
+        列出所有存档槽
+
+        Returns:
+            Dict[str, SaveInfo]: 存档槽名称到存档信息的映射，按保存时间从新到旧排列
+        """
+        if not os.path.isdir(self.directory):
+            return {}
+        slots = {}
+        for filename in os.listdir(self.directory):
+            if not filename.endswith(self.SUFFIX):
+                continue
+            path = os.path.join(self.directory, filename)
+            try:
+                slots[filename[:-len(self.SUFFIX)]] = SaveFile.info(path)
+            except (OSError, ValueError) as e:
+                self.logger.warning(f"跳过无法读取的存档 {path}: {str(e)}")
+        return dict(sorted(slots.items(), key=lambda item: item[1].saved_at, reverse=True))
+
+    def latest(self) -> Optional[str]:
+        """最近保存的存档槽名称，没有存档时返回None"""
+        return next(iter(self.list()), None)
@@ -0,0 +1,312 @@
+"""
+后台写入队列模块
+
+模拟推进时只把修改登记到内存队列，由后台线程批量写入数据库，
+时间流逝的主循环不再等待磁盘 I/O。
+
+主要功能：
+- 同一玩家的多次修改在队列中合并，只写入最新值
+- 积压条数或间隔时间达到阈值时，在一个事务中批量写入
+- flush() 同步等待已登记的修改全部落盘
+- 写入失败后按指数退避重试，连续失败超过上限时丢弃该批修改，并将对应玩家对象的列重新标记为已修改
+- 连接池关闭前自动刷新并停止后台线程，连接池重新初始化后自动重启
+"""
+import logging
+import threading
+import time
+import weakref
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from dao.connectionPool import db_pool
+from dao.playerDAO import PlayerDAO
+from model.playerModel import PlayerModel
+
+
+class WriteBehindQueue:
+    """
+    玩家数据的后台写入队列
+
+    待写入的数据以 {玩家ID: {列名: 值}} 的形式保存，登记时即取快照，
+    之后对玩家对象的修改不会影响已登记的值。
+
+    Attributes:
+        max_pending (int): 积压的玩家数达到该值时立即写入
+        flush_interval (float): 两次写入之间的最长间隔秒数
+        max_retries (int): 同一批修改写入失败后的最多重试次数
+    """
+
+    # 失败重试的最短和最长等待秒数
+    MIN_RETRY_DELAY = 0.1
+    MAX_RETRY_DELAY = 60.0
+
+    def __init__(self, player_dao: Optional[PlayerDAO] = None, max_pending: int = 1000,
+                 flush_interval: float = 1.0, max_retries: int = 5):
+        """
+        初始化后台写入队列，需调用 start 启动后台线程
+
+        Args:
+            player_dao: 执行写入的玩家DAO，默认新建一个
+            max_pending: 触发写入的积压玩家数
+            flush_interval: 触发写入的间隔秒数
+            max_retries: 写入失败后的最多重试次数，超过后丢弃该批修改
+        """
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.player_dao = player_dao or PlayerDAO(cache_size=0)
+        self.max_pending = max(int(max_pending), 1)
+        self.flush_interval = flush_interval
+        self.max_retries = max(int(max_retries), 0)
+        self._pending: Dict[int, Dict[str, Any]] = {}
+        # 通过 enqueue 登记、尚未写入的玩家对象，丢弃修改时据此恢复修改标记
+        self._players: "weakref.WeakValueDictionary[int, PlayerModel]" = weakref.WeakValueDictionary()
+        self._condition = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._flush_requested = False
+        self._writing = False
+        self._closed = False
+        # 连续写入失败的次数，成功或丢弃后清零
+        self._failures = 0
+        self._stats = {
+            'enqueued': 0,
+            'coalesced': 0,
+            'written': 0,
+            'batches': 0,
+            'errors': 0,
+            'dropped': 0,
+        }
+
+    def __len__(self) -> int:
+        with self._condition:
+            return len(self._pending)
+
+    def start(self) -> 'WriteBehindQueue':
+        """
+        启动后台写入线程
+
+        同时注册为连接池的关闭回调和初始化回调：连接池关闭时刷新并停止，
+        重新初始化后自动重启，直到调用 close 为止。
+        """
+        with self._condition:
+            if self._thread is not None:
+                return self
+            self._closed = False
+            self._failures = 0
+            self._thread = threading.Thread(target=self._run, name=self.__class__.__name__, daemon=True)
+            self._thread.start()
+        db_pool.add_close_hook(self._stop)
+        db_pool.add_init_hook(self.start)
+        self.logger.debug("后台写入线程已启动")
+        return self
+
+    def enqueue(self, player: PlayerModel) -> bool:
+        """
+        登记玩家已修改的列，登记后玩家即标记为未修改
+
+        这批修改最终写入失败被丢弃时，玩家对象上的这些列会重新标记为已修改，
+        之后的保存仍会写入它们。
+
+        Args:
+            player: 玩家对象，必须已有ID
+
+        Returns:
+            bool: 是否有修改被登记，未修改的玩家直接跳过
+        """
+        columns = PlayerDAO._dirty_write_columns(player)
+        if not columns:
+            return False
+        with self._condition:
+            self.enqueue_values(player.id, dict(zip(columns, player.column_values(columns))))
+            self._players[player.id] = player
+            player.mark_clean()
+        return True
+
+    def enqueue_values(self, player_id: int, values: Dict[str, Any]) -> None:
+        """
+        登记玩家部分列的新值，与该玩家尚未写入的修改合并
+
+        Args:
+            player_id: 玩家ID
+            values: 列名到新值的映射，列名取值见 PlayerDAO.WRITE_COLUMNS
+
+        Raises:
+            ValueError: 不可写的列名
+            RuntimeError: 队列已关闭
+        """
+        invalid = [column for column in values if column not in PlayerDAO.WRITE_COLUMNS]
+        if invalid:
+            raise ValueError(f"不可写的列: {', '.join(invalid)}")
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("后台写入队列已关闭")
+            pending = self._pending.get(player_id)
+            if pending is None:
+                self._pending[player_id] = dict(values)
+            else:
+                pending.update(values)
+                self._stats['coalesced'] += 1
+            self._stats['enqueued'] += 1
+            if len(self._pending) >= self.max_pending:
+                self._condition.notify_all()
+
+    def enqueue_rows(self, columns: Tuple[str, ...], rows: Iterable[tuple]) -> None:
+        """
+        批量登记多名玩家相同列的新值
+
+        Args:
+            columns: 列名
+            rows: 每行为各列的值加上末尾的玩家ID
+        """
+        for row in rows:
+            self.enqueue_values(row[-1], dict(zip(columns, row)))
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        立即写入所有已登记的修改，并等待写入完成
+
+        Args:
+            timeout: 最长等待秒数，为None时一直等待
+
+        Returns:
+            bool: 是否在超时前全部写入，写入失败时为False
+        """
+        if self._thread is None:
+            errors = self._stats['errors']
+            self._write_pending()
+            return not self._pending and self._stats['errors'] == errors
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._condition:
+            errors = self._stats['errors']
+            self._flush_requested = True
+            self._condition.notify_all()
+            while self._pending or self._writing:
+                if self._stats['errors'] > errors:
+                    return False
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._condition.wait(remaining)
+        return True
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        """
+        写入剩余的修改并停止后台线程，连接池重新初始化后不再自动重启，可重复调用
+
+        Args:
+            timeout: 等待后台线程结束的最长秒数
+        """
+        db_pool.remove_init_hook(self.start)
+        self._stop(timeout)
+
+    def _stop(self, timeout: Optional[float] = None) -> None:
+        """写入剩余的修改并停止后台线程，作为连接池的关闭回调"""
+        with self._condition:
+            if self._closed:
+                return
+            self._closed = True
+            thread, self._thread = self._thread, None
+            self._condition.notify_all()
+        db_pool.remove_close_hook(self._stop)
+        if thread is not None:
+            thread.join(timeout)
+        if self._pending:
+            self._write_pending()
+        self.logger.debug(f"后台写入队列已关闭: {self.stats()}")
+
+    def stats(self) -> Dict[str, int]:
+        """
+        队列统计快照
+
+        Returns:
+            Dict[str, int]: 登记次数、合并次数、已写入行数、批次数、失败次数、丢弃的玩家数及当前积压数
+        """
+        with self._condition:
+            stats = dict(self._stats)
+            stats['pending'] = len(self._pending)
+        return stats
+
+    def _retry_delay(self) -> float:
+        """第 n 次连续失败后的等待秒数，从 flush_interval 起逐次翻倍"""
+        base = max(self.flush_interval, self.MIN_RETRY_DELAY)
+        return min(base * 2 ** (self._failures - 1), self.MAX_RETRY_DELAY)
+
+    def _run(self) -> None:
+        """后台线程主循环"""
+        while True:
+            with self._condition:
+                # 失败后退避，积压达到阈值也不提前重试，只响应 flush 和关闭
+                backoff = self._failures > 0
+                deadline = time.monotonic() + (self._retry_delay() if backoff else self.flush_interval)
+                while not (self._closed or self._flush_requested
+                           or (not backoff and len(self._pending) >= self.max_pending)):
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._condition.wait(remaining)
+                self._flush_requested = False
+                closing = self._closed
+            self._write_pending()
+            if closing:
+                return
+
+    def _write_pending(self) -> None:
+        """取出当前积压的修改，按列组合分组后在一个事务中写入"""
+        with self._condition:
+            if not self._pending or self._writing:
+                return
+            batch, self._pending = self._pending, {}
+            self._writing = True
+
+        groups: Dict[Tuple[str, ...], List[tuple]] = {}
+        for player_id, values in batch.items():
+            columns = tuple(sorted(values))
+            groups.setdefault(columns, []).append(tuple(values[c] for c in columns) + (player_id,))
+
+        start = time.perf_counter()
+        try:
+            with self.player_dao.transaction():
+                written = sum(self.player_dao.update_columns_many(columns, rows)
+                              for columns, rows in groups.items())
+        except Exception as e:
+            with self._condition:
+                self._failures += 1
+                self._stats['errors'] += 1
+                dropped = self._failures > self.max_retries
+                if dropped:
+                    self._failures = 0
+                    self._stats['dropped'] += len(batch)
+                    self._restore_dirty(batch)
+                else:
+                    # 写入失败的修改放回队列，不覆盖期间登记的更新值
+                    for player_id, values in batch.items():
+                        self._pending[player_id] = {**values, **self._pending.get(player_id, {})}
+                self._writing = False
+                self._condition.notify_all()
+            if dropped:
+                self.logger.error(f"后台写入连续失败 {self.max_retries + 1} 次，丢弃 {len(batch)} 条修改: {str(e)}")
+            else:
+                self.logger.error(f"后台写入失败，{len(batch)} 条修改已放回队列: {str(e)}")
+            return
+
+        with self._condition:
+            for player_id in batch:
+                if player_id not in self._pending:
+                    self._players.pop(player_id, None)
+            self._failures = 0
+            self._stats['written'] += written
+            self._stats['batches'] += 1
+            self._writing = False
+            self._condition.notify_all()
+        elapsed = time.perf_counter() - start
+        self.logger.debug(f"后台写入 {written} 条玩家数据，耗时 {elapsed * 1000:.1f} 毫秒")
+
+    def _restore_dirty(self, batch: Dict[int, Dict[str, Any]]) -> None:
+        """将被丢弃的修改对应的玩家对象列重新标记为已修改，调用方需持有 _condition"""
+        for player_id, values in batch.items():
+            player = self._players.get(player_id)
+            if player is not None:
+                player.mark_dirty(*values)
+            if player_id not in self._pending:
+                self._players.pop(player_id, None)
+
+
+# 全局后台写入队列，由 main.py 启动，随连接池关闭而刷新
+write_behind = WriteBehindQueue()
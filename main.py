@@ -1,5 +1,6 @@
 from utils import configure_logger
 from dao.connectionPool import db_pool
+from dao.writeBehind import write_behind
 
 
 # from views.test_views.playerTest import main
@@ -10,7 +11,8 @@ if __name__ == "__main__":
     configure_logger()  # 初始化日志系统
     
     # 初始化数据库连接池
-    db_pool.initialize("dataset/zhetian3.db")
+    db_pool.initialize("dataset/zhetian3.db")  # 同时执行尚未执行的数据库迁移
+    write_behind.start()  # 后台写入线程，连接池关闭前自动刷新，重新初始化后自动重启
     
     try:
         main()
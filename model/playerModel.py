@@ -8,9 +8,10 @@
 - 玩家基础属性管理
 - 玩家存档加载与保存
 - 玩家修炼系统对接
+- 记录自加载或上次保存以来修改过的字段
 """
 import logging
-from typing import Dict, Any
+from typing import Dict, Any, FrozenSet, Optional
 from model.baseModel import BaseModel
 from core.eventmanager import EventManager
 from utils.spiritroot import SpiritRoot
@@ -28,6 +29,36 @@ REALMS = [
     {"name": "真仙境","probability":0.0,"exp_required": 10000000000,  "spirit_power": 2000000, "spirit_sense": 1000000, "lifespan": -1},  # 长生不老
 ]
 
+# 修炼系数为1时，每年获得的修为
+CULTIVATE_EXP_PER_YEAR = 10
+
+
+# 需要持久化的属性到 players 表列名的映射，root/root_code 由属性内部的 _root/_root_code 保存
+COLUMN_BY_ATTRIBUTE: Dict[str, str] = {
+    'name': 'name',
+    'age': 'age',
+    'sex': 'sex',
+    'isMaster': 'is_master',
+    'isDead': 'is_dead',
+    'father_id': 'father_id',
+    'mother_id': 'mother_id',
+    'teacher_id': 'teacher_id',
+    'companion_id': 'companion_id',
+    '_root': 'root',
+    '_root_code': 'root_code',
+    'attribute': 'attribute',
+    'base_breakup_probability': 'base_breakup_probability',
+    'realm_level': 'realm_level',
+    'current_exp': 'current_exp',
+}
+
+# players 表列名到读取属性名的映射
+ATTRIBUTE_BY_COLUMN: Dict[str, str] = {
+    column: attribute.lstrip('_') for attribute, column in COLUMN_BY_ATTRIBUTE.items()
+}
+
+_MISSING = object()
+
 
 class PlayerModel(BaseModel):
     """
@@ -51,10 +82,12 @@ class PlayerModel(BaseModel):
         teacher_id (int): 师父ID
         companion_id (int): 伴侣ID
         root (str): 灵根类型
+        root_code (int): 灵根整数编码，与root同步，非法灵根为None
         attribute (str): 玩家属性
         base_breakup_probability (float): 基础突破概率
         realm_level (int): 境界等级
         current_exp (int): 当前经验值
+        dirty_columns (FrozenSet[str]): 自加载或上次保存以来修改过的列名，新建的玩家所有列都视为已修改
     """
     
     def __init__(self, event_manager: EventManager):
@@ -64,6 +97,7 @@ class PlayerModel(BaseModel):
         Args:
             event_manager: 事件管理器实例
         """
+        object.__setattr__(self, '_dirty', set())
         super().__init__(event_manager)
         self.logger = logging.getLogger(self.__class__.__name__)
         
@@ -78,17 +112,63 @@ class PlayerModel(BaseModel):
         self.mother_id: int = -1
         self.teacher_id: int = -1
         self.companion_id: int = -1
-        self.root: str = ""
+        self._root: str = ""
+        self._root_code: Optional[int] = None
         self.attribute: str = ""
         self.base_breakup_probability: float = 0.1
         self.realm_level: int = 0
         self.current_exp: float = 0
-
-        # 注册时间流逝事件
-        if event_manager:
-            self.event_manager = event_manager
-            self.event_manager.subscribe('time_pass', self.cultivate)
+        # 修炼由 CultivationService 订阅 'time_pass' 批量推进，玩家对象不再逐个订阅
     
+    def __setattr__(self, name: str, value: Any) -> None:
+        column = COLUMN_BY_ATTRIBUTE.get(name)
+        if column is not None and column not in self._dirty:
+            current = self.__dict__.get(name, _MISSING)
+            if current is _MISSING or current != value:
+                self._dirty.add(column)
+        object.__setattr__(self, name, value)
+
+    @property
+    def dirty_columns(self) -> FrozenSet[str]:
+        return frozenset(self._dirty)
+
+    @property
+    def is_dirty(self) -> bool:
+        return bool(self._dirty)
+
+    def column_values(self, columns) -> tuple:
+        """
+        按列名顺序取出对应的属性值
+
+        Args:
+            columns: players 表列名序列
+
+        Returns:
+            tuple: 各列的值
+        """
+        return tuple(getattr(self, ATTRIBUTE_BY_COLUMN[column]) for column in columns)
+
+    def mark_clean(self, *columns: str) -> None:
+        """
+        标记为与数据库一致，在加载或保存后调用
+
+        Args:
+            columns: 只标记这些 players 表列名，不指定时标记所有列
+        """
+        if columns:
+            self._dirty.difference_update(columns)
+        else:
+            self._dirty.clear()
+
+    def mark_dirty(self, *columns: str) -> None:
+        """
+        强制将指定列标记为已修改，不指定时标记所有列
+
+        Args:
+            columns: players 表列名
+        """
+        self._dirty.update(columns or ATTRIBUTE_BY_COLUMN)
+
     def to_dict(self) -> Dict[str, Any]:
         """
         将玩家数据序列化为字典格式
@@ -108,6 +188,7 @@ class PlayerModel(BaseModel):
             'teacher_id': self.teacher_id,
             'companion_id': self.companion_id,
             'root': self.root,
+            'root_code': self.root_code,
             'attribute': self.attribute,
             'base_breakup_probability': self.base_breakup_probability,
             'realm_level': self.realm_level,
@@ -136,7 +217,10 @@ class PlayerModel(BaseModel):
         self.mother_id = data.get('mother_id', self.mother_id)
         self.teacher_id = data.get('teacher_id', self.teacher_id)
         self.companion_id = data.get('companion_id', self.companion_id)
-        self.root = data.get('root', self.root)
+        if 'root' in data:
+            self.root = data['root']
+        elif 'root_code' in data:
+            self.root_code = data['root_code']
         self.attribute = data.get('attribute', self.attribute)
         self.base_breakup_probability = data.get('base_breakup_probability', self.base_breakup_probability)
         self.realm_level = data.get('realm_level', self.realm_level)
@@ -144,6 +228,38 @@ class PlayerModel(BaseModel):
         
         self.logger.debug(f"反序列化玩家数据: {self.name}")
 
+    @property
+    def root(self) -> str:
+        return self._root
+
+    @root.setter
+    def root(self, value: str) -> None:
+        self._root = value
+        self._root_code = SpiritRoot.encode(value) if value else None
+
+    @property
+    def root_code(self) -> Optional[int]:
+        return self._root_code
+
+    @root_code.setter
+    def root_code(self, value: Optional[int]) -> None:
+        self._root = SpiritRoot.decode(value) if value is not None else ""
+        self._root_code = value
+
+    def set_root(self, root: str, root_code: Optional[int]) -> None:
+        """
+        同时设置灵根文本和编码，用于从数据库加载，避免重新解析文本
+
+        Args:
+            root: 灵根文本
+            root_code: 灵根编码，为None时由文本计算
+        """
+        if root_code is None:
+            self.root = root
+        else:
+            self._root = root
+            self._root_code = root_code
+
     @property
     def get_realm_cur(self)->dict:
         return REALMS[self.realm_level]
@@ -157,6 +273,9 @@ class PlayerModel(BaseModel):
         
     @property
     def get_cultivate_coef(self):
+        record = SpiritRoot.record_for_code(self._root_code)
+        if record is not None:
+            return record.coefficient
         try:
             is_leagel = SpiritRoot.check_legal(self.root)
             if is_leagel:
@@ -172,9 +291,9 @@ class PlayerModel(BaseModel):
 
     def cultivate(self, *args, **kwargs) -> None:
         """
-        修炼方法，响应时间流逝事件
-        
-        在每个时间单位进行修炼相关计算
+        修炼方法
+
+        时间流逝由 CultivationService 批量处理，本方法不再订阅 'time_pass' 事件
         """
         # TODO: 实现具体的修炼逻辑
         self.logger.debug(f"玩家 {self.name} 正在修炼")
\ No newline at end of file
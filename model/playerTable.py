@@ -0,0 +1,344 @@
+"""
+玩家列式存储模块
+
+按列存储整个玩家群体，每个属性一个类型化数组，
+避免为每个修士创建一个完整的 PlayerModel 对象。
+
+主要功能：
+- 按ID索引的列式玩家表
+- 与 PlayerModel 接口一致的行视图
+- 与 PlayerDAO 行元组之间的批量转换
+"""
+import logging
+from collections import Counter
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from model.playerModel import PlayerModel, REALMS
+from utils.spiritroot import SpiritRoot
+
+# 列名与类型，顺序与 players 表的列顺序一致
+COLUMNS: Tuple[Tuple[str, Any], ...] = (
+    ('id', np.int64),
+    ('name', object),
+    ('age', np.int64),
+    ('sex', np.int8),
+    ('isMaster', np.int8),
+    ('isDead', np.int8),
+    ('father_id', np.int64),
+    ('mother_id', np.int64),
+    ('teacher_id', np.int64),
+    ('companion_id', np.int64),
+    ('root', object),
+    ('attribute', object),
+    ('base_breakup_probability', np.float64),
+    ('realm_level', np.int64),
+    ('current_exp', np.float64),
+    ('root_code', np.int64),
+)
+COLUMN_NAMES = tuple(name for name, _ in COLUMNS)
+
+# 可为空的数值列在数组中用哨兵值表示 None
+NULL_SENTINELS: Dict[str, int] = {'root_code': -1}
+
+logger = logging.getLogger(__name__)
+
+
+class PlayerRow:
+    """
+    玩家表的行视图
+
+    属性读写直接映射到 PlayerTable 中对应列的数组元素，
+    对外提供与 PlayerModel 一致的属性名和 to_dict 接口。
+    """
+    __slots__ = ('_table', '_index')
+
+    def __init__(self, table: 'PlayerTable', index: int):
+        self._table = table
+        self._index = index
+
+    def __repr__(self) -> str:
+        return f"PlayerRow(id={self.id}, name={self.name!r})"
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        将行数据序列化为字典格式，字段与 PlayerModel.to_dict 相同
+
+        Returns:
+            Dict[str, Any]: 包含玩家所有属性的字典
+        """
+        data = {name: getattr(self, name) for name in COLUMN_NAMES}
+        data['realm_cur'] = self.get_realm_cur['name']
+        data['realm_next'] = self.get_realm_next['name']
+        data['cultivate_coef'] = self.get_cultivate_coef
+        return data
+
+    def to_model(self, event_manager=None) -> PlayerModel:
+        """
+        物化为独立的 PlayerModel 对象
+
+        Args:
+            event_manager: 事件管理器实例
+
+        Returns:
+            PlayerModel: 玩家对象
+        """
+        player = PlayerModel(event_manager)
+        for name in COLUMN_NAMES:
+            if name not in ('root', 'root_code'):
+                setattr(player, name, getattr(self, name))
+        # 两列一起设置，逐列赋值时 root_code=None 会清空没有编码的灵根文本
+        player.set_root(self.root, self.root_code)
+        return player
+
+    @property
+    def get_realm_cur(self) -> dict:
+        return REALMS[self.realm_level]
+
+    @property
+    def get_realm_next(self) -> dict:
+        if self.realm_level >= len(REALMS) - 1:
+            return self.get_realm_cur
+        return REALMS[self.realm_level + 1]
+
+    @property
+    def get_cultivate_coef(self):
+        record = SpiritRoot.record_for_code(self.root_code)
+        if record is not None:
+            return record.coefficient
+        try:
+            if SpiritRoot.check_legal(self.root):
+                return SpiritRoot.calculate_cultivation_coefficient(self.root)
+            logger.error(f'非法的灵根名称: {self.root!r}')
+            return 1
+        except (ValueError, TypeError, SyntaxError) as e:
+            logger.error(e)
+            return 1
+
+
+def _or_sentinel(name: str, value: Any) -> Any:
+    """None 转换为该列的哨兵值"""
+    if value is None and name in NULL_SENTINELS:
+        return NULL_SENTINELS[name]
+    return value
+
+
+def _make_column_property(name: str, dtype: Any) -> property:
+    """为行视图生成映射到列数组的属性"""
+    sentinel = NULL_SENTINELS.get(name)
+    if dtype is object:
+        def getter(row):
+            return row._table._storage[name][row._index]
+    elif sentinel is not None:
+        def getter(row):
+            value = row._table._storage[name][row._index].item()
+            return None if value == sentinel else value
+    else:
+        def getter(row):
+            return row._table._storage[name][row._index].item()
+
+    def setter(row, value):
+        if name == 'id':
+            row._table._reindex(row._index, value)
+        if name == 'root':
+            row._table._storage['root_code'][row._index] = _or_sentinel('root_code', SpiritRoot.encode(value))
+        elif name == 'root_code':
+            row._table._storage['root'][row._index] = SpiritRoot.decode(value) if value is not None else ""
+        row._table._storage[name][row._index] = _or_sentinel(name, value)
+
+    return property(getter, setter)
+
+
+for _name, _dtype in COLUMNS:
+    setattr(PlayerRow, _name, _make_column_property(_name, _dtype))
+
+
+class PlayerTable:
+    """
+    列式玩家表
+
+    每一列是一个预分配容量的类型化数组，新增行时按倍数扩容。
+    通过 id 索引到行号，通过 PlayerRow 提供行视图。
+
+    Attributes:
+        columns (Dict[str, np.ndarray]): 列名到有效数据视图的映射
+    """
+
+    def __init__(self, capacity: int = 1024):
+        """
+        初始化玩家表
+
+        Args:
+            capacity: 初始容量
+        """
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self._size = 0
+        self._capacity = max(int(capacity), 1)
+        self._storage: Dict[str, np.ndarray] = {
+            name: np.empty(self._capacity, dtype=dtype) for name, dtype in COLUMNS
+        }
+        self._index_by_id: Dict[int, int] = {}
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __contains__(self, player_id: int) -> bool:
+        return player_id in self._index_by_id
+
+    def __iter__(self) -> Iterator[PlayerRow]:
+        return (PlayerRow(self, i) for i in range(self._size))
+
+    def __getitem__(self, player_id: int) -> PlayerRow:
+        """按玩家ID获取行视图"""
+        return PlayerRow(self, self._index_by_id[player_id])
+
+    @property
+    def columns(self) -> Dict[str, np.ndarray]:
+        """各列有效数据的视图，修改会直接写入表中"""
+        return {name: array[:self._size] for name, array in self._storage.items()}
+
+    def get(self, player_id: int) -> Optional[PlayerRow]:
+        """按玩家ID获取行视图，不存在时返回None"""
+        index = self._index_by_id.get(player_id)
+        return None if index is None else PlayerRow(self, index)
+
+    def index_of(self, player_id: int) -> int:
+        """获取玩家ID对应的行号"""
+        return self._index_by_id[player_id]
+
+    def _reserve(self, size: int) -> None:
+        """确保容量足够容纳 size 行"""
+        if size <= self._capacity:
+            return
+        capacity = max(self._capacity, 1)
+        while capacity < size:
+            capacity *= 2
+        for name, dtype in COLUMNS:
+            array = np.empty(capacity, dtype=dtype)
+            array[:self._size] = self._storage[name][:self._size]
+            self._storage[name] = array
+        self._capacity = capacity
+
+    def _reindex(self, index: int, player_id: int) -> None:
+        """
+        修改行的ID时同步更新索引
+
+        Raises:
+            ValueError: 新ID已被其他行使用
+        """
+        existing = self._index_by_id.get(player_id)
+        if existing is not None and existing != index:
+            raise ValueError(f"玩家ID重复: {player_id}")
+        old_id = self._storage['id'][index].item()
+        if self._index_by_id.get(old_id) == index:
+            del self._index_by_id[old_id]
+        self._index_by_id[player_id] = index
+
+    def append_rows(self, rows: Iterable[tuple]) -> None:
+        """
+        批量追加 PlayerDAO 行元组
+
+        Args:
+            rows: 与 players 表列顺序一致的元组序列
+
+        Raises:
+            ValueError: 玩家ID与已有行或本批其他行重复，此时表不变
+        """
+        rows = list(rows)
+        if not rows:
+            return
+        start, end = self._size, self._size + len(rows)
+        self._reserve(end)
+        for (name, dtype), values in zip(COLUMNS, zip(*rows)):
+            if name in NULL_SENTINELS:
+                values = [_or_sentinel(name, value) for value in values]
+            self._storage[name][start:end] = np.array(values, dtype=dtype)
+        ids = self._storage['id'][start:end].tolist()
+        duplicates = {player_id for player_id in ids if player_id in self._index_by_id}
+        if len(set(ids)) != len(ids) or duplicates:
+            duplicates.update(player_id for player_id, count in Counter(ids).items() if count > 1)
+            raise ValueError(f"玩家ID重复: {', '.join(map(str, sorted(duplicates)))}")
+        for offset, player_id in enumerate(ids):
+            self._index_by_id[player_id] = start + offset
+        self._size = end
+
+    def append_players(self, players: Iterable[PlayerModel]) -> None:
+        """
+        批量追加玩家对象
+
+        Args:
+            players: 玩家对象序列
+        """
+        self.append_rows(tuple(getattr(p, name) for name in COLUMN_NAMES) for p in players)
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[tuple]) -> 'PlayerTable':
+        """从 PlayerDAO 行元组构建玩家表"""
+        rows = list(rows)
+        table = cls(capacity=len(rows))
+        table.append_rows(rows)
+        return table
+
+    @classmethod
+    def from_players(cls, players: Iterable[PlayerModel]) -> 'PlayerTable':
+        """从玩家对象构建玩家表"""
+        players = list(players)
+        table = cls(capacity=len(players))
+        table.append_players(players)
+        return table
+
+    @classmethod
+    def from_columns(cls, columns: Dict[str, np.ndarray]) -> 'PlayerTable':
+        """
+        直接使用已有的列数组构建玩家表，不复制数据
+
+        Args:
+            columns: 列名到数组的映射，须包含 COLUMNS 中的所有列且长度相同
+
+        Returns:
+            PlayerTable: 玩家表，追加行时才会复制到新分配的数组
+
+        Raises:
+            ValueError: 缺少列、类型不符、长度不一致或玩家ID重复
+        """
+        missing = [name for name in COLUMN_NAMES if name not in columns]
+        if missing:
+            raise ValueError(f"缺少列: {', '.join(missing)}")
+        sizes = {len(columns[name]) for name in COLUMN_NAMES}
+        if len(sizes) != 1:
+            raise ValueError("各列长度不一致")
+        for name, dtype in COLUMNS:
+            if columns[name].dtype != np.dtype(dtype):
+                raise ValueError(f"列 {name} 的类型应为 {np.dtype(dtype)}，实际为 {columns[name].dtype}")
+        size = sizes.pop()
+        table = cls(capacity=1)
+        if size:
+            table._storage = {name: columns[name] for name in COLUMN_NAMES}
+        # 空表保留构造时分配的数组，容量至少为1，追加时才能按倍数扩容
+        table._capacity = max(size, 1)
+        table._size = size
+        table._index_by_id = dict(zip(columns['id'].tolist(), range(size)))
+        if len(table._index_by_id) != size:
+            raise ValueError("玩家ID重复")
+        return table
+
+    def to_rows(self) -> List[tuple]:
+        """
+        转换为与 players 表列顺序一致的行元组列表
+
+        Returns:
+            List[tuple]: 行元组列表
+        """
+        columns = []
+        for name in COLUMN_NAMES:
+            values = self._storage[name][:self._size].tolist()
+            if name in NULL_SENTINELS:
+                sentinel = NULL_SENTINELS[name]
+                values = [None if value == sentinel else value for value in values]
+            columns.append(values)
+        return list(zip(*columns))
+
+    def to_dicts(self) -> List[Dict[str, Any]]:
+        """将所有行序列化为字典列表，字段与 PlayerModel.to_dict 相同"""
+        return [row.to_dict() for row in self]
@@ -0,0 +1,345 @@
+"""
+修炼服务模块
+
+批量修炼引擎：将整个修士群体的修炼状态保存在 NumPy 数组中，
+每次时间流逝只需少量向量化运算即可推进所有修士，
+避免每个 PlayerModel 各自订阅 'time_pass' 事件带来的逐个调用开销。
+"""
+import logging
+from typing import List, Optional
+
+import numpy as np
+
+from core.eventmanager import EventManager
+from dao.playerDAO import PlayerDAO
+from dao.writeBehind import WriteBehindQueue
+from model.playerModel import PlayerModel, REALMS, CULTIVATE_EXP_PER_YEAR
+from model.playerTable import PlayerTable
+from utils.spiritroot import SpiritRoot
+
+# 各境界的突破门槛、突破概率和寿元，按境界等级索引
+EXP_REQUIRED = np.array([realm['exp_required'] for realm in REALMS], dtype=np.float64)
+BREAKTHROUGH_PROBABILITY = np.array([realm['probability'] for realm in REALMS], dtype=np.float64)
+LIFESPAN = np.array([realm['lifespan'] for realm in REALMS], dtype=np.int64)
+MAX_REALM_LEVEL = len(REALMS) - 1
+
+# 修士突破和死亡时发布的事件，同一次推进内按玩家ID合并
+BREAKTHROUGH_EVENT = 'player.breakthrough'
+DEATH_EVENT = 'player.death'
+# 修炼推进暂存的事件类型，推进结束时只发布这些类型，不影响其他调用方暂存的事件
+CULTIVATION_EVENTS = (BREAKTHROUGH_EVENT, DEATH_EVENT)
+
+
+class CultivationService:
+    """
+    批量修炼服务类
+
+    负责整个修士群体的修炼推进，包括：
+    - 从玩家对象加载修炼状态到数组
+    - 每个时间单位向量化地增加修为、年龄
+    - 按境界突破概率进行突破判定
+    - 寿元耗尽的修士标记为死亡
+    - 将结果批量写回玩家对象和数据库
+
+    每年的规则：
+    1. 存活修士年龄+1，修为增加 CULTIVATE_EXP_PER_YEAR * 修炼系数
+    2. 修为达到下一境界门槛的修士，以当前境界的 probability 尝试突破，每年至多突破一次
+    3. 年龄超过当前境界寿元（-1表示无限）的修士死亡
+
+    多年推进使用 fast_forward：每个修士在一个境界内的修为增长是确定的，
+    可以直接算出达到下一境界门槛的年份；之后每年以固定概率尝试突破，等待年数服从几何分布；
+    寿元耗尽的年份也可以直接算出。因此每个境界只需一次向量化计算，不必逐年推进，
+    结果与逐年推进同分布。
+
+    提供事件管理器时，突破和死亡会暂存为 'player.breakthrough'（player_id, realm_level）
+    和 'player.death'（player_id, age）事件，每次推进结束时批量发布，没有监听器时不生成事件。
+
+    Attributes:
+        ids (np.ndarray): 玩家ID
+        current_exp (np.ndarray): 当前修为
+        realm_level (np.ndarray): 境界等级
+        age (np.ndarray): 年龄
+        cultivate_coef (np.ndarray): 修炼系数
+        is_dead (np.ndarray): 是否死亡
+        changed (np.ndarray): 自加载或上次保存以来修炼状态是否有变化，保存时只写入这些修士
+    """
+
+    def __init__(self, event_manager: Optional[EventManager] = None, seed: Optional[int] = None):
+        """
+        初始化修炼服务
+
+        Args:
+            event_manager: 事件管理器实例，提供时订阅 'time_pass' 事件
+            seed: 随机数种子，用于复现模拟结果
+        """
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.rng = np.random.default_rng(seed)
+        self.players: List[PlayerModel] = []
+        self.table: Optional[PlayerTable] = None
+        self.ids = np.empty(0, dtype=np.int64)
+        self.current_exp = np.empty(0, dtype=np.float64)
+        self.realm_level = np.empty(0, dtype=np.int64)
+        self.age = np.empty(0, dtype=np.int64)
+        self.cultivate_coef = np.empty(0, dtype=np.float64)
+        self.is_dead = np.empty(0, dtype=bool)
+        self.changed = np.empty(0, dtype=bool)
+
+        self.event_manager = event_manager
+        if event_manager:
+            event_manager.subscribe('time_pass', self.on_time_pass)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def load(self, players: List[PlayerModel]) -> None:
+        """
+        从玩家对象加载修炼状态
+
+        Args:
+            players: 参与修炼的玩家列表
+        """
+        self.players = list(players)
+        self.ids = np.fromiter((p.id for p in self.players), dtype=np.int64, count=len(self.players))
+        self.current_exp = np.fromiter((p.current_exp for p in self.players), dtype=np.float64, count=len(self.players))
+        self.realm_level = np.fromiter((p.realm_level for p in self.players), dtype=np.int64, count=len(self.players))
+        self.age = np.fromiter((p.age for p in self.players), dtype=np.int64, count=len(self.players))
+        self.cultivate_coef = np.fromiter((p.get_cultivate_coef for p in self.players), dtype=np.float64,
+                                          count=len(self.players))
+        self.is_dead = np.fromiter((bool(p.isDead) for p in self.players), dtype=bool, count=len(self.players))
+        self.changed = np.zeros(len(self.players), dtype=bool)
+        self.table = None
+        self.logger.debug(f"加载修炼状态，共 {len(self.players)} 人")
+
+    def load_table(self, table: PlayerTable) -> None:
+        """
+        从列式玩家表加载修炼状态，不需要物化玩家对象
+
+        Args:
+            table: 玩家表
+        """
+        columns = table.columns
+        self.table = table
+        self.players = []
+        self.ids = columns['id'].copy()
+        self.current_exp = columns['current_exp'].copy()
+        self.realm_level = columns['realm_level'].copy()
+        self.age = columns['age'].copy()
+        self.cultivate_coef = SpiritRoot.coefficients_for_codes(columns['root_code'])
+        # 没有编码的灵根（如含重复属性的手工输入）按文本计算
+        for index in np.flatnonzero(columns['root_code'] < 0).tolist():
+            self.cultivate_coef[index] = table.get(self.ids[index].item()).get_cultivate_coef
+        self.is_dead = columns['isDead'].astype(bool)
+        self.changed = np.zeros(len(table), dtype=bool)
+        self.logger.debug(f"从玩家表加载修炼状态，共 {len(table)} 人")
+
+    def tick(self, years: int = 1) -> None:
+        """
+        推进指定年数的修炼
+
+        Args:
+            years: 推进的年数
+        """
+        for _ in range(years):
+            self._step()
+        if self.event_manager is not None:
+            self.event_manager.flush_events(CULTIVATION_EVENTS)
+
+    def fast_forward(self, years: int) -> None:
+        """
+        以解析方式推进指定年数，结果与 tick(years) 同分布
+
+        每轮处理所有仍在推进中的修士的当前境界：
+        1. 达到下一境界门槛的年份：修为每年增加固定值，直接求出
+        2. 突破的年份：从达到门槛起每年以 probability 成功，等待年数按几何分布抽样
+        3. 寿元耗尽的年份：年龄超过当前境界寿元的第一年
+        先到的事件决定本轮结果：在推进期限内突破的修士进入下一轮，其余修士结束推进。
+        轮数不超过境界数，与推进年数无关。
+
+        Args:
+            years: 推进的年数
+        """
+        if years <= 0:
+            return
+        never = years + 1
+        rate = CULTIVATE_EXP_PER_YEAR * self.cultivate_coef
+        elapsed = np.zeros(len(self.ids), dtype=np.int64)
+        active = np.flatnonzero(~self.is_dead)
+        rounds = 0
+        while len(active):
+            rounds += 1
+            level = self.realm_level[active]
+            exp = self.current_exp[active]
+            age = self.age[active]
+            gain = rate[active]
+            remaining = years - elapsed[active]
+
+            # 达到下一境界门槛需要的年数，至少1年（每年至多突破一次）
+            can_rise = level < MAX_REALM_LEVEL
+            required = EXP_REQUIRED[np.minimum(level + 1, MAX_REALM_LEVEL)]
+            need = required - exp
+            with np.errstate(divide='ignore', invalid='ignore'):
+                ready = np.ceil(need / gain)
+            ready = np.where(gain > 0, np.clip(np.nan_to_num(ready, nan=never), 1, never), never)
+            ready = np.where(need <= 0, 1, ready)
+            ready = np.where(can_rise, ready, never).astype(np.int64)
+            # 修正除法的舍入误差，使门槛判定与 exp + k * gain >= required 一致
+            finite = ready < never
+            ready -= finite & (ready > 1) & (exp + (ready - 1) * gain >= required)
+            ready += finite & (exp + ready * gain < required)
+
+            # 从达到门槛的那一年起，每年以当前境界的概率尝试突破
+            probability = BREAKTHROUGH_PROBABILITY[level]
+            breakthrough_at = np.full(len(active), never, dtype=np.int64)
+            sample = (ready <= remaining) & (probability > 0)
+            breakthrough_at[sample] = ready[sample] + self.rng.geometric(probability[sample]) - 1
+
+            lifespan = LIFESPAN[level]
+            death_at = np.where(lifespan >= 0, np.maximum(lifespan - age + 1, 1), never)
+
+            # 同一年先突破后判定寿元，突破当年按新境界的寿元判定
+            broke = breakthrough_at <= np.minimum(death_at, remaining)
+            died = ~broke & (death_at <= remaining)
+            passed = np.where(broke, breakthrough_at, np.where(died, death_at, remaining))
+
+            self.current_exp[active] = exp + passed * gain
+            self.age[active] = age + passed
+            self.realm_level[active] = level + broke
+            elapsed[active] += passed
+            new_lifespan = LIFESPAN[level + broke]
+            died |= broke & (new_lifespan >= 0) & (age + passed > new_lifespan)
+            self.is_dead[active] |= died
+            self.changed[active] = True
+
+            if self.event_manager is not None:
+                success = np.zeros(len(self.ids), dtype=bool)
+                success[active] = broke
+                dead = np.zeros(len(self.ids), dtype=bool)
+                dead[active] = died
+                self._queue_events(success, dead)
+            active = active[broke & ~died & (elapsed[active] < years)]
+
+        if self.event_manager is not None:
+            self.event_manager.flush_events(CULTIVATION_EVENTS)
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug(f"修炼快进 {years} 年，共 {rounds} 轮: 存活 {int((~self.is_dead).sum())} 人")
+
+    def _step(self) -> None:
+        """推进一年，所有修士一次向量化更新"""
+        alive = ~self.is_dead
+        self.changed |= alive
+        self.current_exp += np.where(alive, CULTIVATE_EXP_PER_YEAR * self.cultivate_coef, 0.0)
+        self.age += alive
+
+        # 突破判定：修为达到下一境界门槛且掷骰成功
+        next_level = np.minimum(self.realm_level + 1, MAX_REALM_LEVEL)
+        ready = alive & (self.realm_level < MAX_REALM_LEVEL) & (self.current_exp >= EXP_REQUIRED[next_level])
+        success = ready & (self.rng.random(len(self.ids)) < BREAKTHROUGH_PROBABILITY[self.realm_level])
+        self.realm_level += success
+
+        # 寿元判定
+        lifespan = LIFESPAN[self.realm_level]
+        died = alive & (lifespan >= 0) & (self.age > lifespan)
+        self.is_dead |= died
+        if self.event_manager is not None:
+            self._queue_events(success, died)
+
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug(f"修炼推进一年: 突破 {int(success.sum())} 人, 存活 {int((~self.is_dead).sum())} 人")
+
+    def _queue_events(self, success: np.ndarray, died: np.ndarray) -> None:
+        """暂存本年突破和死亡的修士事件，同一修士多次突破只保留最后的境界"""
+        event_manager = self.event_manager
+        if success.any() and event_manager.listener_count(BREAKTHROUGH_EVENT):
+            indices = np.flatnonzero(success)
+            for player_id, level in zip(self.ids[indices].tolist(), self.realm_level[indices].tolist()):
+                event_manager.queue_event(BREAKTHROUGH_EVENT, player_id, player_id=player_id, realm_level=level)
+        if died.any() and event_manager.listener_count(DEATH_EVENT):
+            indices = np.flatnonzero(died)
+            for player_id, age in zip(self.ids[indices].tolist(), self.age[indices].tolist()):
+                event_manager.queue_event(DEATH_EVENT, player_id, player_id=player_id, age=age)
+
+    def on_time_pass(self, *args, **kwargs) -> None:
+        """
+        响应时间流逝事件，多年一次流逝时使用 fast_forward
+
+        Args:
+            years: 关键字参数，流逝的年数，默认为1
+        """
+        years = kwargs.get('years', 1)
+        if years > 1:
+            self.fast_forward(years)
+        else:
+            self.tick(years)
+
+    def sync_to_models(self) -> None:
+        """将数组中的修炼状态批量写回玩家对象或玩家表"""
+        if self.table is not None:
+            columns = self.table.columns
+            columns['current_exp'][:] = self.current_exp
+            columns['realm_level'][:] = self.realm_level
+            columns['age'][:] = self.age
+            columns['isDead'][:] = self.is_dead
+            return
+        for player, exp, level, age, dead in zip(self.players, self.current_exp.tolist(),
+                                                 self.realm_level.tolist(), self.age.tolist(),
+                                                 self.is_dead.tolist()):
+            player.current_exp = exp
+            player.realm_level = level
+            player.age = age
+            player.isDead = int(dead)
+
+    # 修炼状态写回数据库时的列，顺序与 _cultivation_rows 一致
+    SAVE_COLUMNS = ('age', 'realm_level', 'current_exp', 'is_dead')
+
+    def _cultivation_rows(self, indices: np.ndarray) -> List[tuple]:
+        """指定下标修士的 (age, realm_level, current_exp, is_dead, id) 行元组列表"""
+        return list(zip(self.age[indices].tolist(), self.realm_level[indices].tolist(),
+                        self.current_exp[indices].tolist(), self.is_dead[indices].astype(np.int64).tolist(),
+                        self.ids[indices].tolist()))
+
+    def save(self, player_dao: PlayerDAO) -> bool:
+        """
+        将修炼状态批量写回玩家对象和数据库
+
+        只写入自加载或上次保存以来修炼状态有变化的修士，早已死亡或未推进的修士不再重复写入。
+        写入成功后清除这些玩家对象上修炼相关列的修改标记，其他列的修改仍保留。
+        在 transaction() 中调用时标记在语句执行成功后即清除，外层事务回滚不会恢复，
+        回滚后应重新加载玩家。
+
+        Args:
+            player_dao: 玩家数据访问对象
+
+        Returns:
+            bool: 保存是否成功
+        """
+        self.sync_to_models()
+        indices = np.flatnonzero(self.changed)
+        rows = self._cultivation_rows(indices)
+        success = player_dao.update_cultivation_many(rows) if rows else True
+        if success:
+            if self.table is None:
+                for index in indices.tolist():
+                    self.players[index].mark_clean(*self.SAVE_COLUMNS)
+            self.changed[:] = False
+            self.logger.info(f"成功保存修炼状态，共 {len(rows)} 人")
+        return success
+
+    def save_behind(self, queue: WriteBehindQueue) -> None:
+        """
+        将修炼状态写回玩家对象，并登记到后台写入队列，不等待数据库写入
+
+        从玩家对象加载时只登记有修改的玩家和列，从玩家表加载时只登记修炼状态有变化的修士，
+        例如已死亡的修士不再登记。
+
+        Args:
+            queue: 后台写入队列
+        """
+        self.sync_to_models()
+        if self.table is None:
+            count = sum(queue.enqueue(player) for player in self.players)
+        else:
+            rows = self._cultivation_rows(np.flatnonzero(self.changed))
+            queue.enqueue_rows(self.SAVE_COLUMNS, rows)
+            count = len(rows)
+        self.changed[:] = False
+        self.logger.debug(f"修炼状态已登记到后台写入队列，共 {count} 人")
@@ -4,10 +4,12 @@
 处理玩家相关的业务逻辑，连接控制层和数据访问层。
 """
 import logging
-from typing import List, Optional, Dict, Any
+from contextlib import contextmanager
+from typing import Iterator, List, Optional, Dict, Any, Tuple
 from dao.playerDAO import PlayerDAO
 from model.playerModel import PlayerModel
 from core.eventmanager import EventManager
+from service.cultivationService import CultivationService
 
 class PlayerService:
     """
@@ -17,6 +19,8 @@ class PlayerService:
     - 创建和初始化玩家
     - 玩家数据的增删改查
     - 特殊玩家（如掌门）的处理
+    - 跨多次数据访问的事务
+    - 在世玩家的批量修炼（由 CultivationService 响应 'time_pass' 事件）
     """
     
     def __init__(self, event_manager: EventManager):
@@ -28,8 +32,20 @@ class PlayerService:
         """
         self.event_manager = event_manager
         self.player_dao = PlayerDAO()
+        self.cultivation = CultivationService(event_manager)
         self.logger = logging.getLogger(self.__class__.__name__)
     
+    @contextmanager
+    def transaction(self):
+        """
+        开启工作单元事务
+
+        块内的所有 PlayerDAO 调用共用一个连接并一次提交，任一操作失败则整体回滚；
+        可以嵌套，内层使用保存点。
+        """
+        with self.player_dao.transaction():
+            yield
+
     def create_player(self, player:PlayerModel) -> Optional[PlayerModel]:
         """
         创建新玩家
@@ -69,6 +85,30 @@ class PlayerService:
             self.logger.error(f"删除玩家失败: {str(e)}")
             return False
     
+    def load_cultivation(self) -> int:
+        """
+        将所有在世玩家加载到批量修炼服务，之后的 'time_pass' 事件会推进他们的修炼
+
+        Returns:
+            int: 参与修炼的人数
+        """
+        players = self.get_all_players()
+        self.cultivation.load(players)
+        return len(players)
+
+    def save_cultivation(self) -> bool:
+        """
+        将批量修炼的结果写回玩家对象和数据库
+
+        Returns:
+            bool: 保存是否成功
+        """
+        try:
+            return self.cultivation.save(self.player_dao)
+        except Exception as e:
+            self.logger.error(f"保存修炼状态失败: {str(e)}")
+            return False
+
     def get_all_players(self) -> List[PlayerModel]:
         """
         获取所有玩家列表
@@ -84,6 +124,46 @@ class PlayerService:
             self.logger.error(f"获取玩家列表失败: {str(e)}")
             return []
     
+    def iter_players(self, batch_size: int = 500) -> Iterator[PlayerModel]:
+        """
+        流式遍历所有玩家，内存占用与玩家总数无关
+
+        Args:
+            batch_size: 每批从数据库读取的行数
+
+        Yields:
+            PlayerModel: 玩家对象
+        """
+        return self.player_dao.iter_all(batch_size)
+
+    def get_players_page(self, after: Optional[Tuple[Any, int]] = None, limit: int = 100,
+                         sort_key: str = 'id', descending: bool = False) -> Tuple[List[PlayerModel], Optional[Tuple[Any, int]]]:
+        """
+        键集分页获取玩家列表
+
+        Args:
+            after: 上一页返回的游标，为None时获取第一页
+            limit: 每页人数
+            sort_key: 排序字段
+            descending: 是否降序
+
+        Returns:
+            Tuple[List[PlayerModel], Optional[Tuple[Any, int]]]: 本页玩家列表和下一页的游标（没有下一页时为None）
+
+        Raises:
+            ValueError: 不支持的排序字段，或 limit 小于1
+        """
+        try:
+            players = self.player_dao.get_page(after, limit, sort_key, descending)
+            next_after = self.player_dao.page_cursor(players[-1], sort_key) if len(players) == limit else None
+            self.logger.info(f"成功获取玩家分页列表，共 {len(players)} 人")
+            return players, next_after
+        except ValueError:
+            raise
+        except Exception as e:
+            self.logger.error(f"获取玩家分页列表失败: {str(e)}")
+            return [], None
+
     def get_master(self) -> List[dict]:
         """
         获取所有掌门的详细信息
@@ -92,13 +172,13 @@ class PlayerService:
             List[dict]: 掌门详细信息列表，包括徒弟数量等
         """
         try:
-            masters = self.player_dao.get_all_masters()
+            masters = self.player_dao.get_master()
+            counts = self.player_dao.count_disciples_by_teacher(master.id for master in masters)
             master_details = []
             
             for master in masters:
-                disciples = self.player_dao.get_all_masters(master.id)[0]
                 detail = master.to_dict()
-                detail['disciple_count'] = len(disciples)
+                detail['disciple_count'] = counts.get(master.id, 0)
                 master_details.append(detail)
             
             self.logger.info(f"成功获取掌门详情，共 {len(masters)} 人")
@@ -107,6 +187,42 @@ class PlayerService:
             self.logger.error(f"获取掌门详情失败: {str(e)}")
             return []
     
+    def succeed_master(self, master_id: int, successor_id: int) -> bool:
+        """
+        掌门传位：原掌门身故，继任者成为掌门并接收原掌门的所有徒弟
+
+        所有修改在同一事务中完成，原掌门不存在、已身故或不是掌门，以及传位给自己时整体回滚。
+
+        Args:
+            master_id: 原掌门ID
+            successor_id: 继任者ID
+
+        Returns:
+            bool: 传位是否成功
+        """
+        try:
+            with self.transaction():
+                if successor_id == master_id:
+                    raise ValueError(f"掌门不能传位给自己 ID={master_id}")
+                master = self.player_dao.get_by_id(master_id)
+                if not master or not master.isMaster:
+                    raise ValueError(f"未找到在世的掌门 ID={master_id}")
+                successor = self.player_dao.get_by_id(successor_id)
+                if not successor:
+                    raise ValueError(f"未找到继任者 ID={successor_id}")
+                if not self.player_dao.fake_delete(master_id):
+                    raise ValueError(f"原掌门已身故 ID={master_id}")
+                successor.isMaster = 1
+                if successor.teacher_id == master_id:
+                    successor.teacher_id = -1
+                self.player_dao.update(successor)
+                self.player_dao.reassign_teacher(master_id, successor_id)
+            self.logger.info(f"掌门 ID={master_id} 传位于 ID={successor_id}")
+            return True
+        except Exception as e:
+            self.logger.error(f"掌门传位失败: {str(e)}")
+            return False
+
     def update_player(self, player_id: int, player_data: dict) -> Optional[PlayerModel]:
         """
         更新玩家信息
@@ -147,16 +263,13 @@ class PlayerService:
             Optional[Dict[str, Any]]: 包含玩家和伴侣信息的字典
         """
         try:
-            player = self.player_dao.get_by_id(player_id)
+            player, companion = self.player_dao.get_with_companion(player_id)
             if not player:
                 return None
                 
             result = player.to_dict()
-            
-            if player.companion_id > 0:
-                companion = self.player_dao.get_by_id(player.companion_id)
-                if companion:
-                    result['companion'] = companion.to_dict()
+            if companion:
+                result['companion'] = companion.to_dict()
                     
             return result
         except Exception as e:
@@ -0,0 +1,28 @@
+"""
+测试公共夹具
+
+每个用到数据库的测试在临时目录中新建数据库并初始化全局连接池（同时执行迁移），测试结束时关闭。
+"""
+import pytest
+
+from dao.connectionPool import db_pool
+from model.playerModel import PlayerModel
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    """已初始化连接池的临时数据库路径"""
+    path = str(tmp_path / 'test.db')
+    db_pool.initialize(path, pool_size=3, timeout=5.0)
+    yield path
+    db_pool.close()
+
+
+def make_player(**attributes) -> PlayerModel:
+    """创建不订阅事件的玩家对象，attributes 覆盖默认属性"""
+    player = PlayerModel(None)
+    player.name = attributes.pop('name', '测试修士')
+    player.root = attributes.pop('root', '金木_普通')
+    for name, value in attributes.items():
+        setattr(player, name, value)
+    return player
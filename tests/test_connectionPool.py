@@ -0,0 +1,99 @@
+import threading
+import time
+
+import pytest
+
+from dao.connectionPool import db_pool
+
+
+def test_wal_mode_and_nested_reuse(db_path):
+    with db_pool.get_connection() as outer:
+        assert outer.execute('PRAGMA journal_mode').fetchone()[0] == 'wal'
+        with db_pool.get_connection() as inner:
+            assert inner is outer
+    assert db_pool.stats()['in_use'] == 0
+
+
+def test_checkout_times_out_when_pool_exhausted(tmp_path):
+    db_pool.initialize(str(tmp_path / 'pool.db'), pool_size=1, timeout=0.2, migrate=False)
+    try:
+        errors = []
+        with db_pool.get_connection():
+            def borrow():
+                try:
+                    with db_pool.get_connection():
+                        pass
+                except TimeoutError as e:
+                    errors.append(e)
+            thread = threading.Thread(target=borrow)
+            thread.start()
+            thread.join()
+        assert len(errors) == 1
+        assert db_pool.stats()['timeouts'] == 1
+    finally:
+        db_pool.close()
+
+
+def test_slow_connect_does_not_hold_pool_lock(tmp_path, monkeypatch):
+    db_pool.initialize(str(tmp_path / 'pool.db'), pool_size=2, timeout=5.0, migrate=False)
+    release = threading.Event()
+    original = db_pool._create_connection
+    calls = []
+
+    def slow_create():
+        calls.append(1)
+        if len(calls) == 2:
+            release.wait(5)
+        return original()
+
+    monkeypatch.setattr(db_pool, '_create_connection', slow_create)
+    try:
+        with db_pool.get_connection():
+            def borrow():
+                with db_pool.get_connection():
+                    pass
+            thread = threading.Thread(target=borrow)
+            thread.start()
+            while len(calls) < 2:
+                time.sleep(0.01)
+            start = time.perf_counter()
+            stats = db_pool.stats()
+            assert time.perf_counter() - start < 0.5
+            assert stats['size'] == 1
+        release.set()
+        thread.join()
+        assert db_pool.stats()['created'] == 2
+    finally:
+        release.set()
+        db_pool.close()
+
+
+def test_get_connection_after_close_raises(tmp_path):
+    path = str(tmp_path / 'pool.db')
+    db_pool.initialize(path, pool_size=1, timeout=5.0, migrate=False)
+    db_pool.close()
+    with pytest.raises(RuntimeError):
+        with db_pool.get_connection():
+            pass
+    # 重新初始化后可以继续使用
+    db_pool.initialize(path, pool_size=1, timeout=5.0, migrate=False)
+    try:
+        with db_pool.get_connection() as conn:
+            assert conn.execute('SELECT 1').fetchone()[0] == 1
+    finally:
+        db_pool.close()
+
+
+def test_reinitialize_while_checked_out_keeps_stats_consistent(tmp_path):
+    path = str(tmp_path / 'pool.db')
+    db_pool.initialize(path, pool_size=1, timeout=5.0, migrate=False)
+    try:
+        with db_pool.get_connection() as stale:
+            db_pool.initialize(path, pool_size=1, timeout=5.0, migrate=False)
+        assert db_pool.stats()['in_use'] == 0
+        with db_pool.get_connection() as conn:
+            assert conn is not stale
+            assert db_pool.stats()['in_use'] == 1
+        assert db_pool.stats()['in_use'] == 0
+    finally:
+        db_pool.close()
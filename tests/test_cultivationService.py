@@ -0,0 +1,181 @@
+import numpy as np
+
+from controller.playerController import PlayerController
+from core.eventmanager import EventManager
+from dao.playerDAO import PlayerDAO
+from model.playerModel import CULTIVATE_EXP_PER_YEAR, REALMS, PlayerModel
+from service.cultivationService import CultivationService
+from tests.conftest import make_player
+
+
+def _scalar_tick(state, rng, years):
+    """按类文档中的每年规则逐个修士推进，作为向量化实现的对照"""
+    max_level = len(REALMS) - 1
+    for _ in range(years):
+        draws = rng.random(len(state))
+        for player, draw in zip(state, draws):
+            if player['dead']:
+                continue
+            player['exp'] += CULTIVATE_EXP_PER_YEAR * player['coef']
+            player['age'] += 1
+            level = player['level']
+            if (level < max_level and player['exp'] >= REALMS[level + 1]['exp_required']
+                    and draw < REALMS[level]['probability']):
+                player['level'] = level + 1
+            lifespan = REALMS[player['level']]['lifespan']
+            if lifespan >= 0 and player['age'] > lifespan:
+                player['dead'] = True
+
+
+def _players():
+    roots = ['金_天', '金木_普通', '金木水火土_普通', '风冰_地', '木_变异']
+    return [make_player(id=i, root=roots[i % len(roots)], age=(i * 7) % 140,
+                        realm_level=i % 3, current_exp=float((i * 37) % 1500))
+            for i in range(200)]
+
+
+def test_tick_matches_scalar_rules():
+    players = _players()
+    service = CultivationService(seed=42)
+    service.load(players)
+    state = [{'exp': p.current_exp, 'age': p.age, 'level': p.realm_level, 'dead': bool(p.isDead),
+              'coef': p.get_cultivate_coef} for p in players]
+
+    service.tick(30)
+    _scalar_tick(state, np.random.default_rng(42), 30)
+
+    assert service.age.tolist() == [p['age'] for p in state]
+    assert service.realm_level.tolist() == [p['level'] for p in state]
+    assert service.is_dead.tolist() == [p['dead'] for p in state]
+    np.testing.assert_allclose(service.current_exp, [p['exp'] for p in state])
+
+
+def test_sync_to_models_writes_back_arrays():
+    players = _players()
+    service = CultivationService(seed=1)
+    service.load(players)
+    service.tick(5)
+    service.sync_to_models()
+    assert [p.age for p in players] == service.age.tolist()
+    assert [p.isDead for p in players] == service.is_dead.astype(int).tolist()
+
+
+def test_time_pass_event_drives_service():
+    event_manager = EventManager()
+    service = CultivationService(event_manager, seed=3)
+    service.load([make_player(id=1, age=10)])
+    event_manager.publish('time_pass')
+    assert service.age.tolist() == [11]
+
+
+def test_player_model_does_not_subscribe_time_pass():
+    event_manager = EventManager()
+    PlayerModel(event_manager)
+    assert event_manager.listener_count('time_pass') == 0
+
+
+def test_controller_pass_time_persists_cultivation(db_path):
+    PlayerDAO().insert_many([make_player(name=f'修士{i}', age=20) for i in range(10)])
+    controller = PlayerController(EventManager())
+
+    response = controller.pass_time(3)
+
+    assert response['success'] and response['data'] == 10
+    assert {p.age for p in PlayerDAO(cache_size=0).get_all()} == {23}
+
+
+def test_save_clears_only_cultivation_dirty_columns(db_path):
+    dao = PlayerDAO()
+    players = [make_player(name=f'修士{i}') for i in range(3)]
+    dao.insert_many(players)
+    players[0].name = '未保存'
+    service = CultivationService(seed=1)
+    service.load(players)
+    service.tick(3)
+    assert service.save(dao)
+    assert players[0].dirty_columns == {'name'}
+    assert not players[1].is_dirty
+    assert PlayerDAO(cache_size=0).get_by_id(players[1].id).age == players[1].age
+
+
+def test_tick_flushes_only_cultivation_events():
+    manager = EventManager()
+    seen = []
+    manager.subscribe('other', lambda **kwargs: seen.append('other'))
+    manager.queue_event('other')
+    service = CultivationService(seed=1)
+    service.event_manager = manager
+    service.load(_players())
+    service.tick(1)
+    assert seen == [] and manager.pending_events() == 1
+
+
+def _population(copies):
+    """突破与寿元耗尽相互竞争的修士：已达门槛，寿元只剩几年"""
+    archetypes = [
+        dict(realm_level=1, age=148, current_exp=1000.0),
+        dict(realm_level=4, age=997, current_exp=1e6),
+        dict(realm_level=7, age=9995, current_exp=1e9),
+        dict(realm_level=0, age=95, current_exp=0.0),
+    ]
+    return [make_player(id=i + 1, root='金木水火土_普通', **archetypes[i % len(archetypes)])
+            for i in range(copies * len(archetypes))]
+
+
+def test_fast_forward_matches_tick_distribution():
+    results = []
+    for advance, seed in (('tick', 3), ('fast_forward', 4)):
+        service = CultivationService(seed=seed)
+        service.load(_population(2000))
+        getattr(service, advance)(20)
+        results.append(service)
+    ticked, forwarded = results
+    assert abs(ticked.realm_level.mean() - forwarded.realm_level.mean()) < 0.02
+    assert 0.02 < ticked.is_dead.mean() < 0.06
+    assert abs(ticked.is_dead.mean() - forwarded.is_dead.mean()) < 0.01
+    for level in range(int(ticked.realm_level.max()) + 1):
+        assert abs((ticked.realm_level == level).mean() - (forwarded.realm_level == level).mean()) < 0.01
+    # 存活者的年龄和修为与抽样无关
+    alive = ~ticked.is_dead & ~forwarded.is_dead
+    assert np.array_equal(ticked.age[alive], forwarded.age[alive])
+    assert np.allclose(ticked.current_exp[alive], forwarded.current_exp[alive])
+
+
+def test_fast_forward_skips_dead_and_zero_years():
+    players = _players()
+    players[0].isDead = 1
+    service = CultivationService(seed=5)
+    service.load(players)
+    before = (service.age.copy(), service.current_exp.copy())
+    service.fast_forward(0)
+    assert np.array_equal(service.age, before[0])
+    service.fast_forward(50)
+    assert service.age[0] == before[0][0] and service.current_exp[0] == before[1][0]
+
+
+class RecordingDAO(PlayerDAO):
+    """记录每次回写修炼进度的行"""
+
+    def __init__(self):
+        super().__init__()
+        self.saved_rows = []
+
+    def update_cultivation_many(self, rows):
+        self.saved_rows.append(list(rows))
+        return super().update_cultivation_many(rows)
+
+
+def test_save_writes_only_changed_rows(db_path):
+    dao = RecordingDAO()
+    players = [make_player(name=f'修士{i}') for i in range(3)]
+    players[0].isDead = 1
+    dao.insert_many(players)
+    service = CultivationService(seed=1)
+    service.load(players)
+    service.tick(2)
+    assert service.save(dao)
+    assert [row[-1] for row in dao.saved_rows[0]] == [players[1].id, players[2].id]
+    # 没有推进时再次保存不写入任何行
+    assert service.save(dao)
+    assert len(dao.saved_rows) == 1
+    assert PlayerDAO(cache_size=0).get_by_id(players[2].id).age == players[2].age
@@ -0,0 +1,153 @@
+import asyncio
+import gc
+import time
+
+import pytest
+
+from core.eventmanager import EventManager
+
+
+class Counter:
+    def __init__(self):
+        self.calls = []
+
+    def on_event(self, **kwargs):
+        self.calls.append(kwargs)
+        return len(self.calls)
+
+
+def test_bound_methods_are_strong_by_default():
+    manager = EventManager()
+    manager.subscribe('tick', Counter().on_event)
+    gc.collect()
+    assert manager.listener_count('tick') == 1
+    assert manager.publish('tick', n=1) == [1]
+
+
+def test_weak_subscription_is_dropped_after_collection():
+    manager = EventManager()
+    counter = Counter()
+    manager.subscribe('tick', counter.on_event, weak=True)
+    assert manager.publish('tick', n=1) == [1]
+    del counter
+    gc.collect()
+    assert manager.publish('tick', n=2) == []
+    assert manager.listener_count('tick') == 0
+
+
+def test_collection_during_purge_is_not_lost(monkeypatch):
+    manager = EventManager()
+    counters = {'a': Counter(), 'b': Counter()}
+    for name in counters:
+        manager.subscribe(name, counters[name].on_event, weak=True)
+    original = manager._set_entries
+
+    def set_entries(pattern, entries):
+        # 清理 a 时 b 的监听器恰好被回收，回收回调在清理过程中触发
+        counters.pop('b', None)
+        gc.collect()
+        original(pattern, entries)
+
+    monkeypatch.setattr(manager, '_set_entries', set_entries)
+    del counters['a']
+    gc.collect()
+    assert manager.publish('a') == []
+    monkeypatch.setattr(manager, '_set_entries', original)
+    assert manager.publish('b') == []
+    assert manager.listener_count('a') == manager.listener_count('b') == 0
+
+
+def test_duplicate_subscription_and_unsubscribe():
+    manager = EventManager()
+    counter = Counter()
+    assert manager.subscribe('tick', counter.on_event)
+    assert not manager.subscribe('tick', counter.on_event)
+    assert manager.unsubscribe('tick', counter.on_event)
+    assert manager.publish('tick') == []
+
+
+def test_publish_async_runs_listeners_concurrently_with_timeouts():
+    manager = EventManager(async_timeout=1.0)
+
+    async def slow(**kwargs):
+        await asyncio.sleep(0.2)
+        return 'slow'
+
+    async def hangs(**kwargs):
+        await asyncio.sleep(10)
+
+    def sync_listener(**kwargs):
+        time.sleep(0.2)
+        return kwargs['n']
+
+    manager.subscribe('tick', slow)
+    manager.subscribe('tick', hangs, timeout=0.05)
+    manager.subscribe('tick', sync_listener)
+    start = time.perf_counter()
+    results = asyncio.run(manager.publish_async('tick', n=3))
+    assert results == ['slow', None, 3]
+    assert time.perf_counter() - start < 0.35
+
+
+def test_publish_parallel_keeps_per_type_order():
+    manager = EventManager(max_pending=4)
+    seen = []
+
+    def record(n):
+        time.sleep(0.01 * (5 - n))
+        seen.append(n)
+        return n * 10
+
+    def fails(n):
+        raise ValueError(n)
+
+    manager.subscribe('tick', record)
+    manager.subscribe('tick', fails)
+    try:
+        dispatches = [manager.publish_parallel('tick', n=n) for n in range(5)]
+        assert [d.result(timeout=5) for d in dispatches] == [[n * 10, None] for n in range(5)]
+        # 同一类型的发布按顺序执行，不受单次耗时影响
+        assert seen == list(range(5))
+    finally:
+        manager.shutdown()
+
+
+def test_publish_many_calls_batch_listeners_once():
+    manager = EventManager()
+    batches, singles = [], []
+    manager.subscribe('player.death', batches.append, batch=True)
+    manager.subscribe('player.death', lambda **kwargs: singles.append(kwargs['player_id']))
+    payloads = [{'player_id': i} for i in (1, 2, 1)]
+    assert manager.publish_many('player.death', payloads, key=lambda p: p['player_id']) == 2
+    assert batches == [[{'player_id': 1}, {'player_id': 2}]]
+    assert singles == [1, 2]
+    manager.publish('player.death', player_id=3)
+    assert batches[-1] == [{'player_id': 3}]
+
+
+def test_positional_args_rejected_with_batch_listener():
+    manager = EventManager()
+    calls = []
+    manager.subscribe('tick', lambda *args, **kwargs: calls.append(args))
+    manager.subscribe('tick', calls.append, batch=True)
+    with pytest.raises(TypeError):
+        manager.publish('tick', 1)
+    with pytest.raises(TypeError):
+        manager.publish_parallel('tick', 1)
+    with pytest.raises(TypeError):
+        asyncio.run(manager.publish_async('tick', 1))
+    assert calls == []
+
+
+def test_queue_event_coalesces_and_flushes_requested_types():
+    manager = EventManager()
+    seen = []
+    manager.subscribe('#', lambda **kwargs: seen.append(kwargs))
+    manager.queue_event('a', 'k', n=1)
+    manager.queue_event('b', n=2)
+    manager.queue_event('a', 'k', n=3)
+    assert manager.pending_events() == 2
+    assert manager.flush_events(['a']) == 1
+    assert seen == [{'n': 3}]
+    assert manager.flush_events() == 1
+    assert seen == [{'n': 3}, {'n': 2}] and manager.pending_events() == 0
@@ -0,0 +1,39 @@
+import numpy as np
+
+from core.eventmanager import EventManager
+from core.eventstats import LatencyHistogram
+
+
+def test_percentiles_match_numpy():
+    rng = np.random.default_rng(7)
+    samples = rng.lognormal(mean=-7, sigma=1.5, size=20000)
+    histogram = LatencyHistogram(precision=0.05)
+    for value in samples.tolist():
+        histogram.record(value)
+    for q in (50, 95, 99):
+        expected = np.percentile(samples, q)
+        assert abs(histogram.percentile(q) - expected) / expected < 0.03, q
+    assert histogram.percentile(100) == samples.max()
+
+
+def test_value_lies_in_its_bucket():
+    histogram = LatencyHistogram(precision=0.05)
+    histogram.record(0.001)
+    histogram.record(10.0)
+    # 单个样本的估计值与真实值的相对误差不超过半个桶
+    assert abs(histogram.percentile(1) - 0.001) / 0.001 < 0.026
+    assert histogram.percentile(100) == 10.0
+
+
+def test_manager_stats_snapshot():
+    manager = EventManager()
+    manager.enable_stats()
+    manager.subscribe('tick', lambda **kwargs: None)
+    for _ in range(10):
+        manager.publish('tick')
+    stats = manager.stats()['tick']
+    assert (stats['count'], stats['errors']) == (10, 0)
+    (listener,) = stats['listeners'].values()
+    assert listener['count'] == 10
+    manager.disable_stats()
+    assert manager.stats() == {}
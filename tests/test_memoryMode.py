@@ -0,0 +1,81 @@
+import logging
+import os
+import threading
+
+from dao import connectionPool
+from dao.connectionPool import db_pool
+from dao.playerDAO import PlayerDAO
+from tests.conftest import make_player
+
+
+def _count_on_disk(path):
+    db_pool.initialize(path, pool_size=1, timeout=5.0, migrate=False)
+    try:
+        return PlayerDAO(cache_size=0).execute_query('SELECT COUNT(*) FROM players')[0][0]
+    finally:
+        db_pool.close()
+
+
+def test_memory_mode_snapshots_to_disk(tmp_path):
+    path = str(tmp_path / 'save.db')
+    db_pool.initialize(path, pool_size=2, timeout=5.0, mode='memory', snapshot_interval=None)
+    working_path = db_pool._db_path
+    try:
+        assert working_path != path
+        PlayerDAO().insert_many([make_player(name=f'修士{i}') for i in range(5)])
+        assert db_pool.snapshot()
+        assert db_pool.stats()['snapshots'] == 1
+        PlayerDAO().insert(make_player(name='快照后'))
+    finally:
+        db_pool.close()
+    # 关闭时写入最后一次快照并删除工作副本
+    assert not os.path.exists(working_path)
+    assert _count_on_disk(path) == 6
+
+
+def test_memory_mode_warns_without_shm(tmp_path, monkeypatch, caplog):
+    monkeypatch.setattr(connectionPool, 'MEMORY_DIR', None)
+    with caplog.at_level(logging.WARNING, logger='DatabaseConnectionPool'):
+        db_pool.initialize(str(tmp_path / 'save.db'), pool_size=1, timeout=5.0, mode='memory',
+                           snapshot_interval=None, migrate=False)
+        db_pool.close()
+    assert any('/dev/shm' in record.getMessage() for record in caplog.records)
+
+
+def _hold_connection(borrowed, release, name):
+    with db_pool.get_connection() as conn:
+        borrowed.set()
+        release.wait(5)
+        conn.execute('INSERT INTO players (name) VALUES (?)', (name,))
+        conn.commit()
+
+
+def test_close_waits_for_checked_out_connections(tmp_path):
+    path = str(tmp_path / 'save.db')
+    db_pool.initialize(path, pool_size=2, timeout=5.0, mode='memory', snapshot_interval=None)
+    borrowed, release = threading.Event(), threading.Event()
+    thread = threading.Thread(target=_hold_connection, args=(borrowed, release, '晚归'))
+    thread.start()
+    borrowed.wait(5)
+    threading.Timer(0.1, release.set).start()
+    db_pool.close()
+    thread.join()
+    # 借出的连接归还后才写入最后一次快照
+    assert _count_on_disk(path) == 1
+
+
+def test_close_abandons_connections_after_timeout(tmp_path, caplog):
+    path = str(tmp_path / 'save.db')
+    db_pool.initialize(path, pool_size=2, timeout=0.1, mode='memory', snapshot_interval=None)
+    borrowed, release = threading.Event(), threading.Event()
+    thread = threading.Thread(target=_hold_connection, args=(borrowed, release, '未归'))
+    thread.start()
+    borrowed.wait(5)
+    try:
+        with caplog.at_level(logging.WARNING, logger='DatabaseConnectionPool'):
+            db_pool.close()
+    finally:
+        release.set()
+        thread.join()
+    assert any('未归还' in record.getMessage() for record in caplog.records)
+    assert _count_on_disk(path) == 0
@@ -0,0 +1,76 @@
+import sqlite3
+
+from dao.connectionPool import db_pool
+from dao.migrations import MIGRATIONS, _encode_root_v2, current_version
+from dao.playerDAO import PlayerDAO
+from tests.conftest import make_player
+from utils.spiritroot import SpiritRoot
+
+
+def _legacy_database(path):
+    """迁移系统引入前的数据库：只有不含 root_code 的 players 表"""
+    conn = sqlite3.connect(path)
+    conn.execute('''
+        CREATE TABLE players (
+            id INTEGER PRIMARY KEY, name TEXT NOT NULL, age INTEGER DEFAULT 0, sex INTEGER DEFAULT 0,
+            is_master INTEGER DEFAULT 0, is_dead INTEGER DEFAULT 0, father_id INTEGER DEFAULT -1,
+            mother_id INTEGER DEFAULT -1, teacher_id INTEGER DEFAULT -1, companion_id INTEGER DEFAULT -1,
+            root TEXT, attribute TEXT, base_breakup_probability REAL DEFAULT -1,
+            realm_level INTEGER DEFAULT 1, current_exp REAL DEFAULT 0.0
+        )
+    ''')
+    conn.executemany('INSERT INTO players (name, root) VALUES (?, ?)',
+                     [('甲', '木金_普通'), ('乙', '金金_天'), ('丙', '风-地')])
+    conn.commit()
+    conn.close()
+
+
+def test_initialize_migrates_new_database(db_path):
+    assert current_version() == MIGRATIONS[-1][0]
+    dao = PlayerDAO()
+    player = make_player()
+    assert dao.insert(player)
+    assert dao.get_by_id(player.id).name == player.name
+
+
+def test_legacy_database_is_backfilled(tmp_path):
+    path = str(tmp_path / 'legacy.db')
+    _legacy_database(path)
+    db_pool.initialize(path)
+    try:
+        with db_pool.get_connection() as conn:
+            codes = dict(conn.execute('SELECT name, root_code FROM players').fetchall())
+            indexes = {row[1] for row in conn.execute("PRAGMA index_list('players')")}
+        assert codes == {'甲': SpiritRoot.encode('金木_普通'), '乙': None, '丙': SpiritRoot.encode('风_地')}
+        assert {'idx_players_root_code', 'idx_players_master_alive'} <= indexes
+    finally:
+        db_pool.close()
+
+
+def test_migrations_run_once(tmp_path):
+    path = str(tmp_path / 'once.db')
+    db_pool.initialize(path)
+    db_pool.initialize(path)
+    try:
+        with db_pool.get_connection() as conn:
+            versions = [row[0] for row in conn.execute('SELECT version FROM schema_version')]
+        assert versions == [version for version, _, _ in MIGRATIONS]
+    finally:
+        db_pool.close()
+
+
+def test_initialize_can_skip_migrations(tmp_path):
+    db_pool.initialize(str(tmp_path / 'bare.db'), migrate=False)
+    try:
+        with db_pool.get_connection() as conn:
+            tables = conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'").fetchall()
+        assert tables == []
+    finally:
+        db_pool.close()
+
+
+def test_frozen_root_encoding_matches_catalogue():
+    for root_text, record in SpiritRoot.catalogue().items():
+        assert _encode_root_v2(root_text) == record.code
+    assert _encode_root_v2('金金_天') is None
+    assert _encode_root_v2(None) is None
@@ -0,0 +1,64 @@
+import pytest
+
+from core.eventmanager import EventManager
+from dao.connectionPool import db_pool
+from dao.playerDAO import PlayerDAO
+from service.playerService import PlayerService
+from tests.conftest import make_player
+
+
+def _seed(dao, count):
+    dao.insert_many([make_player(name=f'修士{i}', age=10 + i) for i in range(count)])
+
+
+def test_pages_cover_every_player_once(db_path):
+    dao = PlayerDAO()
+    _seed(dao, 25)
+    seen, after = [], None
+    while True:
+        page = dao.get_page(after, limit=10, sort_key='age', descending=True)
+        seen.extend(p.id for p in page)
+        if len(page) < 10:
+            break
+        after = dao.page_cursor(page[-1], 'age')
+    assert seen == list(range(25, 0, -1))
+
+
+def test_cursor_survives_anchor_change_and_delete(db_path):
+    dao = PlayerDAO()
+    _seed(dao, 20)
+    first = dao.get_page(None, limit=5, sort_key='age')
+    after = dao.page_cursor(first[-1], 'age')
+    # 锚点玩家在两页之间被改到末尾并删除，下一页仍从原位置继续
+    dao.execute_update('UPDATE players SET age = 999 WHERE id = ?', (first[-1].id,))
+    dao.fake_delete(first[-1].id)
+    second = dao.get_page(after, limit=5, sort_key='age')
+    assert [p.id for p in second] == [6, 7, 8, 9, 10]
+
+
+def test_service_returns_next_cursor(db_path):
+    service = PlayerService(EventManager())
+    _seed(service.player_dao, 3)
+    players, after = service.get_players_page(None, limit=2, sort_key='name')
+    assert after == (players[-1].name, players[-1].id)
+    players, after = service.get_players_page(after, limit=2, sort_key='name')
+    assert len(players) == 1 and after is None
+
+
+def test_iter_all_releases_connection_between_pages(db_path):
+    dao = PlayerDAO()
+    _seed(dao, 7)
+    iterator = dao.iter_all(batch_size=3)
+    assert next(iterator).id == 1
+    assert db_pool.stats()['in_use'] == 0
+    assert [p.id for p in iterator] == list(range(2, 8))
+
+
+@pytest.mark.parametrize('limit', [0, -1])
+def test_non_positive_limit_is_rejected(db_path, limit):
+    service = PlayerService(EventManager())
+    _seed(service.player_dao, 3)
+    with pytest.raises(ValueError):
+        service.player_dao.get_page(None, limit=limit)
+    with pytest.raises(ValueError):
+        service.get_players_page(None, limit=limit)
@@ -0,0 +1,64 @@
+from dao.playerDAO import PlayerDAO
+from tests.conftest import make_player
+
+
+def test_identity_map_returns_same_object(db_path):
+    dao = PlayerDAO()
+    dao.insert_many([make_player(name=f'修士{i}') for i in range(3)])
+    first = dao.get_by_id(2)
+    assert dao.get_by_id(2) is first
+    assert next(p for p in dao.get_all() if p.id == 2) is first
+    assert dao.cache_stats()['hits'] >= 1
+
+
+def test_query_refreshes_clean_object_after_external_write(db_path):
+    dao = PlayerDAO()
+    dao.insert(make_player(name='旧名'))
+    player = dao.get_by_id(1)
+    PlayerDAO(cache_size=0).execute_update('UPDATE players SET name = ?, age = ? WHERE id = ?', ('新名', 77, 1))
+    (reloaded,) = dao.get_all()
+    assert reloaded is player
+    assert (player.name, player.age) == ('新名', 77)
+    assert not player.is_dirty
+
+
+def test_query_keeps_unsaved_changes(db_path):
+    dao = PlayerDAO()
+    dao.insert(make_player(name='旧名'))
+    player = dao.get_by_id(1)
+    player.name = '未保存'
+    dao.execute_update('UPDATE players SET age = 77 WHERE id = 1')
+    (reloaded,) = dao.get_all()
+    assert reloaded is player
+    assert player.name == '未保存'
+    assert player.dirty_columns == {'name'}
+
+
+def test_rollback_clears_cache(db_path):
+    dao = PlayerDAO()
+    dao.insert(make_player(name='旧名'))
+    player = dao.get_by_id(1)
+    try:
+        with dao.transaction():
+            player.name = '回滚'
+            dao.update(player)
+            raise RuntimeError
+    except RuntimeError:
+        pass
+    reloaded = dao.get_by_id(1)
+    assert reloaded is not player
+    assert reloaded.name == '旧名'
+
+
+def test_cultivation_write_keeps_one_object_per_id(db_path):
+    dao = PlayerDAO()
+    dao.insert_many([make_player(name=f'修士{i}') for i in range(2)])
+    synced, stale = dao.get_by_id(1), dao.get_by_id(2)
+    synced.age = 30
+    synced.mark_clean()
+    assert dao.update_cultivation_many([(30, 0, 0.0, 0, 1), (55, 1, 12.5, 0, 2)])
+    # 已同步的对象保持不动，其余对象就地刷新，同一ID仍然是同一个对象
+    assert dao.get_by_id(1) is synced
+    assert dao.get_by_id(2) is stale
+    assert (stale.age, stale.realm_level, stale.current_exp) == (55, 1, 12.5)
+    assert not stale.is_dirty
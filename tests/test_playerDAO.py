@@ -0,0 +1,59 @@
+from dao.playerDAO import PlayerDAO
+from tests.conftest import make_player
+
+
+def _fresh(player_id):
+    """绕过缓存从数据库读取"""
+    return PlayerDAO(cache_size=0).get_by_id(player_id)
+
+
+def test_insert_many_writes_back_ids(db_path):
+    dao = PlayerDAO()
+    players = [make_player(name=f'修士{i}') for i in range(2500)]
+    assert dao.insert_many(players) == 2500
+    assert [p.id for p in players] == list(range(1, 2501))
+    assert _fresh(1234).name == '修士1233'
+    assert not any(p.is_dirty for p in players)
+
+
+def test_update_many_writes_only_dirty_players(db_path):
+    dao = PlayerDAO()
+    players = [make_player(name=f'修士{i}') for i in range(10)]
+    dao.insert_many(players)
+    players[3].age = 99
+    players[5].name = '改名'
+    assert dao.update_many(players) == 2
+    assert _fresh(players[3].id).age == 99
+    assert _fresh(players[5].id).name == '改名'
+
+
+def test_upsert_many_inserts_and_overwrites(db_path):
+    dao = PlayerDAO()
+    existing = make_player(name='旧')
+    dao.insert(existing)
+    existing.name = '新'
+    new = make_player(name='新来的')
+    assert dao.upsert_many([existing, new]) == 2
+    assert new.id == existing.id + 1
+    assert _fresh(existing.id).name == '新'
+    assert _fresh(new.id).name == '新来的'
+
+
+def test_get_by_ids_chunks_and_skips_missing(db_path):
+    dao = PlayerDAO(cache_size=0)
+    dao.insert_many([make_player(name=f'修士{i}') for i in range(1200)])
+    dao.fake_delete(7)
+    result = dao.get_by_ids([1, 7, 1, 0, 1150, 5000] + list(range(100, 700)))
+    assert 7 not in result and 5000 not in result and 0 not in result
+    assert len(result) == 602
+    assert result[1150].name == '修士1149'
+
+
+def test_get_with_companion_and_disciple_counts(db_path):
+    dao = PlayerDAO()
+    dao.insert_many([make_player(name='甲'), make_player(name='乙', companion_id=1)]
+                    + [make_player(name=f'徒{i}', teacher_id=1 + i % 2) for i in range(5)])
+    player, companion = dao.get_with_companion(2)
+    assert (player.name, companion.name) == ('乙', '甲')
+    assert dao.count_disciples_by_teacher() == {1: 3, 2: 2}
+    assert dao.count_disciples_by_teacher([2, 9]) == {2: 2}
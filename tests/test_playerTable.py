@@ -0,0 +1,88 @@
+import numpy as np
+import pytest
+
+from model.playerTable import PlayerTable
+from utils.spiritroot import SpiritRoot
+from tests.conftest import make_player
+
+
+def _table(count=3):
+    return PlayerTable.from_players([make_player(id=i + 1, name=f'修士{i}') for i in range(count)])
+
+
+def test_row_view_reads_and_writes_columns():
+    table = _table()
+    row = table[2]
+    row.age = 77
+    assert table.columns['age'].tolist()[1] == 77
+    assert row.to_dict()['name'] == '修士1'
+
+
+def test_rows_round_trip():
+    table = _table()
+    copy = PlayerTable.from_rows(table.to_rows())
+    assert copy.to_rows() == table.to_rows()
+
+
+def test_append_grows_capacity():
+    table = PlayerTable(capacity=1)
+    table.append_players(make_player(id=i) for i in range(1, 100))
+    assert len(table) == 99 and 99 in table
+
+
+def test_duplicate_id_rejected_on_append():
+    table = _table()
+    with pytest.raises(ValueError):
+        table.append_players([make_player(id=2)])
+    with pytest.raises(ValueError):
+        table.append_players([make_player(id=10), make_player(id=10)])
+    assert len(table) == 3 and 10 not in table
+
+
+def test_duplicate_id_rejected_on_reindex():
+    table = _table()
+    with pytest.raises(ValueError):
+        table[1].id = 2
+    assert table[1].id == 1 and table[2].id == 2
+    table[1].id = 5
+    assert 5 in table and 1 not in table
+
+
+def test_cultivate_coef_falls_back_for_malformed_root():
+    table = _table(1)
+    row = table[1]
+    row.root = 'no separator'
+    assert row.get_cultivate_coef == 1
+    row.root = None
+    assert row.get_cultivate_coef == 1
+
+
+def test_from_columns_rejects_duplicate_ids():
+    columns = {name: np.array(array) for name, array in _table().columns.items()}
+    columns['id'][:] = 1
+    with pytest.raises(ValueError):
+        PlayerTable.from_columns(columns)
+
+
+def test_to_model_keeps_root_without_code():
+    table = _table(1)
+    row = table[1]
+    row.root = '金金_天'
+    assert row.root_code is None
+    player = row.to_model()
+    assert player.root == '金金_天' and player.root_code is None
+
+
+def test_to_model_keeps_encoded_root():
+    table = _table(1)
+    player = table[1].to_model()
+    assert player.root == '金木_普通' and player.root_code == table[1].root_code
+
+
+def test_root_code_setter_updates_root_column():
+    table = _table(1)
+    row = table[1]
+    row.root_code = SpiritRoot.encode('风冰_地')
+    assert row.root == '风冰_地'
+    row.root_code = None
+    assert row.root == ''
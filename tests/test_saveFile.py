@@ -0,0 +1,51 @@
+import numpy as np
+
+from dao.saveFile import SaveFile, SaveSlots
+from model.playerTable import PlayerTable
+from tests.conftest import make_player
+
+
+def _players():
+    return [make_player(id=i + 1, name=f'修士{i}', age=i * 3, current_exp=i * 1.5,
+                        root=['金木_普通', '风冰_地', '金金_普通'][i % 3], companion_id=-1 if i % 2 else i)
+            for i in range(6)]
+
+
+def test_round_trip_preserves_columns(tmp_path):
+    table = PlayerTable.from_players(_players())
+    path = str(tmp_path / 'slot.zts')
+    info = SaveFile.save(table, path)
+    assert info.rows == 6
+    loaded = SaveFile.load(path)
+    for name, array in table.columns.items():
+        assert list(loaded.columns[name]) == list(array), name
+    assert loaded.get(4).name == '修士3'
+
+
+def test_loaded_table_can_grow(tmp_path):
+    path = str(tmp_path / 'slot.zts')
+    SaveFile.save_players(_players(), path)
+    loaded = SaveFile.load(path)
+    loaded.append_rows(PlayerTable.from_players([make_player(id=100, name='新人')]).to_rows())
+    assert len(loaded) == 7 and loaded.get(100).name == '新人'
+    # 写时复制映射，修改不影响存档文件
+    assert SaveFile.info(path).rows == 6
+
+
+def test_empty_table_round_trip_and_append(tmp_path):
+    path = str(tmp_path / 'empty.zts')
+    SaveFile.save(PlayerTable(), path)
+    loaded = SaveFile.load(path)
+    assert len(loaded) == 0
+    loaded.append_rows(PlayerTable.from_players([make_player(id=i, name=f'修士{i}') for i in (1, 2, 3)]).to_rows())
+    assert len(loaded) == 3
+    assert np.array_equal(loaded.columns['id'], [1, 2, 3])
+
+
+def test_slots_list_and_latest(tmp_path):
+    slots = SaveSlots(str(tmp_path / 'saves'))
+    slots.save('a', PlayerTable.from_players(_players()[:2]))
+    slots.save('b', PlayerTable.from_players(_players()))
+    assert set(slots.list()) == {'a', 'b'}
+    assert slots.latest() == 'b'
+    assert slots.delete('a') and not slots.exists('a')
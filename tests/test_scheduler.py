@@ -0,0 +1,85 @@
+import pytest
+
+from core.eventmanager import EventManager
+from core.scheduler import Scheduler
+
+
+def _recording_scheduler():
+    manager = EventManager()
+    log = []
+    manager.subscribe('time_pass', lambda years: log.append(('time_pass', years)))
+    manager.subscribe('event.#', lambda **kwargs: log.append(kwargs.get('name')))
+    return Scheduler(manager), manager, log
+
+
+def test_advance_jumps_between_due_times():
+    scheduler, _, log = _recording_scheduler()
+    scheduler.schedule_at(10, 'event.a', name='a10')
+    scheduler.schedule_at(3, 'event.b', name='b3')
+    scheduler.schedule_in(3, 'event.a', name='a3')
+    assert scheduler.advance(20) == 3
+    assert log == [('time_pass', 3), 'b3', 'a3', ('time_pass', 7), 'a10', ('time_pass', 10)]
+    assert scheduler.now == 20 and len(scheduler) == 0
+
+
+def test_cancel_and_advance_to_next():
+    scheduler, _, log = _recording_scheduler()
+    first = scheduler.schedule_at(5, 'event.a', name='first')
+    scheduler.schedule_at(8, 'event.a', name='second')
+    assert first.cancel() and not first.cancel()
+    assert scheduler.next_time() == 8
+    assert scheduler.advance_to_next() == 1
+    assert scheduler.now == 8 and log[-1] == 'second'
+    assert scheduler.advance_to_next() == 0 and scheduler.now == 8
+
+
+def test_payload_may_use_parameter_names():
+    scheduler, manager, _ = _recording_scheduler()
+    received = []
+    manager.subscribe('meeting', lambda **kwargs: received.append(kwargs))
+    scheduler.schedule_at(2, 'meeting', time='dawn', event_type='duel', coalesce_key=7)
+    scheduler.schedule_in(1, 'meeting', delay=3)
+    scheduler.advance(2)
+    assert received == [{'delay': 3}, {'time': 'dawn', 'event_type': 'duel', 'coalesce_key': 7}]
+    manager.publish('meeting', event_type='direct')
+    assert received[-1] == {'event_type': 'direct'}
+
+
+def test_listener_scheduled_events_fire_in_same_advance():
+    scheduler, manager, log = _recording_scheduler()
+    manager.subscribe('event.chain', lambda **kwargs: scheduler.schedule_in(2, 'event.done', name='done'))
+    scheduler.schedule_at(1, 'event.chain')
+    assert scheduler.advance(5) == 2
+    assert 'done' in log and scheduler.now == 5
+
+
+def test_rejects_past_times():
+    scheduler, _, _ = _recording_scheduler()
+    scheduler.advance(5)
+    with pytest.raises(ValueError):
+        scheduler.schedule_at(4, 'event.a')
+    with pytest.raises(ValueError):
+        scheduler.schedule_in(-1, 'event.a')
+    with pytest.raises(ValueError):
+        scheduler.advance_to(1)
+
+
+class _AdvancingLock:
+    """释放时模拟另一个线程推进时钟的锁"""
+
+    def __init__(self, scheduler):
+        self.scheduler = scheduler
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.scheduler._now += 1
+        return False
+
+
+def test_schedule_in_reads_clock_and_pushes_under_one_lock():
+    scheduler, _, _ = _recording_scheduler()
+    scheduler._lock = _AdvancingLock(scheduler)
+    event = scheduler.schedule_in(0, 'event.a')
+    assert event.time == 0
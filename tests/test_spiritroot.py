@@ -0,0 +1,76 @@
+import random
+
+import numpy as np
+import pytest
+
+from utils.spiritroot import SpiritRoot
+
+
+def test_catalogue_enumerates_all_canonical_roots():
+    catalogue = SpiritRoot.catalogue()
+    # 8 种属性取 1~5 种的组合数 218，乘以 4 个级别
+    assert len(catalogue) == 872
+    assert all(SpiritRoot.check_legal(root_text) for root_text in catalogue)
+
+
+def test_catalogue_matches_direct_calculation():
+    for root_text, record in list(SpiritRoot.catalogue().items())[::37]:
+        assert record.value == SpiritRoot._calculate_value(root_text)
+        assert record.coefficient == SpiritRoot._calculate_cultivation_coefficient(root_text)
+        assert record.rarity == SpiritRoot._calculate_rarity_level(root_text)
+
+
+def test_lookup_normalises_attribute_order():
+    assert SpiritRoot.lookup('木金_普通') is SpiritRoot.lookup('金木_普通')
+    assert SpiritRoot.lookup('木金-普通') is SpiritRoot.lookup('金木_普通')
+    assert SpiritRoot.calculate_value('冰金_天') == SpiritRoot.calculate_value('金冰_天')
+
+
+@pytest.mark.parametrize('root_text', ['金金_天', '金_神', '金木', None, '石_普通'])
+def test_lookup_rejects_non_catalogue_roots(root_text):
+    assert SpiritRoot.lookup(root_text) is None
+
+
+def test_sample_by_value_stays_within_ten_percent():
+    rng = random.Random(7)
+    for target in (1000, 5000, 20000):
+        for _ in range(50):
+            record = SpiritRoot.sample_by_value(target, rng)
+            assert target * 0.9 < record.value < target * 1.1
+
+
+def test_sample_by_value_falls_back_to_nearest():
+    largest = SpiritRoot._sorted_values[-1]
+    assert SpiritRoot.sample_by_value(largest * 100).value == largest
+
+
+def test_sample_by_value_rejects_non_positive():
+    with pytest.raises(ValueError):
+        SpiritRoot.sample_by_value(0)
+
+
+def test_generate_many_returns_catalogue_codes():
+    batch = SpiritRoot.generate_many(1000, np.random.default_rng(1))
+    records = [SpiritRoot.record_for_code(code) for code in batch.codes.tolist()]
+    assert all(record is not None for record in records)
+    assert batch.values.tolist() == [record.value for record in records]
+    assert batch.coefficients.tolist() == [record.coefficient for record in records]
+
+
+def test_generate_many_follows_generation_probability():
+    n = 200000
+    codes = SpiritRoot.generate_many(n, np.random.default_rng(2)).codes
+    frequency = np.bincount(codes, minlength=len(SpiritRoot._by_code)) / n
+    expected = np.array([record.generation_probability if record else 0.0 for record in SpiritRoot._by_code])
+    assert expected.sum() == pytest.approx(1.0)
+    # 总变差距离
+    assert np.abs(frequency - expected).sum() / 2 < 0.02
+
+
+def test_encode_decode_round_trip():
+    for root_text, record in SpiritRoot.catalogue().items():
+        assert SpiritRoot.encode(root_text) == record.code
+        assert SpiritRoot.decode(record.code) == root_text
+    assert SpiritRoot.encode('金金_天') is None
+    with pytest.raises(ValueError):
+        SpiritRoot.decode(0)
@@ -0,0 +1,52 @@
+import pytest
+
+from core.eventmanager import EventManager
+from core.topics import TopicTrie, validate_pattern
+
+
+def _matches(patterns, topic):
+    trie = TopicTrie()
+    for pattern in patterns:
+        trie.add(pattern)
+    return trie.match(topic)
+
+
+def test_wildcards():
+    patterns = ['player.*', 'player.#', '#', 'player.cultivate.breakthrough', '*.death']
+    assert _matches(patterns, 'player.death') == {'player.*', 'player.#', '#', '*.death'}
+    assert _matches(patterns, 'player') == {'player.#', '#'}
+    assert _matches(patterns, 'player.cultivate.breakthrough') == {
+        'player.#', '#', 'player.cultivate.breakthrough'}
+
+
+def test_remove_prunes_only_unused_nodes():
+    trie = TopicTrie()
+    trie.add('a.b')
+    trie.add('a.b.c')
+    trie.remove('a.b.c')
+    assert trie.match('a.b') == {'a.b'}
+    assert trie.match('a.b.c') == set()
+
+
+@pytest.mark.parametrize('pattern', ['', 'a..b', 'trailing.', '.leading', 'time_pass'])
+def test_plain_types_with_empty_segments_are_literals(pattern):
+    validate_pattern(pattern)
+    manager = EventManager()
+    manager.subscribe(pattern, lambda **kwargs: pattern)
+    assert manager.publish(pattern) == [pattern]
+    assert manager.publish(pattern + 'x') == []
+
+
+@pytest.mark.parametrize('pattern', ['a.b*', 'a#.b', '*x'])
+def test_wildcard_must_own_segment(pattern):
+    with pytest.raises(ValueError):
+        validate_pattern(pattern)
+
+
+def test_publish_routes_to_wildcard_subscribers_in_subscription_order():
+    manager = EventManager()
+    manager.subscribe('player.#', lambda **kwargs: 'all')
+    manager.subscribe('player.death', lambda **kwargs: 'exact')
+    manager.subscribe('player.*', lambda **kwargs: 'one')
+    assert manager.publish('player.death') == ['all', 'exact', 'one']
+    assert manager.publish('player.cultivate.breakthrough') == ['all']
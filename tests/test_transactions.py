@@ -0,0 +1,80 @@
+import pytest
+
+from dao.connectionPool import db_pool
+from dao.playerDAO import PlayerDAO
+from service.playerService import PlayerService
+from tests.conftest import make_player
+
+
+def _names():
+    return sorted(p.name for p in PlayerDAO(cache_size=0).get_all())
+
+
+def test_transaction_commits_once(db_path):
+    dao = PlayerDAO()
+    with dao.transaction():
+        dao.insert(make_player(name='甲'))
+        dao.insert(make_player(name='乙'))
+    assert _names() == ['乙', '甲']
+
+
+def test_exception_rolls_back_everything(db_path):
+    dao = PlayerDAO()
+    with pytest.raises(KeyError):
+        with dao.transaction():
+            dao.insert(make_player(name='甲'))
+            raise KeyError('boom')
+    assert _names() == []
+
+
+def test_inner_savepoint_rollback_keeps_outer_work(db_path):
+    dao = PlayerDAO()
+    with dao.transaction():
+        dao.insert(make_player(name='甲'))
+        with pytest.raises(KeyError):
+            with dao.transaction():
+                dao.insert(make_player(name='乙'))
+                raise KeyError('boom')
+        dao.insert(make_player(name='丙'))
+    assert _names() == ['丙', '甲']
+
+
+def test_swallowed_failure_marks_transaction_rollback_only(db_path):
+    dao = PlayerDAO()
+    with pytest.raises(RuntimeError):
+        with dao.transaction():
+            dao.insert(make_player(name='甲'))
+            assert dao.execute_update('UPDATE no_such_table SET x = 1') is False
+    assert _names() == []
+    assert not db_pool.in_transaction()
+
+
+def test_succeed_master_is_atomic(db_path):
+    dao = PlayerDAO()
+    master = make_player(name='掌门', isMaster=1)
+    dao.insert(master)
+    disciples = [make_player(name=f'弟子{i}', teacher_id=master.id) for i in range(3)]
+    dao.insert_many(disciples)
+
+    service = PlayerService(None)
+    assert service.succeed_master(master.id, disciples[0].id)
+    assert len(PlayerDAO(cache_size=0).get_by_teacher_id(disciples[0].id)) == 2
+    assert service.succeed_master(master.id, 9999) is False
+
+
+@pytest.mark.parametrize('missing_master', [True, False])
+def test_succeed_master_rejects_missing_master_and_self_succession(db_path, missing_master):
+    dao = PlayerDAO()
+    master = make_player(name='掌门', isMaster=1)
+    dao.insert(master)
+    disciple = make_player(name='弟子', teacher_id=master.id)
+    dao.insert(disciple)
+
+    service = PlayerService(None)
+    if missing_master:
+        assert service.succeed_master(12345, disciple.id) is False
+    else:
+        assert service.succeed_master(master.id, master.id) is False
+    fresh = PlayerDAO(cache_size=0)
+    assert [p.id for p in fresh.get_master()] == [master.id]
+    assert fresh.get_by_id(disciple.id).teacher_id == master.id
@@ -0,0 +1,91 @@
+import time
+
+import pytest
+
+from dao.connectionPool import db_pool
+from dao.playerDAO import PlayerDAO
+from dao.writeBehind import WriteBehindQueue
+from tests.conftest import make_player
+
+
+class FailingDAO(PlayerDAO):
+    """每次批量写入都失败的DAO"""
+
+    def update_columns_many(self, columns, rows):
+        raise RuntimeError('磁盘已满')
+
+
+def _wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+def test_coalesces_and_flushes(db_path):
+    PlayerDAO().insert_many([make_player(name=f'修士{i}') for i in range(3)])
+    queue = WriteBehindQueue(flush_interval=60).start()
+    try:
+        queue.enqueue_values(1, {'age': 5})
+        queue.enqueue_values(1, {'age': 6, 'current_exp': 1.5})
+        queue.enqueue_rows(('age',), [(9, 2), (10, 3)])
+        assert queue.flush(timeout=5)
+        stats = queue.stats()
+        assert (stats['coalesced'], stats['written'], stats['pending']) == (1, 3, 0)
+        fresh = PlayerDAO(cache_size=0)
+        assert (fresh.get_by_id(1).age, fresh.get_by_id(1).current_exp) == (6, 1.5)
+        assert fresh.get_by_id(3).age == 10
+    finally:
+        queue.close()
+
+
+def test_failed_batches_back_off_then_drop(db_path):
+    queue = WriteBehindQueue(FailingDAO(cache_size=0), max_pending=1, flush_interval=0.01,
+                             max_retries=2).start()
+    try:
+        queue.enqueue_values(1, {'age': 5})
+        _wait_for(lambda: queue.stats()['errors'] >= 1)
+        time.sleep(0.05)
+        # 积压已达 max_pending，退避期间不应反复重试
+        assert queue.stats()['errors'] == 1
+        _wait_for(lambda: queue.stats()['dropped'] == 1)
+        stats = queue.stats()
+        assert (stats['errors'], stats['pending']) == (3, 0)
+    finally:
+        queue.close()
+
+
+def test_restarts_after_pool_reinitialize(db_path, tmp_path):
+    queue = WriteBehindQueue(flush_interval=60).start()
+    try:
+        other = str(tmp_path / 'other.db')
+        db_pool.initialize(other, pool_size=3, timeout=5.0)
+        PlayerDAO().insert(make_player(name='新库'))
+        queue.enqueue_values(1, {'age': 42})
+        assert queue.flush(timeout=5)
+        assert PlayerDAO(cache_size=0).get_by_id(1).age == 42
+    finally:
+        queue.close()
+
+
+def test_explicit_close_is_not_reopened(db_path, tmp_path):
+    queue = WriteBehindQueue(flush_interval=60).start()
+    queue.close()
+    db_pool.initialize(str(tmp_path / 'other.db'), pool_size=3, timeout=5.0)
+    with pytest.raises(RuntimeError):
+        queue.enqueue_values(1, {'age': 1})
+
+
+def test_dropped_batch_marks_players_dirty_again(db_path):
+    PlayerDAO().insert(make_player(name='修士'))
+    player = PlayerDAO(cache_size=0).get_by_id(1)
+    queue = WriteBehindQueue(FailingDAO(cache_size=0), flush_interval=60, max_retries=0)
+    try:
+        player.age = 88
+        assert queue.enqueue(player)
+        assert not player.is_dirty
+        assert not queue.flush()
+        assert queue.stats()['dropped'] == 1
+        assert player.dirty_columns == {'age'}
+    finally:
+        queue.close()
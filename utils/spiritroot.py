@@ -1,7 +1,22 @@
 import random
 import math
 import logging
+from bisect import bisect_left, bisect_right
+from collections import namedtuple
+from itertools import combinations
+import numpy as np
 logger = logging.getLogger()
+
+# 预计算的灵根记录，root_text 为规范文本（属性按基础、高级顺序排列，以'_'连接级别）
+RootRecord = namedtuple(
+    'RootRecord',
+    ['root_text', 'attributes', 'level', 'value', 'coefficient', 'rarity', 'display', 'probability',
+     'generation_probability', 'code']
+)
+
+# 批量生成的结果：紧凑编码（级别序号 << 8 | 属性位掩码）及对应的价值和修炼系数
+RootBatch = namedtuple('RootBatch', ['codes', 'values', 'coefficients'])
+
 class SpiritRoot:
     # 定义灵根属性及其权重
     BASE_ATTRIBUTES = {
@@ -28,6 +43,18 @@ class SpiritRoot:
     
     # 灵根数量的分布权重（灵根越多，几率越小）
     ATTRIBUTE_COUNT_WEIGHTS = [0.4, 0.3, 0.2, 0.08, 0.02]  # 1到5个灵根的权重
+
+    # 预计算灵根目录：规范文本 -> RootRecord；任意写法 -> (属性字符串, 级别, RootRecord)
+    _catalogue = {}
+    _text_index = {}
+    # 按价值升序排列的灵根记录、对应价值及生成概率的累积和（首项为0）
+    _by_value = []
+    _sorted_values = []
+    _cumulative_probability = [0.0]
+    # 以紧凑编码为下标的记录表和数值表，非法编码处为 None / 0
+    _by_code = []
+    _value_by_code = np.zeros(0, dtype=np.int64)
+    _coefficient_by_code = np.zeros(0, dtype=np.float64)
     
     def __init__(self,value=None):
         if value is None:
@@ -35,11 +62,34 @@ class SpiritRoot:
             self.root_text = self._generate_root_text()
             self.value = self.calculate_value(self.root_text)
         else:
-            while(True):
-                self.root_text = self._generate_root_text()
-                self.value = self.calculate_value(self.root_text)
-                if abs(self.value-value)/value <0.1:
-                    break
+            record = self.sample_by_value(value)
+            self.root_text = record.root_text
+            self.value = record.value
+
+    @classmethod
+    def sample_by_value(cls, value, rng=random):
+        """
+        按生成分布抽取价值与目标相差不足10%的灵根
+
+        在按价值排序的累积概率表上二分定位价值区间，再在区间内按生成概率抽样，
+        结果与反复调用 _generate_root_text 直到命中区间的分布一致，但耗时有界。
+        区间内没有任何灵根时，改为在价值最接近目标的灵根中抽样。
+        """
+        if value <= 0:
+            raise ValueError('Target value must be positive')
+        values = cls._sorted_values
+        lo = bisect_right(values, value * 0.9)
+        hi = bisect_left(values, value * 1.1)
+        if lo >= hi:
+            neighbours = values[max(lo - 1, 0):lo + 1]
+            nearest = min(neighbours, key=lambda v: abs(v - value))
+            logger.warning(f"没有价值接近 {value} 的灵根，改用价值为 {nearest} 的灵根")
+            lo = bisect_left(values, nearest)
+            hi = bisect_right(values, nearest)
+        cumulative = cls._cumulative_probability
+        target = cumulative[lo] + rng.random() * (cumulative[hi] - cumulative[lo])
+        index = min(max(bisect_right(cumulative, target) - 1, lo), hi - 1)
+        return cls._by_value[index]
 
 
     @classmethod
@@ -73,8 +123,168 @@ class SpiritRoot:
         attributes_str = ''.join(unique_attributes)  # 用逗号连接
         return f"{attributes_str}_{level}"
     
+    @classmethod
+    def generate_many(cls, n, rng=None):
+        """
+        一次向量化地生成n个灵根
+
+        抽样过程与 _generate_root_text 相同：先抽数量，再有放回地抽属性并去重，最后抽级别。
+
+        Args:
+            n: 生成数量
+            rng: numpy 随机数生成器，默认新建一个
+
+        Returns:
+            RootBatch: 紧凑编码数组及对应的价值、修炼系数数组
+        """
+        rng = np.random.default_rng() if rng is None else rng
+        attribute_weights = np.array(
+            list(cls.BASE_ATTRIBUTES.values()) + list(cls.ADVANCED_ATTRIBUTES.values()), dtype=np.float64)
+        count_weights = np.array(cls.ATTRIBUTE_COUNT_WEIGHTS, dtype=np.float64)
+        level_weights = np.array(list(cls.LEVELS.values()), dtype=np.float64)
+
+        counts = rng.choice(len(count_weights), size=n, p=count_weights / count_weights.sum()) + 1
+        draws = rng.choice(len(attribute_weights), size=(n, len(count_weights)),
+                           p=attribute_weights / attribute_weights.sum())
+        used = np.arange(len(count_weights)) < counts[:, None]
+        masks = np.bitwise_or.reduce(np.where(used, np.left_shift(1, draws), 0), axis=1)
+        levels = rng.choice(len(level_weights), size=n, p=level_weights / level_weights.sum())
+
+        codes = (levels << 8) | masks
+        return RootBatch(codes, cls._value_by_code[codes], cls._coefficient_by_code[codes])
+
+    @classmethod
+    def record_for_code(cls, code):
+        """按紧凑编码获取预计算记录，非法编码返回None"""
+        if code is not None and 0 <= code < len(cls._by_code):
+            return cls._by_code[code]
+        return None
+
+    @classmethod
+    def encode(cls, root_text):
+        """
+        将灵根文本编码为整数：级别序号 << 8 | 属性位掩码
+
+        属性位按基础属性、高级属性的顺序从低位排列（金=1，木=2，……，空=128），
+        级别序号按 LEVELS 的顺序（普通=0，变异=1，地=2，天=3）。
+        SQL 中可用 root_code & 255 按属性分组，root_code >> 8 按级别分组。
+
+        Returns:
+            int: 灵根编码，非法灵根返回None
+        """
+        record = cls.lookup(root_text)
+        return None if record is None else record.code
+
+    @classmethod
+    def decode(cls, code):
+        """
+        将整数编码还原为规范灵根文本
+
+        Raises:
+            ValueError: 编码不对应任何合法灵根时抛出
+        """
+        record = cls.record_for_code(code)
+        if record is None:
+            raise ValueError(f'Invalid root code: {code}')
+        return record.root_text
+
+    @classmethod
+    def coefficients_for_codes(cls, codes, default=1.0):
+        """
+        批量查询编码对应的修炼系数
+
+        Args:
+            codes: 编码数组，负数表示非法灵根
+            default: 非法编码使用的系数
+        """
+        codes = np.asarray(codes, dtype=np.int64)
+        valid = (codes >= 0) & (codes < len(cls._coefficient_by_code))
+        coefficients = cls._coefficient_by_code[np.where(valid, codes, 0)]
+        valid[valid] = coefficients[valid] > 0
+        return np.where(valid, coefficients, default)
+
+    @classmethod
+    def _build_catalogue(cls):
+        """枚举所有合法灵根，预计算各项数值"""
+        ordered_attributes = list(cls.BASE_ATTRIBUTES) + list(cls.ADVANCED_ATTRIBUTES)
+        cls._catalogue = {}
+        cls._text_index = {}
+        cls._by_code = [None] * (len(cls.LEVELS) << 8)
+        for count in range(1, 6):
+            for combination in combinations(ordered_attributes, count):
+                attributes = ''.join(combination)
+                mask = sum(1 << ordered_attributes.index(attr) for attr in combination)
+                for level_index, level in enumerate(cls.LEVELS):
+                    root_text = f"{attributes}_{level}"
+                    record = RootRecord(
+                        root_text=root_text,
+                        attributes=attributes,
+                        level=level,
+                        value=cls._calculate_value(root_text),
+                        coefficient=cls._calculate_cultivation_coefficient(root_text),
+                        rarity=cls._calculate_rarity_level(root_text),
+                        display=cls._display_text(root_text),
+                        probability=cls.calculate_probability(attributes, level),
+                        generation_probability=cls.calculate_generation_probability(combination, level),
+                        code=(level_index << 8) | mask,
+                    )
+                    cls._catalogue[root_text] = record
+                    cls._by_code[record.code] = record
+                    cls._text_index[root_text] = (attributes, level, record)
+                    cls._text_index[f"{attributes}-{level}"] = (attributes, level, record)
+
+        cls._by_value = sorted(cls._catalogue.values(), key=lambda r: r.value)
+        cls._sorted_values = [record.value for record in cls._by_value]
+        cls._cumulative_probability = [0.0]
+        for record in cls._by_value:
+            cls._cumulative_probability.append(cls._cumulative_probability[-1] + record.generation_probability)
+
+        cls._value_by_code = np.array([r.value if r else 0 for r in cls._by_code], dtype=np.int64)
+        cls._coefficient_by_code = np.array([r.coefficient if r else 0.0 for r in cls._by_code], dtype=np.float64)
+
+    @classmethod
+    def catalogue(cls):
+        """所有合法灵根的预计算记录，键为规范灵根文本"""
+        return cls._catalogue
+
+    @classmethod
+    def lookup(cls, root_text):
+        """
+        查找灵根文本对应的预计算记录
+
+        属性顺序不同的写法会规范化后命中同一条记录，并缓存该写法；
+        非法或含重复属性的灵根返回None。
+        """
+        entry = cls._text_index.get(root_text)
+        if entry is not None:
+            return entry[2]
+        try:
+            attributes, level = cls._split_root_text(root_text)
+        except (ValueError, TypeError):
+            return None
+        if len(set(attributes)) != len(attributes):
+            return None
+        canonical = ''.join(
+            [attr for attr in cls.BASE_ATTRIBUTES if attr in attributes] +
+            [attr for attr in cls.ADVANCED_ATTRIBUTES if attr in attributes]
+        )
+        if len(canonical) != len(attributes):
+            return None
+        record = cls._catalogue.get(f"{canonical}_{level}")
+        if record is not None:
+            cls._text_index[root_text] = (attributes, level, record)
+        return record
+
     @classmethod
     def display_text(cls,root_text):
+        """返回格式化的灵根显示文本"""
+        record = cls.lookup(root_text)
+        if record is not None:
+            return record.display
+        return cls._display_text(root_text)
+
+    @classmethod
+    def _display_text(cls,root_text):
         attributes,level = cls.split_root_text(root_text)
         """返回格式化的灵根显示文本"""
         name_map = {1: '单', 2: '双', 3: '三', 4: '四', 5: '五'}
@@ -86,6 +296,14 @@ class SpiritRoot:
 
     @classmethod
     def split_root_text(cls, root_text):
+        """分割灵根文本为属性字符串和级别"""
+        entry = cls._text_index.get(root_text) if isinstance(root_text, str) else None
+        if entry is not None:
+            return entry[0], entry[1]
+        return cls._split_root_text(root_text)
+
+    @classmethod
+    def _split_root_text(cls, root_text):
         """改进的分割方法，增加错误处理和类型检查"""
         if not isinstance(root_text, str):
             raise TypeError('Root text must be a string')
@@ -104,6 +322,13 @@ class SpiritRoot:
 
     @classmethod
     def check_legal(cls, root_text):
+        """合法性检查"""
+        if isinstance(root_text, str) and cls.lookup(root_text) is not None:
+            return True
+        return cls._check_legal(root_text)
+
+    @classmethod
+    def _check_legal(cls, root_text):
         """改进的合法性检查方法"""
         try:
             attributes, level = cls.split_root_text(root_text)
@@ -128,6 +353,14 @@ class SpiritRoot:
     
     @classmethod
     def calculate_cultivation_coefficient(cls,root_text):
+        """计算修炼系数"""
+        record = cls.lookup(root_text)
+        if record is not None:
+            return record.coefficient
+        return cls._calculate_cultivation_coefficient(root_text)
+
+    @classmethod
+    def _calculate_cultivation_coefficient(cls,root_text):
         attributes,level = SpiritRoot.split_root_text(root_text)
         # 基础修炼系数：每个基础属性为1，每个高级属性为2
         base_coefficient = 0
@@ -176,8 +409,43 @@ class SpiritRoot:
         total_prob = attr_prob * count_prob * level_prob
         return total_prob
     
+    @classmethod
+    def calculate_generation_probability(cls, attributes, level):
+        """
+        计算 _generate_root_text 生成该灵根的实际概率
+
+        先按数量权重抽取数量k，再有放回地抽取k个属性并去重，
+        因此属性集合恰为 attributes 的概率用容斥原理计算。
+        """
+        all_attributes = {**cls.BASE_ATTRIBUTES, **cls.ADVANCED_ATTRIBUTES}
+        total_weight = sum(all_attributes.values())
+        count_total = sum(cls.ATTRIBUTE_COUNT_WEIGHTS)
+        attributes = list(attributes)
+
+        set_prob = 0.0
+        for k, count_weight in enumerate(cls.ATTRIBUTE_COUNT_WEIGHTS, start=1):
+            if k < len(attributes):
+                continue
+            exact = 0.0
+            for size in range(1, len(attributes) + 1):
+                sign = (-1) ** (len(attributes) - size)
+                for subset in combinations(attributes, size):
+                    exact += sign * (sum(all_attributes[attr] for attr in subset) / total_weight) ** k
+            set_prob += count_weight / count_total * exact
+
+        level_prob = cls.LEVELS[level] / sum(cls.LEVELS.values())
+        return set_prob * level_prob
+
     @classmethod
     def calculate_value(cls, root_text):
+        """计算灵根价值"""
+        record = cls.lookup(root_text)
+        if record is not None:
+            return record.value
+        return cls._calculate_value(root_text)
+
+    @classmethod
+    def _calculate_value(cls, root_text):
         """计算灵根价值"""
         attributes, level = cls.split_root_text(root_text)
         # 获取概率
@@ -199,7 +467,15 @@ class SpiritRoot:
 
     @classmethod
     def calculate_rarity_level(cls,root_text):
-        value = cls.calculate_value(root_text)
+        """计算稀有度等级"""
+        record = cls.lookup(root_text)
+        if record is not None:
+            return record.rarity
+        return cls._calculate_rarity_level(root_text)
+
+    @classmethod
+    def _calculate_rarity_level(cls,root_text):
+        value = cls._calculate_value(root_text)
         """计算稀有度等级"""
         if value >= 1000000:
             return "神话"
@@ -214,18 +490,21 @@ class SpiritRoot:
         else:
             return "普通"
 
+SpiritRoot._build_catalogue()
+
 # 示例用法
 def main():
     # 生成10000个灵根并统计价值分布
-    roots = [SpiritRoot() for _ in range(10000)]
+    batch = SpiritRoot.generate_many(10000)
     
     # 输出最值钱的前5个灵根
-    top_5 = sorted(roots, key=lambda x: x.value, reverse=True)[5000:5010]
-    for root in top_5:
-        print(f"灵根: {root.display_text(root.root_text)}")
-        print(f"价值: {root.value}")
-        print(f'修炼系数:{root.calculate_cultivation_coefficient(root.root_text)}')
-        print(f"稀有度: {root.calculate_rarity_level(root.root_text)}")
+    order = np.argsort(batch.values)[::-1][5000:5010]
+    for code in batch.codes[order].tolist():
+        record = SpiritRoot.record_for_code(code)
+        print(f"灵根: {record.display}")
+        print(f"价值: {record.value}")
+        print(f'修炼系数:{record.coefficient}')
+        print(f"稀有度: {record.rarity}")
         print("---")
     print('----最强灵根----')
     root_text = '金木风冰空-天'